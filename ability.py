@@ -1,5 +1,4 @@
-import csv
-from utils.utils import stringToMd5
+from utils.gameData import GameData
 class Ability():
 
 	def __init__(self, id, encoded=False):
@@ -9,16 +8,12 @@ class Ability():
 		self.__setup(encoded)
 
 	def __setup(self, encoded):
-		file = open('./data/csv/abilities.csv')
-		abilityList = list(csv.DictReader(file, delimiter=','))
-
-		crypto_key = "asion1asfonapsfobq1n12iofrasnfra"
+		game_data = GameData.instance()
 
 		if encoded:
-			for ability in range(len(abilityList)):
-				if stringToMd5(str(ability) + crypto_key) == self.id:
-					self.id = int(ability)
-					self.name = abilityList[ability-1]['identifier'].replace("-", " ").title()
-					break
+			ability = game_data.abilityIdFromHash(self.id)
+			if ability is not None:
+				self.id = ability
+				self.name = game_data.abilityName(ability)
 		else:
-			self.name = abilityList[self.id - 1]['identifier'].replace("-", " ").title()
\ No newline at end of file
+			self.name = game_data.abilityName(self.id)
\ No newline at end of file
@@ -0,0 +1,246 @@
+import asyncio
+import socket # Python socket
+import socks  # Socket with proxy
+import threading
+
+from utils.eventLoop import EventLoop
+from utils.messageFramer import MessageFramer
+
+from PySide2.QtCore import QObject, Signal
+
+class AsyncSocket(QObject):
+	""" Game connection running on the shared asyncio event loop.
+
+		Drop in replacement for ThreadedSocket. Receiving, framing,
+		sending and the heartbeat all run on the one EventLoop thread
+		instead of a receive and a send thread per connection. Received frames are emitted through receiveSignal
+		like ThreadedSocket does, Qt queues them to the receiver's thread.
+	"""
+	receiveSignal = Signal(object)
+	timeoutSignal = Signal()
+	# Frames dropped so far, emitted when the send queue was full
+	sendDroppedSignal = Signal(int)
+
+	# Same as the socket timeout used by ThreadedSocket
+	RECEIVE_TIMEOUT_SEC = 10
+
+	# Same send queue bound as ThreadedSocket
+	SEND_QUEUE_SIZE = 256
+
+	def __init__(self, ip, port, proxy):
+		super(AsyncSocket, self).__init__()
+		self.__ip = ip
+		self.__port = port
+		self.__proxy = proxy
+		self.__eventLoop = EventLoop.instance()
+		self.__transport = None
+		self.__connected = False
+		self.__shutdownCount = 0
+		self.__heartbeat = None
+
+		# Frames written during one loop iteration, flushed together.
+		# The semaphore counts free queue slots for backpressure.
+		self.__pending = []
+		self.__flushScheduled = False
+		self.__writePaused = False
+		self.__queueSlots = threading.BoundedSemaphore(self.SEND_QUEUE_SIZE)
+
+		# Send statistics
+		self.__bytesSent = 0
+		self.__framesSent = 0
+		self.__writes = 0
+		self.__framesDropped = 0
+		self.__maxQueueDepth = 0
+
+	def connectSocket(self):
+		# If we're currently connected shut down the socket
+		if self.__connected:
+			self.shutdown()
+
+		# Connect with a blocking socket first, PySocks does the proxy
+		# handshake, then the loop takes the socket over
+		game_socket = socks.socksocket(socket.AF_INET, socket.SOCK_STREAM)
+		if self.__proxy[0] == "Enabled":
+			if self.__proxy[1] == "http":
+				game_socket.set_proxy(socks.HTTP, self.__proxy[2], int(self.__proxy[3]))
+			elif self.__proxy[1] == "socks4":
+				game_socket.set_proxy(socks.SOCKS5, self.__proxy[2], int(self.__proxy[3]))
+			elif self.__proxy[1] == "socks5":
+				game_socket.set_proxy(socks.SOCKS4, self.__proxy[2], int(self.__proxy[3]))
+
+		game_socket.connect((self.__ip, self.__port))
+		game_socket.setblocking(False)
+
+		# Update connected state
+		self.__connected = True
+
+		self.__eventLoop.submit(self.__startTransport(game_socket)).result()
+
+	async def __startTransport(self, gameSocket):
+		loop = self.__eventLoop.loop()
+		transport, protocol = await loop.create_connection(lambda: _GameProtocol(self), sock=gameSocket)
+		self.__transport = transport
+
+	def shutdown(self):
+		# Check that we're connected first
+		if self.__connected:
+			self.__connected = False
+			self.__eventLoop.callSoon(self.__closeTransport, self.__transport)
+			self.__transport = None
+
+			self.__shutdownCount = self.__shutdownCount + 1
+			return True
+
+		# Shutdown failed because we are not connected
+		return False
+
+	def __closeTransport(self, transport):
+		self.stopHeartbeat()
+
+		# Drop anything not sent yet, like clearing the send queue
+		self.__releaseSlots(len(self.__pending))
+		self.__pending = []
+		if transport is not None:
+			transport.abort()
+
+	def getShutdownCount(self):
+		return self.__shutdownCount
+
+	def close(self):
+		return self.shutdown()
+
+	def sendData(self, dataString):
+		"""Adds data to the transport's send buffer.
+
+		Data is expected in a string and is encoded here.
+		"""
+
+		# Validate that there is data
+		if dataString is not None:
+			self.sendBytes(dataString.encode())
+
+	def sendBytes(self, data):
+		"""Adds already encoded data to the send buffer.
+
+		The caller never waits, often it is the GUI thread. If the queue
+		is full the data is dropped and sendDroppedSignal is emitted.
+		"""
+		if data is not None:
+			if not self.__queueSlots.acquire(blocking=False):
+				self.__framesDropped = self.__framesDropped + 1
+				self.sendDroppedSignal.emit(self.__framesDropped)
+				return
+
+			self.__eventLoop.callSoon(self.__write, data)
+
+	def sendStats(self):
+		""" Returns the send queue depth and counters since creation."""
+		return {"queueDepth": len(self.__pending),
+				"maxQueueDepth": self.__maxQueueDepth,
+				"framesSent": self.__framesSent,
+				"bytesSent": self.__bytesSent,
+				"writes": self.__writes,
+				"framesDropped": self.__framesDropped}
+
+	def startHeartbeat(self, dataString, interval):
+		""" Sends dataString every interval seconds until shutdown."""
+		self.__eventLoop.callSoon(self.__beat, dataString, interval)
+
+	def stopHeartbeat(self):
+		if self.__heartbeat is not None:
+			self.__heartbeat.cancel()
+			self.__heartbeat = None
+
+	def __beat(self, dataString, interval):
+		if self.__connected:
+			self.sendData(dataString)
+			self.__heartbeat = self.__eventLoop.loop().call_later(interval, self.__beat, dataString, interval)
+
+	def __write(self, data):
+		self.__pending.append(data)
+		if len(self.__pending) > self.__maxQueueDepth:
+			self.__maxQueueDepth = len(self.__pending)
+
+		# Everything sent before the loop gets back to this goes out in
+		# one write instead of one per frame
+		if not self.__flushScheduled:
+			self.__flushScheduled = True
+			self.__eventLoop.loop().call_soon(self.__flush)
+
+	def __flush(self):
+		self.__flushScheduled = False
+		if len(self.__pending) == 0 or self.__writePaused:
+			return
+
+		frames = self.__pending
+		self.__pending = []
+		self.__releaseSlots(len(frames))
+
+		if self.__transport is not None and not self.__transport.is_closing():
+			data = b"".join(frames) if len(frames) > 1 else frames[0]
+			self.__transport.write(data)
+
+			self.__writes = self.__writes + 1
+			self.__framesSent = self.__framesSent + len(frames)
+			self.__bytesSent = self.__bytesSent + len(data)
+
+	def __releaseSlots(self, count):
+		for i in range(count):
+			self.__queueSlots.release()
+
+	def _pauseWriting(self):
+		""" Called by the protocol when the transport's buffer is full."""
+		self.__writePaused = True
+
+	def _resumeWriting(self):
+		self.__writePaused = False
+		self.__flush()
+
+	def _connectionLost(self, exc):
+		""" Called by the protocol when the connection drops."""
+		self.stopHeartbeat()
+		if self.__connected and isinstance(exc, (socket.timeout, ConnectionAbortedError, ConnectionResetError)):
+			self.timeoutSignal.emit()
+
+class _GameProtocol(asyncio.Protocol):
+	""" Frames received data and watches for a silent connection."""
+
+	def __init__(self, owner):
+		self.__owner = owner
+		self.__framer = MessageFramer()
+		self.__transport = None
+		self.__timeout = None
+
+	def connection_made(self, transport):
+		self.__transport = transport
+		self.__resetTimeout()
+
+	def data_received(self, data):
+		self.__resetTimeout()
+
+		# Emit every complete frame as soon as it arrives
+		for message in self.__framer.feed(data):
+			self.__owner.receiveSignal.emit(message)
+
+	def pause_writing(self):
+		self.__owner._pauseWriting()
+
+	def resume_writing(self):
+		self.__owner._resumeWriting()
+
+	def connection_lost(self, exc):
+		if self.__timeout is not None:
+			self.__timeout.cancel()
+		self.__owner._connectionLost(exc)
+
+	def __resetTimeout(self):
+		if self.__timeout is not None:
+			self.__timeout.cancel()
+		loop = asyncio.get_event_loop()
+		self.__timeout = loop.call_later(AsyncSocket.RECEIVE_TIMEOUT_SEC, self.__timedOut)
+
+	def __timedOut(self):
+		# Nothing received for a while, same as socket.timeout on recv
+		self.__timeout = None
+		self.__transport.abort()
+		self.__owner._connectionLost(socket.timeout())
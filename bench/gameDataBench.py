@@ -0,0 +1,123 @@
+""" Benchmark of the shared GameData catalog against csv reads.
+
+	Before GameData every Move, Type and Ability read and parsed its
+	csv file when it was made, and every wild encounter parsed
+	effect.csv. Those loaders are copied here as they were and timed
+	against the current classes, rebuilding a team of six pokemon with
+	four moves each (what updateTeam does on every battle message) and
+	scoring the moves against a wild pokemon. Run from the repository
+	root:
+
+		python bench/gameDataBench.py [rounds]
+"""
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from ability import Ability
+from move import Move
+from type import Type
+from utils.gameData import GameData
+
+# Move ids, types and ability of each team member
+TEAM = (((33, 45, 22, 73), 12, 4, 65),
+		((52, 10, 98, 53), 10, 0, 66),
+		((55, 145, 44, 110), 11, 0, 67),
+		((84, 98, 86, 85), 13, 0, 9),
+		((16, 28, 17, 98), 1, 3, 51),
+		((33, 39, 98, 44), 1, 0, 50))
+
+# Types of the wild pokemon
+WILD_TYPES = (4, 3)
+
+def baselineTypeName(id):
+	file = open('./data/csv/types.csv')
+	typeList = list(csv.DictReader(file, delimiter=','))
+
+	return typeList[id - 1]['identifier'].replace("-", " ").title()
+
+def baselineMove(id):
+	file = open('./data/csv/moves.csv')
+	movesList = list(csv.DictReader(file, delimiter=','))
+
+	name = movesList[id - 1]['identifier'].replace("-", " ").title()
+	power = int(movesList[id - 1]['power']) if movesList[id - 1]['power'] != '' else 0
+	accuracy = int(movesList[id - 1]['accuracy']) if movesList[id - 1]['accuracy'] != '' else 100
+	type_id = int(movesList[id - 1]['type_id'])
+
+	return name, power, accuracy, type_id, baselineTypeName(type_id)
+
+def baselineAbilityName(id):
+	file = open('./data/csv/abilities.csv')
+	abilityList = list(csv.DictReader(file, delimiter=','))
+
+	return abilityList[id - 1]['identifier'].replace("-", " ").title()
+
+def baselineEffectDict():
+	file = open('./data/csv/effect.csv')
+	reader = csv.DictReader(file, delimiter=',')
+	effectDict = {}
+
+	for row in reader:
+		if row['damage_type_id'] in effectDict:
+			effectDict[row['damage_type_id']].append(row['damage_factor'])
+		else:
+			effectDict[row['damage_type_id']] = [row['damage_factor']]
+
+	return effectDict
+
+def baselineRound():
+	team = []
+	for moves, type1, type2, ability in TEAM:
+		team.append(([baselineMove(move) for move in moves],
+					 baselineTypeName(type1),
+					 baselineTypeName(type2) if type2 != 0 else None,
+					 baselineAbilityName(ability)))
+
+	effect_dict = baselineEffectDict()
+	scores = []
+	for move in team[0][0]:
+		factors = effect_dict[str(move[3])]
+		scores.append(int(factors[WILD_TYPES[0] - 1]) / 100 * int(factors[WILD_TYPES[1] - 1]) / 100)
+
+	return scores
+
+def gameDataRound():
+	team = []
+	for moves, type1, type2, ability in TEAM:
+		team.append(([Move(move) for move in moves], Type(type1), Type(type2), Ability(ability)))
+
+	return GameData.instance().scoreMoves([move.type.id for move in team[0][0]], WILD_TYPES[0], WILD_TYPES[1])
+
+def timeRounds(function, rounds):
+	start = time.perf_counter()
+	for _ in range(rounds):
+		result = function()
+
+	return (time.perf_counter() - start) / rounds, result
+
+def main():
+	rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+	start = time.perf_counter()
+	GameData.instance()
+	load = time.perf_counter() - start
+
+	baseline, baseline_scores = timeRounds(baselineRound, rounds)
+	current, scores = timeRounds(gameDataRound, rounds)
+
+	if [round(score, 4) for score in baseline_scores] != [round(score, 4) for score in scores]:
+		print("FAIL: effectiveness differs, {} != {}".format(baseline_scores, scores))
+		return 1
+
+	print("GameData first load: {:8.2f} ms".format(load * 1000))
+	print("csv per object:      {:8.3f} ms per team".format(baseline * 1000))
+	print("GameData:            {:8.3f} ms per team ({:.0f}x)".format(current * 1000, baseline / current))
+
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main())
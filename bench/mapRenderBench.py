@@ -0,0 +1,494 @@
+""" Benchmark of redrawing the map view while the player walks.
+
+	The view used to be a grid of MapTileWidgets. Every step set the
+	state of all of them and repainted each one, converting its sprite
+	images to pixmaps again. The tile state and painting of that grid
+	are copied here and timed against MapWidget, walking the same path
+	on a real map. MapWidget only paints what its update() and scroll()
+	calls leave dirty, those are caught to build the paint region.
+
+	The walk is repeated for several view sizes, in tiles, the way the
+	window can be resized. The width is the grid MapWidget.resizeEvent
+	picks, the height is CONSTANTS.WIDGET_MAP_VIEW_HEIGHT, which also
+	sets the tile size. Each step is timed whole (frame) and for its
+	painting alone.
+
+	With PySide2 installed the tiles are painted into an offscreen
+	pixmap. Without it Qt is replaced by a stand-in whose painting does
+	nothing: the times are then of the Python side only and are labelled
+	so, the tiles painted per step still show the difference. Run from
+	the repository root:
+
+		python bench/mapRenderBench.py [walks]
+"""
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+MAP_NAME = "Route 1"
+
+# Tile the walk starts on and the one it goes to
+WALK_START = (40, 74)
+WALK_END = (6, 22)
+
+# (columns, rows) of the view, the first is the default window
+VIEW_SIZES = ((21, 19), (31, 19), (41, 25), (61, 33))
+
+def installQtStub():
+	""" Puts a stand-in for the parts of PySide2 the map view uses in sys.modules."""
+	class Signal():
+		def __init__(self, *args):
+			pass
+
+	class Qt():
+		NoPen = 0
+		LeftButton = 1
+		white = "white"
+		lightGray = "lightGray"
+
+	class QRect():
+		def __init__(self, x, y, width, height):
+			self.__x, self.__y, self.__width, self.__height = x, y, width, height
+
+		def left(self):
+			return self.__x
+
+		def top(self):
+			return self.__y
+
+		def right(self):
+			return self.__x + self.__width - 1
+
+		def bottom(self):
+			return self.__y + self.__height - 1
+
+		def width(self):
+			return self.__width
+
+		def height(self):
+			return self.__height
+
+	class Stub():
+		""" Accepts any arguments, any method call does nothing."""
+		def __init__(self, *args):
+			pass
+
+		def __getattr__(self, name):
+			return lambda *args: None
+
+	class QPixmap(Stub):
+		@staticmethod
+		def fromImage(image):
+			return QPixmap(image)
+
+		def scaled(self, *args):
+			return self
+
+	class QPainter(Stub):
+		Antialiasing = 1
+
+	class QWidget():
+		def __init__(self, parent=None):
+			self.__width = 0
+			self.__height = 0
+
+		def setMinimumSize(self, width, height):
+			self.__width = width
+			self.__height = height
+
+		def resize(self, width, height):
+			self.__width = width
+			self.__height = height
+
+		def width(self):
+			return self.__width
+
+		def height(self):
+			return self.__height
+
+		def devicePixelRatioF(self):
+			return 1.0
+
+		def update(self, *args):
+			pass
+
+		def scroll(self, *args):
+			pass
+
+	class QDesktopWidget():
+		def screenGeometry(self, screen):
+			return QRect(0, 0, 1920, 1080)
+
+	qt_core = types.ModuleType("PySide2.QtCore")
+	qt_core.Signal, qt_core.Qt, qt_core.QRect = Signal, Qt, QRect
+
+	qt_gui = types.ModuleType("PySide2.QtGui")
+	qt_gui.Qt, qt_gui.QPixmap, qt_gui.QPainter = Qt, QPixmap, QPainter
+	qt_gui.QColor = qt_gui.QImage = qt_gui.QBrush = qt_gui.QPen = Stub
+
+	qt_widgets = types.ModuleType("PySide2.QtWidgets")
+	qt_widgets.QWidget, qt_widgets.QDesktopWidget = QWidget, QDesktopWidget
+
+	pyside = types.ModuleType("PySide2")
+	pyside.QtCore, pyside.QtGui, pyside.QtWidgets = qt_core, qt_gui, qt_widgets
+	sys.modules.update({"PySide2": pyside, "PySide2.QtCore": qt_core,
+						"PySide2.QtGui": qt_gui, "PySide2.QtWidgets": qt_widgets})
+
+try:
+	import PySide2
+	STUBBED = False
+except ImportError:
+	installQtStub()
+	STUBBED = True
+
+from PySide2.QtCore import Qt, QRect
+from PySide2.QtGui import QBrush, QPainter, QPen, QPixmap
+
+if not STUBBED:
+	from PySide2.QtCore import QPoint
+	from PySide2.QtGui import QRegion
+	from PySide2.QtWidgets import QApplication
+
+from ui.mapTileWidget import (TileTypeEnum, TileSprites, COLOR_NO_MAP, COLOR_WALKABLE, COLOR_BLOCKED,
+							  COLOR_WATER, COLOR_GRASS, COLOR_LEDGE, COLOR_CUT_TREE, COLOR_NPC, COLOR_EXIT)
+from ui.mapWidget import MapWidget
+from utils.constants import CONSTANTS
+from utils.mapManager import MapManager
+from utils.pathfinding import astar
+
+class BaselineTile():
+	""" State and painting of a MapTileWidget before MapWidget drew the tiles.
+
+		The rock sprites are left out, the benchmark map has none.
+	"""
+
+	def __init__(self):
+		self.type = -1
+		self.location = "outside"
+		self.player = False
+		self.playerDirection = "down"
+		self.selected = False
+		self.x = -1
+		self.y = -1
+
+	def paint(self, painter, rectangle):
+		painter.setRenderHint(QPainter.Antialiasing)
+
+		outer, inner = Qt.white, Qt.lightGray
+
+		if self.type == TileTypeEnum.NO_MAP.value:
+			inner = COLOR_NO_MAP
+		elif self.type == TileTypeEnum.WALKABLE.value:
+			inner = COLOR_WALKABLE
+		elif self.type == TileTypeEnum.BLOCKED.value:
+			inner = COLOR_BLOCKED
+		elif self.type == TileTypeEnum.WATER.value:
+			inner = COLOR_WATER
+		elif self.type == TileTypeEnum.GRASS.value:
+			inner = COLOR_GRASS
+		elif self.type == TileTypeEnum.LEDGE_DOWN.value:
+			inner = COLOR_LEDGE
+		elif self.type == TileTypeEnum.LEDGE_LEFT.value:
+			inner = COLOR_LEDGE
+		elif self.type == TileTypeEnum.LEDGE_RIGHT.value:
+			inner = COLOR_LEDGE
+		elif self.type == TileTypeEnum.CUT_TREE.value:
+			inner = COLOR_CUT_TREE
+		elif self.type == TileTypeEnum.NPC.value:
+			inner = COLOR_NPC
+		elif self.type == TileTypeEnum.EXIT.value:
+			inner = COLOR_EXIT
+
+		pen = QPen(outer)
+		pen.setWidth(0)
+		painter.setPen(Qt.NoPen)
+		painter.fillRect(rectangle, QBrush(inner))
+		if self.type != TileTypeEnum.NO_MAP.value:
+			if self.location == "indoors":
+				painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_INDOOR_FLOOR))
+				if self.type == TileTypeEnum.BLOCKED.value:
+					painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_INDOOR_BLOCK))
+			elif self.location == "outside":
+				painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_SHORT_GRASS))
+				if self.type == TileTypeEnum.BLOCKED.value:
+					painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_OUTSIDE_BLOCK))
+			elif self.location == "cave":
+				painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_CAVE_FLOOR))
+				if self.type == TileTypeEnum.BLOCKED.value:
+					painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_CAVE_BLOCK))
+
+		if self.type == TileTypeEnum.WATER.value:
+			painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_WATER))
+		elif self.type == TileTypeEnum.GRASS.value and self.location == "outside":
+			painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_GRASS))
+		elif self.type == TileTypeEnum.EXIT.value:
+			painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_EXIT))
+		elif self.type == TileTypeEnum.CUT_TREE.value:
+			painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_CUT_TREE))
+		elif self.type == TileTypeEnum.NPC.value:
+			painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_NPC))
+		elif self.type == TileTypeEnum.LEDGE_DOWN.value:
+			painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_LEDGE_DOWN))
+		elif self.type == TileTypeEnum.LEDGE_RIGHT.value:
+			painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_LEDGE_RIGHT))
+		elif self.type == TileTypeEnum.LEDGE_LEFT.value:
+			painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_LEDGE_LEFT))
+
+		if self.selected:
+			painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_POKEBALL))
+		if self.player:
+			if self.playerDirection == "down":
+				painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_PLAYER_DOWN))
+			elif self.playerDirection == "up":
+				painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_PLAYER_UP))
+			elif self.playerDirection == "right":
+				painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_PLAYER_RIGHT))
+			elif self.playerDirection == "left":
+				painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_PLAYER_LEFT))
+
+		painter.drawRect(rectangle)
+
+class BaselineView():
+	""" The grid of tiles and the drawMap of the old MapWidget."""
+
+	def __init__(self, tileSize, horizontalTiles, target):
+		self.tileSize = tileSize
+		self.target = target
+		self.horizontalTiles = horizontalTiles
+		self.tiles = [[BaselineTile() for y in range(CONSTANTS.WIDGET_MAP_VIEW_HEIGHT)]
+					  for x in range(self.horizontalTiles)]
+		self.mapManager = MapManager()
+		self.mapName = None
+		self.collisions = [[]]
+		self.selected = dict()
+		self.tilesPainted = 0
+
+	def updatePosition(self, map, playerX, playerY, direction):
+		if map != self.mapName:
+			self.collisions = self.mapManager.map(map)
+			self.mapName = map
+			self.mapWidth = self.mapManager.width(map)
+			self.mapHeight = self.mapManager.height(map)
+
+		widthCenter = int(self.horizontalTiles/2)
+		heightCenter = int(CONSTANTS.WIDGET_MAP_VIEW_HEIGHT/2)
+
+		for x in range(0, self.horizontalTiles):
+			for y in range(0, CONSTANTS.WIDGET_MAP_VIEW_HEIGHT):
+				tile = self.tiles[x][y]
+				if x == widthCenter and y == heightCenter:
+					tile.player, tile.playerDirection = True, direction
+				else:
+					tile.player, tile.playerDirection = False, "down"
+
+				trueX = playerX + x - widthCenter
+				trueY = playerY + y - heightCenter
+
+				if ((trueX < 0) or (trueX > self.mapWidth) or
+				    (trueY < 0) or (trueY > self.mapHeight)):
+					tile.type = TileTypeEnum.NO_MAP.value
+					tile.x, tile.y = -1, -1
+					tile.selected = False
+				else:
+					tile_type = self.collisions[trueY][trueX]
+
+					for exit in self.mapManager.exits:
+						if exit[0] == trueX and exit[1] == trueY:
+							tile_type = TileTypeEnum.EXIT.value
+
+					tile.type = tile_type
+					tile.location = self.mapManager.location
+					tile.x, tile.y = trueX, trueY
+					tile.selected = str(trueX) + "," + str(trueY) in self.selected
+
+	def paint(self):
+		# Updating the container repainted every tile widget in it
+		for x in range(0, self.horizontalTiles):
+			for y in range(0, CONSTANTS.WIDGET_MAP_VIEW_HEIGHT):
+				painter = QPainter(self.target)
+				self.tiles[x][y].paint(painter, QRect(x * self.tileSize, y * self.tileSize,
+													  self.tileSize, self.tileSize))
+				painter.end()
+				self.tilesPainted += 1
+
+class DirtyRegion():
+	""" Catches the update() and scroll() calls of a MapWidget.
+
+		A scroll moves the pixels already drawn, only the strip it
+		uncovers is added. update() without a rectangle dirties the
+		whole widget.
+	"""
+
+	def __init__(self, widget):
+		self.widget = widget
+		self.rects = []
+		widget.update = self.update
+		widget.scroll = self.scroll
+
+	def update(self, rect=None):
+		if rect is None:
+			rect = QRect(0, 0, self.widget.width(), self.widget.height())
+		self.rects.append(rect)
+
+	def scroll(self, dx, dy, rect):
+		if dx < 0:
+			self.rects.append(QRect(rect.right() + 1 + dx, rect.top(), -dx, rect.height()))
+		elif dx > 0:
+			self.rects.append(QRect(rect.left(), rect.top(), dx, rect.height()))
+		if dy < 0:
+			self.rects.append(QRect(rect.left(), rect.bottom() + 1 + dy, rect.width(), -dy))
+		elif dy > 0:
+			self.rects.append(QRect(rect.left(), rect.top(), rect.width(), dy))
+
+	def take(self):
+		rects = self.rects
+		self.rects = []
+		return rects
+
+class StubPaintEvent():
+	def __init__(self, rects):
+		self.__rects = rects
+
+	def region(self):
+		return self
+
+	def rects(self):
+		return self.__rects
+
+def countPaints(function, counter):
+	def paint(*args, **kwargs):
+		counter[0] += 1
+		return function(*args, **kwargs)
+
+	return paint
+
+def walkPath():
+	""" Returns the (x, y) tiles of the walk, start included."""
+	path = astar(MapManager().map(MAP_NAME), (WALK_START[1], WALK_START[0]), (WALK_END[1], WALK_END[0]), False)
+	if path is None:
+		return None
+
+	return [(step[1], step[0]) for step in path]
+
+def directionOf(last, step):
+	if step[0] > last[0]:
+		return "right"
+	if step[0] < last[0]:
+		return "left"
+	if step[1] < last[1]:
+		return "up"
+	return "down"
+
+def timeBaseline(path, tileSize, columns):
+	""" Returns the time of the walk, of its painting and the tiles painted."""
+	target = QPixmap(columns * tileSize, CONSTANTS.WIDGET_MAP_VIEW_HEIGHT * tileSize)
+	view = BaselineView(tileSize, columns, target)
+
+	painting = 0
+	start = time.perf_counter()
+	last = path[0]
+	for step in path:
+		view.updatePosition(MAP_NAME, step[0], step[1], directionOf(last, step))
+		last = step
+
+		paint_start = time.perf_counter()
+		view.paint()
+		painting += time.perf_counter() - paint_start
+
+	return time.perf_counter() - start, painting, view.tilesPainted
+
+def timeMapWidget(path, columns):
+	""" Returns the time of the walk, of its painting and the tile size."""
+	widget = MapWidget(None)
+
+	# Wide enough for resizeEvent to pick the same grid
+	widget.resize(columns * widget.tileSize + 80,
+				  CONSTANTS.WIDGET_MAP_VIEW_HEIGHT * widget.tileSize + 2 * widget.MARGIN)
+	widget.resizeGrid(columns)
+	dirty = DirtyRegion(widget)
+	if not STUBBED:
+		target = QPixmap(widget.size())
+
+	painting = 0
+	start = time.perf_counter()
+	last = path[0]
+	for step in path:
+		widget.updatePosition(MAP_NAME, step[0], step[1], directionOf(last, step), False)
+		last = step
+
+		paint_start = time.perf_counter()
+		rects = dirty.take()
+		if STUBBED:
+			widget.paintEvent(StubPaintEvent(rects))
+		else:
+			region = QRegion()
+			for rect in rects:
+				region = region.united(rect)
+			widget.render(target, QPoint(0, 0), region)
+		painting += time.perf_counter() - paint_start
+
+	return time.perf_counter() - start, painting, widget.tileSize
+
+def timeView(path, columns, rows, walks, painted):
+	""" Prints the best of a few alternating walks of both on one view size."""
+	default_rows = CONSTANTS.WIDGET_MAP_VIEW_HEIGHT
+	CONSTANTS.WIDGET_MAP_VIEW_HEIGHT = rows
+	try:
+		painted[0] = 0
+		baseline = baseline_paint = current = current_paint = None
+		for _ in range(walks):
+			elapsed, paint, tile_size = timeMapWidget(path, columns)
+			current = elapsed if current is None else min(current, elapsed)
+			current_paint = paint if current_paint is None else min(current_paint, paint)
+			elapsed, paint, baseline_painted = timeBaseline(path, tile_size, columns)
+			baseline = elapsed if baseline is None else min(baseline, elapsed)
+			baseline_paint = paint if baseline_paint is None else min(baseline_paint, paint)
+	finally:
+		CONSTANTS.WIDGET_MAP_VIEW_HEIGHT = default_rows
+
+	steps = len(path)
+	print("{:<10}{:>11}{:>10.3f}{:>10.3f}{:>10.3f}{:>10.3f}{:>8.0f}{:>8.1f}{:>9.1f}x".format(
+		  "{}x{}".format(columns, rows), "{}x{}".format(columns * tile_size, rows * tile_size),
+		  baseline * 1000 / steps, current * 1000 / steps,
+		  baseline_paint * 1000 / steps, current_paint * 1000 / steps,
+		  baseline_painted / steps, painted[0] / walks / steps, baseline / current))
+
+def main():
+	walks = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+	if not STUBBED:
+		os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+		# Kept referenced until the end, widgets need it
+		app = QApplication(sys.argv)
+
+	path = walkPath()
+	if path is None:
+		print("FAIL: no path on {}".format(MAP_NAME))
+		return 1
+
+	painted = [0]
+	TileSprites.paint = countPaints(TileSprites.paint, painted)
+
+	if STUBBED:
+		print("PySide2 is not installed: Qt is stubbed and painting does nothing,")
+		print("the times below are of the Python side of each step only (stub)\n")
+		unit = "py ms"
+	else:
+		unit = "ms"
+
+	# Per step, frame is the whole step and paint the painting in it
+	print("{} steps on {}, best of {} walks, per step".format(len(path), MAP_NAME, walks))
+	print("{:<10}{:>11}{:>10}{:>10}{:>10}{:>10}{:>8}{:>8}{:>10}".format(
+		  "tiles", "pixels", "old frame", "new frame", "old paint", "new paint", "old n", "new n", "speedup"))
+	print("{:<10}{:>11}{:>10}{:>10}{:>10}{:>10}{:>8}{:>8}".format(
+		  "", "", unit, unit, unit, unit, "tiles", "tiles"))
+	for columns, rows in VIEW_SIZES:
+		timeView(path, columns, rows, walks, painted)
+
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,135 @@
+""" Benchmark of reading fields from inbound XT packets.
+
+	Message used to split an XT packet only to read its header, and the
+	handlers split the raw string again (twice for r17) to read the
+	fields. The old Message and the handlers' reads are copied here and
+	timed against the current Message and its fields on synthetic
+	packets of the common kinds. Short packets cost about the same
+	either way, the saving grows with the size of the packet. Run from
+	the repository root:
+
+		python bench/messageBench.py [messages per kind]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from message import Message
+
+TEAM = ",".join(["1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16,17,18,19,20,Hardy,33,45,22,73,0,12,"
+				 "40,1000,200,false,20,1,Bulbasaur,none,65,none,0,Player"] * 6)
+
+PACKETS = {"c": "`xt`c`-1`" + TEAM + "`1`2`3`4`5",
+		   "r17": "`xt`r17`-1`Please finish what you are doing first. <font color='#FFFFFF'>x</font>`",
+		   "b86": "`xt`b86`-1`Poke Ball,3`",
+		   "b5": "`xt`b5`-1`Route 1`1`2`3`[[10,12,Red,1],[14,3,Blue,0]]`",
+		   "pmsg": "`xt`pmsg`-1`[n]<g>Hello there`Someone`"}
+
+class BaselineMessage():
+	""" XT parsing of Message as it was before fields() existed."""
+
+	def __init__(self, streamString):
+		self.__type = None
+		self.__action = None
+		self.__code = None
+		self.__rawData = None
+		self.__parse(streamString)
+
+	def __parse(self, streamString):
+		self.__rawData = streamString
+
+		# MSG packets were parsed as XML here, only XT ones are timed
+		if self.__rawData.startswith('<msg'):
+			self.__type = "MSG"
+		elif self.__rawData.startswith('`xt`'):
+			self.__type = "XT"
+			self.__parseXt(streamString)
+		elif self.__rawData.startswith('<cross-domain-policy>'):
+			self.__type = "POLICY"
+
+	def __parseXt(self, streamString):
+		split_string = streamString.split('`')
+		self.__action = split_string[2]
+		self.__code = split_string[3]
+
+	def getMessageAction(self):
+		return self.__action
+
+	def getMessageRaw(self):
+		return self.__rawData
+
+def baselineRead(data):
+	""" What the handlers read from a packet before Message.fields()."""
+	message = BaselineMessage(data)
+	action = message.getMessageAction()
+	if action == "c":
+		return message.getMessageRaw().split('`')[4]
+	elif action == "r17":
+		found = "Please finish what you are doing first." in message.getMessageRaw().split('`')[4]
+		return found, message.getMessageRaw().split('`')[4].replace("FFFFFF", "6a0dad")
+	elif action == "b86":
+		split_string = message.getMessageRaw().split('`')
+		split_string = split_string[4].split(",")
+		return split_string[0], int(split_string[1])
+	elif action == "b5":
+		return message.getMessageRaw().split("`")[8]
+	elif action == "pmsg":
+		split_string = message.getMessageRaw().split('`')
+		return split_string[4][:3], split_string[4][3:6], split_string[4][6:], split_string[5]
+
+	return action
+
+def currentRead(data):
+	""" The same reads through the current Message."""
+	message = Message(data)
+	action = message.getMessageAction()
+	if action == "c":
+		return message.field(4)
+	elif action == "r17":
+		text = message.field(4, "")
+		return "Please finish what you are doing first." in text, text.replace("FFFFFF", "6a0dad")
+	elif action == "b86":
+		item, count = message.subFields(4)[:2]
+		return item, int(count)
+	elif action == "b5":
+		return message.field(8, "")
+	elif action == "pmsg":
+		text = message.field(4)
+		return text[:3], text[3:6], text[6:], message.field(5)
+
+	return action
+
+def timeReads(function, data, count):
+	start = time.perf_counter()
+	for _ in range(count):
+		result = function(data)
+
+	return (time.perf_counter() - start) / count, result
+
+def main():
+	count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+	repeat = 100
+
+	print("{:<8}{:>16}{:>16}{:>10}".format("packet", "old us/message", "new us/message", "speedup"))
+	for kind, data in PACKETS.items():
+		# Alternate the two and keep the best run of each, the machine
+		# is busy with other things too
+		baseline = current = None
+		for _ in range(repeat):
+			elapsed, baseline_result = timeReads(baselineRead, data, count)
+			baseline = elapsed if baseline is None else min(baseline, elapsed)
+			elapsed, result = timeReads(currentRead, data, count)
+			current = elapsed if current is None else min(current, elapsed)
+
+		if baseline_result != result:
+			print("FAIL: {} reads differ, {!r} != {!r}".format(kind, baseline_result, result))
+			return 1
+
+		print("{:<8}{:>16.2f}{:>16.2f}{:>9.1f}x".format(kind, baseline * 1e6, current * 1e6, baseline / current))
+
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main())
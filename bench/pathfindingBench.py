@@ -0,0 +1,205 @@
+""" Benchmark of the heap based astar against the list based one.
+
+    The astar the repository started with is copied here as it was,
+    with its open and closed lists, and both are timed on the same
+    random start and end tiles of every map in the map store. Each map
+    gets a few pairs the new astar can connect, and one it can't when
+    the map is split in parts, where both have to search everything
+    reachable before giving up. Totals over all the maps are printed,
+    then the maps and the pairs that were slowest with the new astar.
+    Path lengths are counted too, the old heuristic overestimates so
+    its paths can be longer. Run from the repository root:
+
+        python bench/pathfindingBench.py [connected pairs per map]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from utils.mapCache import MapCache
+from utils.mapStore import MapStore
+from utils.pathfinding import astar, WALKABLE_TILES
+
+# Maps and pairs listed as the slowest
+WORST = 10
+
+class Node():
+    """A node class for A* Pathfinding"""
+
+    def __init__(self, parent=None, position=None):
+        self.parent = parent
+        self.position = position
+
+        self.g = 0
+        self.h = 0
+        self.f = 0
+
+    def __eq__(self, other):
+        return self.position[0] == other.position[0] and self.position[1] == other.position[1]
+
+
+def baselineAstar(map, start, end, surfing):
+    """Returns a path with the astar the repository started with"""
+    start_node = Node(None, start)
+    end_node = Node(None, end)
+
+    open_list = [start_node]
+    closed_list = []
+
+    while len(open_list) > 0:
+        current_node = open_list[0]
+        current_index = 0
+        for index, item in enumerate(open_list):
+            if item.f < current_node.f:
+                current_node = item
+                current_index = index
+
+        open_list.pop(current_index)
+        closed_list.append(current_node)
+
+        if current_node == end_node:
+            path = []
+            current = current_node
+            while current is not None:
+                path.append(current.position)
+                current = current.parent
+            return path[::-1]
+
+        children = []
+        for new_position in [(0, -1), (0, 1), (-1, 0), (1, 0), (-1, -1), (-1, 1), (1, -1), (1, 1)]:
+            node_position = (current_node.position[0] + new_position[0], current_node.position[1] + new_position[1])
+
+            if node_position[0] > (len(map) - 1) or node_position[0] < 0 or node_position[1] > (len(map[len(map)-1]) -1) or node_position[1] < 0:
+                continue
+
+            if current_node.position[0] != node_position[0] and current_node.position[1] != node_position[1]:
+                continue
+
+            if surfing:
+                if map[node_position[0]][node_position[1]] != 2:
+                    continue
+            else:
+                if (map[node_position[0]][node_position[1]] != 0 and map[node_position[0]][node_position[1]] != 3 and map[node_position[0]][node_position[1]] != 6):
+                    continue
+
+            children.append(Node(current_node, node_position))
+
+        for child in children:
+            if child in closed_list:
+                continue
+
+            child.g = current_node.g + 1
+            child.h = ((child.position[0] - end_node.position[0]) ** 2) + ((child.position[1] - end_node.position[1]) ** 2)
+            child.f = child.g + child.h
+
+            if child in open_list:
+                continue
+
+            open_list.append(child)
+
+    return None
+
+def randomPairs(collision, count, rng):
+    """ Returns up to count pairs astar can connect and one it can't.
+
+        The second is None when no unreachable pair turned up, on maps
+        in one piece.
+    """
+    tiles = [(row, column) for row in range(len(collision)) for column in range(len(collision[row]))
+             if collision[row][column] in WALKABLE_TILES]
+    if len(tiles) < 2:
+        return [], None
+
+    pairs = []
+    unreachable = None
+    for _ in range(count * 20):
+        if len(pairs) == count and unreachable is not None:
+            break
+        start, end = rng.sample(tiles, 2)
+        if astar(collision, start, end, False) is not None:
+            if len(pairs) < count:
+                pairs.append((start, end))
+        elif unreachable is None:
+            unreachable = (start, end)
+
+    return pairs, unreachable
+
+def timePair(function, collision, pair):
+    start = time.perf_counter()
+    path = function(collision, pair[0], pair[1], False)
+
+    return time.perf_counter() - start, 0 if path is None else len(path)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    rng = random.Random(1)
+
+    # (name, pairs, old seconds, new seconds) per map
+    maps = []
+    # (new seconds, old seconds, name, start, end, reachable) per pair
+    timings = []
+    baseline_length = length = 0
+    skipped = 0
+
+    for key in MapStore.instance().mapKeys():
+        # Named the way MapManager looks the file up
+        name = key.replace("_", " ")
+        map_data = MapCache.instance().get(name)
+        if map_data is None:
+            skipped += 1
+            continue
+
+        collision = [list(row) for row in map_data.collision]
+        pairs, unreachable = randomPairs(collision, count, rng)
+        if unreachable is not None:
+            pairs.append(unreachable)
+        if not pairs:
+            skipped += 1
+            continue
+
+        map_baseline = map_current = 0
+        for pair in pairs:
+            baseline, steps = timePair(baselineAstar, collision, pair)
+            baseline_length += steps
+            current, steps = timePair(astar, collision, pair)
+            length += steps
+
+            map_baseline += baseline
+            map_current += current
+            timings.append((current, baseline, name, pair[0], pair[1], steps > 0))
+
+        maps.append((name, len(pairs), map_baseline, map_current))
+
+    if not maps:
+        print("FAIL: no maps found")
+        return 1
+
+    pairs = len(timings)
+    unreachable = sum(1 for timing in timings if not timing[5])
+    baseline = sum(timing[1] for timing in timings)
+    current = sum(timing[0] for timing in timings)
+    print("{} maps, {} skipped without two walkable tiles".format(len(maps), skipped))
+    print("{} pairs, {} of them unreachable".format(pairs, unreachable))
+    print("old {:.2f} s, new {:.3f} s in total, {:.0f}x, {:.2f} / {:.3f} ms per path".format(
+          baseline, current, baseline / current, baseline * 1000 / pairs, current * 1000 / pairs))
+    print("steps old/new {}/{}".format(baseline_length, length))
+
+    print("\nslowest maps with the new astar")
+    print("{:<28}{:>8}{:>14}{:>14}{:>10}".format("map", "pairs", "old ms/path", "new ms/path", "speedup"))
+    for name, map_pairs, map_baseline, map_current in sorted(maps, key=lambda map: -map[3] / map[1])[:WORST]:
+        print("{:<28}{:>8}{:>14.2f}{:>14.2f}{:>9.0f}x".format(name, map_pairs,
+              map_baseline * 1000 / map_pairs, map_current * 1000 / map_pairs, map_baseline / map_current))
+
+    print("\nslowest pairs with the new astar")
+    print("{:<28}{:>12}{:>12}{:>10}{:>10}{:>10}".format("map", "start", "end", "old ms", "new ms", "reached"))
+    for current, baseline, name, start, end, reached in sorted(timings, reverse=True)[:WORST]:
+        print("{:<28}{:>12}{:>12}{:>10.1f}{:>10.2f}{:>10}".format(name, "{},{}".format(*start),
+              "{},{}".format(*end), baseline * 1000, current * 1000, "yes" if reached else "no"))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
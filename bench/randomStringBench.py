@@ -0,0 +1,96 @@
+""" Benchmark of getRandomString and the packet signature.
+
+	getRandomString used to call random.choice once per character of
+	the packet key every signed message carries. That version is copied
+	here and timed against the current one, alone and together with the
+	md5 of the signature. Afterwards the characters of many keys are
+	counted to check they stay equally likely. Run from the repository
+	root:
+
+		python bench/randomStringBench.py [keys]
+"""
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from utils.utils import getRandomString, stringToMd5, RANDOM_STRING_CHARS
+
+# CONSTANTS.MIN_STRING_LENGTH and MAX_STRING_LENGTH, constants.py needs Qt
+MIN_STRING_LENGTH = 5
+MAX_STRING_LENGTH = 20
+
+# Secret and play time of a signature, only their length matters here
+KEY2 = "s3cr3tk3yfromthel0gin"
+PLAY_TIME = "1234567"
+
+def baselineGetRandomString(min, max):
+	chars = string.ascii_uppercase + string.ascii_lowercase + string.digits
+	length = random.randint(min, max)
+
+	return ''.join(random.choice(chars) for _ in range(length))
+
+def timeCalls(function, count):
+	start = time.perf_counter()
+	for _ in range(count):
+		function()
+
+	return (time.perf_counter() - start) / count
+
+def timePair(name, baseline_function, function, count, repeat=20):
+	""" Prints the best of a few alternating runs of both."""
+	baseline = current = None
+	for _ in range(repeat):
+		elapsed = timeCalls(baseline_function, count)
+		baseline = elapsed if baseline is None else min(baseline, elapsed)
+		elapsed = timeCalls(function, count)
+		current = elapsed if current is None else min(current, elapsed)
+
+	print("{:<22}{:>12.2f}{:>12.2f}{:>9.1f}x".format(name, baseline * 1e6, current * 1e6, baseline / current))
+
+def main():
+	keys = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+	low = MIN_STRING_LENGTH
+	high = MAX_STRING_LENGTH
+
+	print("{:<22}{:>12}{:>12}{:>10}".format("per call", "old us", "new us", "speedup"))
+	timePair("getRandomString", lambda: baselineGetRandomString(low, high),
+			 lambda: getRandomString(low, high), 2000)
+
+	def baselineSignature():
+		packet_key = baselineGetRandomString(low, high)
+		return stringToMd5(packet_key + KEY2 + PLAY_TIME), packet_key
+
+	def signature():
+		packet_key = getRandomString(low, high)
+		return stringToMd5(packet_key + KEY2 + PLAY_TIME), packet_key
+
+	timePair("packet signature", baselineSignature, signature, 2000)
+
+	# Every character should come up about as often as the others,
+	# anything else would fail the lookup
+	counts = dict.fromkeys(RANDOM_STRING_CHARS, 0)
+	lengths = dict()
+	for _ in range(keys):
+		key = getRandomString(low, high)
+		lengths[len(key)] = lengths.get(len(key), 0) + 1
+		for char in key:
+			counts[char] += 1
+
+	# Chi-squared with 61 degrees of freedom is over 100 one time in 1000
+	expected = sum(counts.values()) / len(counts)
+	chi_squared = sum((count - expected) ** 2 / expected for count in counts.values())
+	print("\n{} keys, {} to {} long: each character {} to {} times, chi-squared {:.1f}".format(
+		  keys, min(lengths), max(lengths), min(counts.values()), max(counts.values()), chi_squared))
+
+	if min(lengths) < low or max(lengths) > high or chi_squared > 100:
+		print("FAIL: keys are not uniform")
+		return 1
+
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,147 @@
+""" Soak test of RepeatTimer on the shared scheduler.
+
+	Runs the game's periodic timers (fishing 2.1 s, mining 2.5 s,
+	updateXY 8 s twice, saveData 60 s) at SPEEDUP times real speed for
+	a simulated multi hour session. Fishing is stopped and started
+	again all the time and saveData now and then, like the game does.
+	Afterwards one timer is restarted right when the scheduler has taken
+	a tick but not run it yet.
+
+	Checks that no thread is started during the run, that restarting
+	never leaves two tick chains on one timer, and that nothing is left
+	on the scheduler afterwards. Run from the repository root:
+
+		python bench/repeatTimerSoak.py [simulated hours]
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from utils.repeatTimer import RepeatTimer
+from utils.scheduler import Scheduler
+
+SPEEDUP = 1000.0
+RESTART_EVERY_SEC = 0.05
+
+def main():
+	hours = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+	duration = hours * 3600 / SPEEDUP
+
+	# Start the scheduler thread before counting
+	scheduler = Scheduler.instance()
+
+	started = [0]
+	thread_start = threading.Thread.start
+	def countingStart(thread):
+		started[0] += 1
+		thread_start(thread)
+	threading.Thread.start = countingStart
+
+	ticks = dict()
+	def tick(name):
+		ticks[name] = ticks.get(name, 0) + 1
+
+	intervals = {"fishing": 2.1, "mining": 2.5, "updateXYStart": 8, "updateXYMap": 8, "saveData": 60}
+	timers = dict((name, RepeatTimer(interval / SPEEDUP, tick, name)) for name, interval in intervals.items())
+	for timer in timers.values():
+		timer.start()
+
+	restarts = 0
+	start = time.monotonic()
+	while time.monotonic() - start < duration:
+		time.sleep(RESTART_EVERY_SEC)
+		timers["fishing"].stop()
+		timers["fishing"].start()
+		if restarts % 20 == 0:
+			timers["saveData"].stop()
+			timers["saveData"].start()
+		restarts += 1
+
+	for timer in timers.values():
+		timer.stop()
+	elapsed = time.monotonic() - start
+
+	# Let a tick that was already running finish
+	time.sleep(0.1)
+
+	print("simulated hours: %.1f" % (elapsed * SPEEDUP / 3600))
+	print("restarts: %d" % restarts)
+	for name, interval in intervals.items():
+		# Restarting never makes a timer tick more often than its
+		# interval, a second chain would double the count
+		print("%-14s ticks: %6d  at most: %6d" % (name, ticks.get(name, 0), int(elapsed / (interval / SPEEDUP))))
+
+	chains, rate = restartRace()
+	print("restart race: %d tick chains, %.2f ticks per interval" % (chains, rate))
+	print("threads started: %d" % started[0])
+	print("pending calls after stop: %d" % scheduler.pendingCount())
+
+	threading.Thread.start = thread_start
+
+	failed = started[0] != 0 or scheduler.pendingCount() != 0 or chains != 1 or rate > 1.5
+	for name, interval in intervals.items():
+		if ticks.get(name, 0) > elapsed / (interval / SPEEDUP) + 1:
+			print("FAIL: %s ticked faster than its interval" % name)
+			failed = True
+
+	if failed:
+		print("FAIL")
+		sys.exit(1)
+	print("OK")
+
+class _PausingLock():
+	""" Lock that holds the scheduler thread once before it locks.
+
+		Lets the restart race happen every time: the scheduler has taken
+		the tick but _run has not got the lock yet.
+	"""
+	def __init__(self):
+		self.lock = threading.Lock()
+		self.armed = True
+		self.paused = threading.Event()
+		self.resume = threading.Event()
+
+	def __enter__(self):
+		if self.armed and Scheduler.instance().inSchedulerThread():
+			self.armed = False
+			self.paused.set()
+			self.resume.wait()
+		self.lock.acquire()
+
+	def __exit__(self, *args):
+		self.lock.release()
+
+def restartRace(interval=0.01, settle=0.5):
+	""" Returns how many ticks a timer keeps on the scheduler after the
+		restart race, and its ticks per interval.
+	"""
+	ticks = [0]
+	def tick():
+		ticks[0] += 1
+
+	timer = RepeatTimer(interval, tick)
+	timer._lock = _PausingLock()
+	timer.start()
+
+	# Restart while the first tick is between the scheduler and _run
+	timer._lock.paused.wait()
+	timer.stop()
+	timer.start()
+	timer._lock.resume.set()
+
+	time.sleep(interval)
+	ticks[0] = 0
+	time.sleep(settle)
+
+	# One chain has one call waiting. The chains share the deadline, so
+	# a second one shows up here rather than as a higher rate.
+	chains = Scheduler.instance().pendingCount()
+	timer.stop()
+
+	return chains, ticks[0] / (settle / interval)
+
+if __name__ == "__main__":
+	main()
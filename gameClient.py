@@ -9,6 +9,8 @@ from PySide2.QtGui import QIcon
 from threading import Thread, Timer
 
 from gameHandler import GameHandler
+from utils.mapCache import MapCache
+from utils.uiUpdateBridge import UiUpdateBridge
 from ui.helpWidget import HelpWidget
 from ui.chatWidget import ChatWidget
 from ui.mapWidget import MapWidget
@@ -53,26 +55,38 @@ class GameClient(QMainWindow):
         file = open("./config/client_settings.toml", "r")
         settings_dict = tomlkit.parse(file.read())
 
+        # Number of parsed maps kept in memory
+        if "map_cache_size" in settings_dict:
+            MapCache.instance().setCapacity(settings_dict["map_cache_size"])
+
         self.__gameHandler = GameHandler(settings_dict["version"],
                                          settings_dict["kg1"],
                                          settings_dict["kg2"],
                                          settings_dict["cf_clearance"],
                                          settings_dict["user_agent"],
-                                         settings_dict["proxy"])
+                                         settings_dict["proxy"],
+                                         settings_dict.get("transport", "threaded"))
+
+        # Position, team, inventory and history reach the widgets at most
+        # ui_update_rate times a second, 0 sends every update
+        self.__uiUpdates = UiUpdateBridge(self.__gameHandler,
+                                          settings_dict.get("ui_update_rate", UiUpdateBridge.DEFAULT_RATE),
+                                          self)
 
         self.__chatWidget.sendMessage.connect(self.__gameHandler.sendPmsg)
         self.__mapWidget.walkCommandSignal.connect(self.__gameHandler.walkCommand)
 
         self.__gameHandler.chatSignal.connect(self.__chatWidget.addMessage)
-        self.__gameHandler.teamSignal.connect(self.__teamWidget.setTeam)
-        self.__gameHandler.inventorySignal.connect(self.__inventoryWidget.setInventory)
-        self.__gameHandler.positionSignal.connect(self.__mapWidget.updatePosition)
+        self.__uiUpdates.teamSignal.connect(self.__teamWidget.setTeam)
+        self.__uiUpdates.inventorySignal.connect(self.__inventoryWidget.setInventory)
+        self.__uiUpdates.positionSignal.connect(self.__mapWidget.updatePosition)
         self.__gameHandler.logSignal.connect(self.__chatWidget.addLog)
         self.__gameHandler.connectedSignal.connect(self.__accountWidget.updateLoginState)
         self.__gameHandler.infoSignal.connect(self.__accountWidget.updatePlayerInfo)
-        self.__gameHandler.positionSignal.connect(self.__accountWidget.updatePositionInfo)
+        self.__uiUpdates.positionSignal.connect(self.__accountWidget.updatePositionInfo)
         self.__gameHandler.mountChanged.connect(self.__mapWidget.setMount)
-        self.__gameHandler.historySignal.connect(self.__sessionWidget.update)
+        self.__uiUpdates.historySignal.connect(self.__sessionWidget.update)
+        self.__uiUpdates.historyResetSignal.connect(self.__sessionWidget.resetHistory)
         self.__gameHandler.rockSignal.connect(self.__mapWidget.addRocks)
         self.__gameHandler.runningSignal.connect(self.__botControlWidget.handleRunningState)
         self.__gameHandler.playersSignal.connect(self.__sessionWidget.updatePlayers)
@@ -158,6 +172,7 @@ class GameClient(QMainWindow):
     def __showLoadLocation(self):
         loadLocation = LoadLocationWidget()
         loadLocation.loadLocationSignal.connect(self.__gameHandler.setLocation)
+        loadLocation.walkLocationSignal.connect(self.__gameHandler.walkToLocation)
         loadLocation.exec_()
 
     def __manageProxy(self):
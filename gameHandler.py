@@ -4,22 +4,45 @@ import random
 import ast
 
 from functools import partial
-from threading import Thread, Timer
+from threading import Thread
 from webSession import WebSession
 from threadedSocket import ThreadedSocket
+from asyncSocket import AsyncSocket
 from playerInfo import PlayerInfo
 from pokemon import WildPokemon
 from utils.constants import CONSTANTS
 from utils.repeatTimer import RepeatTimer
+from utils.scheduler import Scheduler
 from message import Message, MessageTypeEnum
+from utils.messageDispatcher import MessageDispatcher
 from botRules import BotRules
 from utils.pathfinding import *
+from utils.worldGraph import WorldGraph
 from utils.utils import getTimeMillis, getRandomString, stringToMd5
 from utils.notificationHandler import NotificationHandler
+from utils.messageTemplate import MessageTemplate, XtEncoder, xtRequest, STRING, NUMBER, TEXT
 
-from PySide2.QtCore import QObject, Signal
+from PySide2.QtCore import QObject, Signal, Qt
 from PySide2.QtWidgets import QWidget, QMessageBox
 
+# Outbound XML messages, compiled once
+VERSION_MSG = MessageTemplate(["<msg t='sys'><body action='verChk' r='0'><ver v='", (STRING,), "' /></body></msg>\x00"])
+B0_MSG = xtRequest("b0", [("moveNum", NUMBER)])
+B4_MSG = xtRequest("b4", [("command", TEXT)])
+B5_MSG = xtRequest("b5", [("y", NUMBER), ("x", NUMBER), ("map", STRING)])
+B8_MSG = xtRequest("b8", [("amount", NUMBER), ("buyNum", NUMBER)])
+B11_MSG = xtRequest("b11", [("i", STRING), ("p", NUMBER)])
+B14_MSG = xtRequest("b14", spaced=True)
+B17_MSG = xtRequest("b17", spaced=True)
+B18_MSG = xtRequest("b18")
+B19_MSG = xtRequest("b19")
+B26_MSG = xtRequest("b26", signed=False)
+B38_MSG = xtRequest("b38")
+# The clan decline command is a hash, see __handleClanInvite
+CLAN_DECLINE_MSG = xtRequest(None, spaced=True)
+# Movement, facing and mount frames repeat with a handful of values
+XT_ENCODER = XtEncoder(cachedCommands=("m", "f", "f2", "f3", "r", "b191"))
+
 class GameHandler(QObject):
 	infoSignal = Signal(int, int)
 	teamSignal = Signal(object)
@@ -30,12 +53,14 @@ class GameHandler(QObject):
 	connectedSignal = Signal(bool)
 	runningSignal = Signal(bool)
 	mountChanged = Signal(str)
+	# Battles and money so far, pokemon and items added since the last emit
 	historySignal = Signal(int, int, object, object)
+	historyResetSignal = Signal()
 	rockSignal = Signal(object)
 	globalMarketplace = Signal(object)
 	playersSignal = Signal(object)
 
-	def __init__(self, gameVersion, key1, key2, sessionCookie, userAgent, proxy):
+	def __init__(self, gameVersion, key1, key2, sessionCookie, userAgent, proxy, transport="threaded"):
 		super(GameHandler, self).__init__()
 		self.__gameVersion = gameVersion
 		self.__key1 = key1
@@ -43,17 +68,14 @@ class GameHandler(QObject):
 		self.__sessionCookie = sessionCookie
 		self.__userAgent = userAgent
 		self.__proxy = proxy
+		self.__transport = transport
 		self.__startTimeMillis = getTimeMillis()
 
 		# Handles web login and session
 		self.__webSession = WebSession(self.__sessionCookie, self.__userAgent, self.__proxy)
 
 		# Socket used for game connection
-		self.__gameSocket = ThreadedSocket(CONSTANTS.GAME_IP, 
-										   CONSTANTS.GAME_PORT,
-										   self.__proxy)
-		self.__gameSocket.receiveSignal.connect(self.__processInboundData)
-		self.__gameSocket.timeoutSignal.connect(self.__catchTimeout)
+		self.__gameSocket = self.__createSocket()
 
 		# Bot state
 		self.__running = False
@@ -125,6 +147,20 @@ class GameHandler(QObject):
 		self.botWatch = False
 		self.botWatchToken = ''
 
+		# Inbound message handlers before and after the game login
+		self.__loginDispatcher = self.__registerLoginHandlers()
+		self.__gameDispatcher = self.__registerGameHandlers()
+
+	@property
+	def myTurn(self):
+		return self.__myTurn
+
+	@myTurn.setter
+	def myTurn(self, value):
+		# botLoop waits on the player info for its turn
+		self.__myTurn = value
+		self.__playerInfo.notifyStateChanged()
+
 	def toggleLogin(self, username, password):
 		""" Toggles login.
 			
@@ -182,11 +218,7 @@ class GameHandler(QObject):
 		self.__connected = False
 
 		# Socket used for game connection
-		self.__gameSocket = ThreadedSocket(CONSTANTS.GAME_IP, 
-										   CONSTANTS.GAME_PORT,
-										   self.__proxy)
-		self.__gameSocket.receiveSignal.connect(self.__processInboundData)
-		self.__gameSocket.timeoutSignal.connect(self.__catchTimeout)
+		self.__gameSocket = self.__createSocket()
 
 		self.__heartbeat_thread = Thread(target=self.__sendHeartbeat, name="Heartbeat Thread")
 		self.__heartbeat_thread.setDaemon(True)
@@ -229,7 +261,7 @@ class GameHandler(QObject):
 			self.__moneyEarned = 0
 			self.__pokemonEncountered = dict()
 			self.__itemsObtained = dict()
-			self.historySignal.emit(self.__battles, self.__moneyEarned, self.__pokemonEncountered, self.__itemsObtained)
+			self.historyResetSignal.emit()
 		self.__players = dict()
 		self.playersSignal.emit(self.__players)
 
@@ -250,6 +282,16 @@ class GameHandler(QObject):
 			self.__timedOut = True
 			self.disconnect()
 
+	def __catchSendDropped(self, dropped):
+		""" The send queue of the socket is full, it is treated as a timeout.
+
+			Only the first drop of a connection restarts it, the socket
+			goes on dropping frames until then.
+		"""
+		if dropped == 1:
+			self.__logData("<font color='red'>Send queue full, messages are being dropped.</font>")
+			self.__catchTimeout()
+
 	def __initiateBreak(self):
 		self.__logData("Logging out for a break...")
 		if self.__running:
@@ -287,83 +329,85 @@ class GameHandler(QObject):
 			path.pop(0)
 
 		# Walk back timer
-		self.__backToPosTimer = Timer(5, self.walkCommand, args=(path,))
-		self.__backToPosTimer.setDaemon(True)
-		self.__backToPosTimer.start()
+		self.__backToPosTimer = self.__callLater(5, self.walkCommand, path)
 
 		# Restart botting timer
-		self.__sendRulesTimer = Timer(50, self.setRules, [self.__selectedTiles, self.__botRules])
-		self.__sendRulesTimer.setDaemon(True)
-		self.__sendRulesTimer.start()
+		self.__sendRulesTimer = self.__callLater(50, self.setRules, self.__selectedTiles, self.__botRules)
 		
-	def __handleLogin(self, message):
-		if message.getMessageType() == MessageTypeEnum.POLICY:
-			if self.__gameSocket.getShutdownCount() < 1:
-				self.__gameSocket.shutdown()
-				self.__gameSocket.connectSocket()
-				response_timer = Timer(0.2, self.__sendVersion)
-				response_timer.setDaemon(True)
-				response_timer.start()
-
-		elif message.getMessageType() == MessageTypeEnum.MSG:
-			if message.getMessageAction() == 'apiOK':
-				self.__logData("Authenticating...")
-				time.sleep(0.2)
-				self.__gameSocket.sendData(self.__webSession.getLoginString())
-			elif message.getMessageAction() == 'rmList':
-				time.sleep(0.2)
-				self.__gameSocket.sendData(CONSTANTS.GAME_AUTOJOIN_MSG)
-			elif message.getMessageAction() == 'joinOK':
-				self.__logData("Loading Game Data...")
-				response_timer = Timer(0.2, self.__sendB61)
-				response_timer.setDaemon(True)
-				response_timer.start()
-
-		elif message.getMessageType() == MessageTypeEnum.XT:
-			if message.getMessageAction() == 'l' and message.getMessageCode() == '-1':
-				time.sleep(0.2)
-				self.__gameSocket.sendData(CONSTANTS.GAME_RMLIST_MSG)
-			elif message.getMessageAction() == 'r10':
-				self.__playerInfo.parseData(message.getMessageRaw())
-				self.__lastX = self.__playerInfo.getX()
-				self.__lastY = self.__playerInfo.getY()
-				self.__updateXYTimerStart.start()
-				self.__updateXYTimerMap.start()
-				self.__saveDataTimer.start()
-				response_timer = Timer(0.9, self.__sendB74)
-				response_timer.setDaemon(True)
-				response_timer.start()
-			elif message.getMessageAction() == 'b88' and message.getMessageCode() == '-1':
-				if self.__playerInfo.mapCollisions != None:
-					if self.__playerInfo.isPlayerInWater():
-						self.__changeMount("surf")
-					response_timer = Timer(0.2, self.__sendB5)
-					response_timer.setDaemon(True)
-					response_timer.start()
-				else:
-					self.__logData("<font color='red'>ERROR: No map file for: <b>{}</b></font>".format(self.__playerInfo.cleanMapName))
-					self.disconnect()
-			elif message.getMessageAction() == 'b5' and message.getMessageCode() == '-1':
-				self.__sendB55()
-				self.__connected = True
-				self.__heartbeat_thread.start()
-				self.__logData("Connected")
-				self.teamSignal.emit(self.__playerInfo.team)
-				self.inventorySignal.emit(self.__playerInfo.getInventory())
-				keep_data = self.__timedOut or self.__breakTime
-				self.positionSignal.emit(self.__playerInfo.cleanMapName, self.__playerInfo.getX(), self.__playerInfo.getY(), self.__playerInfo.direction, keep_data)
-				self.connectedSignal.emit(True)
-				self.infoSignal.emit(self.__playerInfo.money, self.__playerInfo.credits)
-				self.__handleMapUpdate(message.getMessageRaw())
-				if (self.__playerInfo.getItemIndex("Bike") != -1 and
-					self.__playerInfo.moveType != "surf" and not self.__playerInfo.battle):
-					self.__changeMount("Bike")
-				if self.__timedOut or self.__breakTime:
-					self.__restartBot()
-					self.__timedOut = False
-					self.__breakTime = False
-			elif message.getMessageAction() == "w2":
-				self.__handleNewBattle(message.getMessageRaw())
+	def __registerLoginHandlers(self):
+		dispatcher = MessageDispatcher()
+		dispatcher.register(MessageTypeEnum.POLICY, None, self.__onPolicy)
+		dispatcher.register(MessageTypeEnum.MSG, 'apiOK', self.__onApiOk)
+		dispatcher.register(MessageTypeEnum.MSG, 'rmList', self.__onRoomList)
+		dispatcher.register(MessageTypeEnum.MSG, 'joinOK', self.__onJoinOk)
+		dispatcher.register(MessageTypeEnum.XT, 'l', self.__onLoginOk, '-1')
+		dispatcher.register(MessageTypeEnum.XT, 'r10', self.__onPlayerData)
+		dispatcher.register(MessageTypeEnum.XT, 'b88', self.__onMapLoaded, '-1')
+		dispatcher.register(MessageTypeEnum.XT, 'b5', self.__onLoginMapUpdate, '-1')
+		dispatcher.register(MessageTypeEnum.XT, 'w2', self.__handleNewBattle)
+
+		return dispatcher
+
+	def __onPolicy(self, message):
+		if self.__gameSocket.getShutdownCount() < 1:
+			self.__gameSocket.shutdown()
+			self.__gameSocket.connectSocket()
+			self.__callLater(0.2, self.__sendVersion)
+
+	def __onApiOk(self, message):
+		self.__logData("Authenticating...")
+		time.sleep(0.2)
+		self.__gameSocket.sendData(self.__webSession.getLoginString())
+
+	def __onRoomList(self, message):
+		time.sleep(0.2)
+		self.__gameSocket.sendData(CONSTANTS.GAME_AUTOJOIN_MSG)
+
+	def __onJoinOk(self, message):
+		self.__logData("Loading Game Data...")
+		self.__callLater(0.2, self.__sendB61)
+
+	def __onLoginOk(self, message):
+		time.sleep(0.2)
+		self.__gameSocket.sendData(CONSTANTS.GAME_RMLIST_MSG)
+
+	def __onPlayerData(self, message):
+		self.__playerInfo.parseData(message.fields())
+		self.__lastX = self.__playerInfo.getX()
+		self.__lastY = self.__playerInfo.getY()
+		self.__updateXYTimerStart.start()
+		self.__updateXYTimerMap.start()
+		self.__saveDataTimer.start()
+		self.__callLater(0.9, self.__sendB74)
+
+	def __onMapLoaded(self, message):
+		if self.__playerInfo.mapCollisions != None:
+			if self.__playerInfo.isPlayerInWater():
+				self.__changeMount("surf")
+			self.__callLater(0.2, self.__sendB5)
+		else:
+			self.__logData("<font color='red'>ERROR: No map file for: <b>{}</b></font>".format(self.__playerInfo.cleanMapName))
+			self.disconnect()
+
+	def __onLoginMapUpdate(self, message):
+		self.__sendB55()
+		self.__connected = True
+		self.__startHeartbeat()
+		self.__logData("Connected")
+		self.teamSignal.emit(self.__playerInfo.team)
+		self.inventorySignal.emit(self.__playerInfo.getInventory())
+		keep_data = self.__timedOut or self.__breakTime
+		self.positionSignal.emit(self.__playerInfo.cleanMapName, self.__playerInfo.getX(), self.__playerInfo.getY(), self.__playerInfo.direction, keep_data)
+		self.connectedSignal.emit(True)
+		self.infoSignal.emit(self.__playerInfo.money, self.__playerInfo.credits)
+		self.__handleMapUpdate(message)
+		if (self.__playerInfo.getItemIndex("Bike") != -1 and
+			self.__playerInfo.moveType != "surf" and not self.__playerInfo.battle):
+			self.__changeMount("Bike")
+		if self.__timedOut or self.__breakTime:
+			self.__restartBot()
+			self.__timedOut = False
+			self.__breakTime = False
 
 	def updateProxy(self, proxy):
 		self.__proxy = proxy
@@ -393,157 +437,181 @@ class GameHandler(QObject):
 		if data is not None:
 			message = Message(data)
 			if self.__connected:
-				self.__proccesMessage(message)
+				self.__gameDispatcher.dispatch(message)
 			else:
-				self.__handleLogin(message)
-
-	def __proccesMessage(self, message):
-		if message.getMessageAction() == "pmsg":
-			self.__processPmsg(message.getMessageRaw())
-		elif message.getMessageAction() == "a":
-			self.__handleAddPlayer(message.getMessageRaw().split('`'), True)
-		elif message.getMessageAction() == "b":
-			self.__handleAddPlayer(message.getMessageRaw().split('`'), False)
-		elif message.getMessageAction() == "w":
-			# Wild battle
-			self.__handleNewBattle(message.getMessageRaw())
-		elif message.getMessageAction() == "w2":
-			# Wild battle from previous login
-			self.__handleNewBattle(message.getMessageRaw())
-		elif message.getMessageAction() == "c":
-			self.__handleBattleMoveMessage(message.getMessageRaw().split('`'))
-		elif message.getMessageAction() == "r17":
-			# This part is a little hacky but its needed to prevent
-			# the bot from stopping during a request attack
-			if "Please finish what you are doing first." in message.getMessageRaw().split('`')[4]:
-				if self.__playerInfo.battle and self.__playerInfo.busy:
-					self.__playerInfo.battle = False
-			self.logSignal.emit("<font color='orange'>" + message.getMessageRaw().split('`')[4].replace("FFFFFF", "6a0dad") + "</font>")
-		elif message.getMessageAction() == "xtRes":
-			if message.getXmlCmd() == "askEvolve":
-				if self.__botRules.evolve:
-					self.__logData("Accepting Evolve.")
-					self.__sendB18()
-				else:
-					self.__logData("Denying Evolve")
-					self.__sendB19()
-			elif message.getXmlCmd() == "learnMove":
-				self.__logData("Being prompted to learn new move.")
-				self.__handleLearnMove(int(message.getValue("slot")))
-			elif message.getXmlCmd() == "clanRequest":
-				self.__playerInfo.busy = True
-				self.__logData("<font color='red'>Denying a clan request!</font>")
-				response_timer = Timer(random.randint(2,7), self.__handleClanInvite)
-				response_timer.setDaemon(True)
-				response_timer.start()
-				clan_settings = self.__botRules.clanNotifications()
-				self.__notificationHandler.handleNotification("clan", clan_settings[0] , clan_settings[1])
-			elif message.getXmlCmd() == "updateInventory":
-				inv_data = self.__playerInfo.updateInventoryXML(message.getMessageRaw())
-				self.inventorySignal.emit(self.__playerInfo.getInventory())
-				# Update new items obtained if there are any
-				if len(inv_data[1]) > 0:
-					for item in inv_data[1]:
-						if item in self.__itemsObtained:
-							self.__itemsObtained[item] += inv_data[1][item]
-						else:
-							self.__itemsObtained[item] = inv_data[1][item]
-					self.historySignal.emit(self.__battles, self.__moneyEarned, self.__pokemonEncountered, self.__itemsObtained)
-			elif message.getXmlCmd() == "buyItem":
-				inv_data = self.__playerInfo.updateInventoryXML(message.getMessageRaw())
-				if inv_data[0] != None:
-					self.__logData("<font color='green'>{}.</font>".format(inv_data[0]))
-				self.inventorySignal.emit(self.__playerInfo.getInventory())
-				self.infoSignal.emit(self.__playerInfo.money, self.__playerInfo.credits)
-			elif message.getXmlCmd() == "b2adb2":
-				self.botWatch = True
-				self.botWatchToken = str(message.getValue("a"))
-				self.__botRules.speed = 2
-			elif message.getXmlCmd() == "b2adb2z":
-				self.botWatch = False
-				self.__botRules.speed = 3
-		elif message.getMessageAction() == "ui":
-			# Updating inventory and team
-			split_string = message.getMessageRaw().split('`')
-			self.__playerInfo.updateInventory(split_string[4])
-			self.__playerInfo.updateTeam(split_string[5])
-			self.teamSignal.emit(self.__playerInfo.team)
-			self.inventorySignal.emit(self.__playerInfo.getInventory())
-		elif message.getMessageAction() == "r4" or message.getMessageAction() == "r5":
-			# MarketpalceSearchMessage
-			self.__handleHeldItem(message.getMessageAction(), message.getMessageRaw())
-		elif message.getMessageAction() == "r27":
-			# MarketpalceSearchMessage
-			self.__handleMarketplaceSearchResponse(message.getMessageRaw())
-		elif message.getMessageAction() == "r28":
-			# Marketplace buy message
-			self.__handleMarketplaceBuyResponse(message.getMessageRaw())
-		elif message.getMessageAction() == "r36":
-			# Private message
-			self.__processR36(message.getMessageRaw())
-		elif message.getMessageAction() == "r59":
-			self.__handleClanMessage(message.getMessageRaw())
-		elif message.getMessageAction() == "r62":
-			split_string = message.getMessageRaw().split('`')
-			self.__handleRemovePlayer(split_string[4])
-		elif message.getMessageAction() == "b5":
-			# Map update
-			self.__handleMapUpdate(message.getMessageRaw())
-		elif message.getMessageAction() == "b121":
-			# This mean we are prompted to hook a pokemon
-			self.__fishingTimer.stop()
-			self.hook = True
-		elif message.getMessageAction() == "b86":
-			# Add an item to inventory
-			split_string = message.getMessageRaw().split('`')
-			split_string = split_string[4].split(",")
-			self.__playerInfo.addItemToInventory(split_string[0], int(split_string[1]))
-			if int(split_string[1]) > 0:
-				if split_string[0] in self.__itemsObtained:
-					self.__itemsObtained[split_string[0]] += int(split_string[1])
-				else:
-					self.__itemsObtained[split_string[0]] = int(split_string[1])
-			self.historySignal.emit(self.__battles, self.__moneyEarned, self.__pokemonEncountered, self.__itemsObtained)
-			self.inventorySignal.emit(self.__playerInfo.getInventory())
-		elif message.getMessageAction() == "b87":
-			# Remove an item from inventory
-			split_string = message.getMessageRaw().split('`')
-			split_string = split_string[4].split(",")
-			self.__playerInfo.addItemToInventory(split_string[0], -int(split_string[1]))
-			self.inventorySignal.emit(self.__playerInfo.getInventory())
-		elif message.getMessageAction() == "b95":
-			for pokemon in self.__playerInfo.team:
-				pokemon.currentHealth = pokemon.health
-			self.teamSignal.emit(self.__playerInfo.team)
-		elif message.getMessageAction() == "b164":
-			self.__handleMiningRockDepleted(message.getMessageRaw())
-		elif message.getMessageAction() == "b165":
-			self.__handleMiningRockRestored(message.getMessageRaw())
-		elif message.getMessageAction() == "b179":
-			# This is a battle request
-			self.__playerInfo.busy = True
-			self.__logData("<font color='red'>Denying a battle request!</font>")
-			response_timer = Timer(random.randint(3,9), self.__handleBattleInvite)
-			response_timer.setDaemon(True)
-			response_timer.start()
-			battle_settings = self.__botRules.battleNotifications()
-			self.__notificationHandler.handleNotification("battle", battle_settings[0] , battle_settings[1])
-		elif message.getMessageAction() == "b185":
-			# This is a trade request
-			self.__playerInfo.busy = True
-			self.__logData("<font color='red'>Denying a trade request!</font>")
-			response_timer = Timer(random.randint(2,10), self.__sendB17)
-			response_timer.setDaemon(True)
-			response_timer.start()
-			trade_settings = self.__botRules.tradeNotifications()
-			self.__notificationHandler.handleNotification("trade", trade_settings[0] , trade_settings[1])
-		elif message.getMessageAction() == "userGone":
-			user_id = message.getUserId()
-			if user_id in self.__players:
-				del self.__players[user_id]
-				self.playersSignal.emit(self.__players)
-
-	def __handleAddPlayer(self, data, addBack=False):
+				self.__loginDispatcher.dispatch(message)
+
+	def __registerGameHandlers(self):
+		dispatcher = MessageDispatcher()
+		xt = MessageTypeEnum.XT
+		dispatcher.register(xt, "pmsg", self.__processPmsg)
+		dispatcher.register(xt, "a", partial(self.__handleAddPlayer, addBack=True))
+		dispatcher.register(xt, "b", partial(self.__handleAddPlayer, addBack=False))
+		# Wild battle, w2 is a wild battle from previous login
+		dispatcher.register(xt, "w", self.__handleNewBattle)
+		dispatcher.register(xt, "w2", self.__handleNewBattle)
+		dispatcher.register(xt, "c", self.__handleBattleMoveMessage)
+		dispatcher.register(xt, "r17", self.__onServerMessage)
+		dispatcher.register(xt, "ui", self.__onInventoryAndTeam)
+		dispatcher.register(xt, "r4", self.__handleHeldItem)
+		dispatcher.register(xt, "r5", self.__handleHeldItem)
+		dispatcher.register(xt, "r27", self.__handleMarketplaceSearchResponse)
+		dispatcher.register(xt, "r28", self.__handleMarketplaceBuyResponse)
+		# Private message
+		dispatcher.register(xt, "r36", self.__processR36)
+		dispatcher.register(xt, "r59", self.__handleClanMessage)
+		dispatcher.register(xt, "r62", self.__onRemovePlayer)
+		dispatcher.register(xt, "b5", self.__handleMapUpdate)
+		dispatcher.register(xt, "b121", self.__onHookPrompt)
+		dispatcher.register(xt, "b86", self.__onItemAdded)
+		dispatcher.register(xt, "b87", self.__onItemRemoved)
+		dispatcher.register(xt, "b95", self.__onTeamHealed)
+		dispatcher.register(xt, "b164", self.__handleMiningRockDepleted)
+		dispatcher.register(xt, "b165", self.__handleMiningRockRestored)
+		dispatcher.register(xt, "b179", self.__onBattleRequest)
+		dispatcher.register(xt, "b185", self.__onTradeRequest)
+
+		msg = MessageTypeEnum.MSG
+		dispatcher.register(msg, "xtRes", self.__onAskEvolve, "askEvolve")
+		dispatcher.register(msg, "xtRes", self.__onLearnMove, "learnMove")
+		dispatcher.register(msg, "xtRes", self.__onClanRequest, "clanRequest")
+		dispatcher.register(msg, "xtRes", self.__onUpdateInventory, "updateInventory")
+		dispatcher.register(msg, "xtRes", self.__onBuyItem, "buyItem")
+		dispatcher.register(msg, "xtRes", self.__onBotWatchStart, "b2adb2")
+		dispatcher.register(msg, "xtRes", self.__onBotWatchEnd, "b2adb2z")
+		dispatcher.register(msg, "userGone", self.__onUserGone)
+
+		return dispatcher
+
+	def dispatchStats(self):
+		""" Returns the handler call counts and times of both dispatchers.
+
+			Each is a dict of "type:action[:code or cmd]" to (calls,
+			seconds) plus the number of messages nothing handled.
+		"""
+		return {"login": self.__loginDispatcher.stats(),
+				"game": self.__gameDispatcher.stats()}
+
+	def sendStats(self):
+		""" Returns the game socket's send queue depth and counters."""
+		return self.__gameSocket.sendStats()
+
+	def pendingTimers(self):
+		""" Returns the number of delayed calls waiting on the scheduler."""
+		return Scheduler.instance().pendingCount()
+
+	def __onServerMessage(self, message):
+		# This part is a little hacky but its needed to prevent
+		# the bot from stopping during a request attack
+		text = message.field(4, "")
+		if "Please finish what you are doing first." in text:
+			if self.__playerInfo.battle and self.__playerInfo.busy:
+				self.__playerInfo.battle = False
+		self.logSignal.emit("<font color='orange'>" + text.replace("FFFFFF", "6a0dad") + "</font>")
+
+	def __onAskEvolve(self, message):
+		if self.__botRules.evolve:
+			self.__logData("Accepting Evolve.")
+			self.__sendB18()
+		else:
+			self.__logData("Denying Evolve")
+			self.__sendB19()
+
+	def __onLearnMove(self, message):
+		self.__logData("Being prompted to learn new move.")
+		self.__handleLearnMove(int(message.getValue("slot")))
+
+	def __onClanRequest(self, message):
+		self.__playerInfo.busy = True
+		self.__logData("<font color='red'>Denying a clan request!</font>")
+		self.__callLater(random.randint(2,7), self.__handleClanInvite)
+		clan_settings = self.__botRules.clanNotifications()
+		self.__notificationHandler.handleNotification("clan", clan_settings[0] , clan_settings[1])
+
+	def __onUpdateInventory(self, message):
+		inv_data = self.__playerInfo.updateInventoryXML(message.getXmlRoot())
+		self.inventorySignal.emit(self.__playerInfo.getInventory())
+		# Update new items obtained if there are any
+		if len(inv_data[1]) > 0:
+			self.__addHistory(items=inv_data[1])
+
+	def __onBuyItem(self, message):
+		inv_data = self.__playerInfo.updateInventoryXML(message.getXmlRoot())
+		if inv_data[0] != None:
+			self.__logData("<font color='green'>{}.</font>".format(inv_data[0]))
+		self.inventorySignal.emit(self.__playerInfo.getInventory())
+		self.infoSignal.emit(self.__playerInfo.money, self.__playerInfo.credits)
+
+	def __onBotWatchStart(self, message):
+		self.botWatch = True
+		self.botWatchToken = str(message.getValue("a"))
+		self.__botRules.speed = 2
+
+	def __onBotWatchEnd(self, message):
+		self.botWatch = False
+		self.__botRules.speed = 3
+
+	def __onInventoryAndTeam(self, message):
+		# Updating inventory and team
+		self.__playerInfo.updateInventory(message.field(4))
+		self.__playerInfo.updateTeam(message.field(5))
+		self.teamSignal.emit(self.__playerInfo.team)
+		self.inventorySignal.emit(self.__playerInfo.getInventory())
+
+	def __onRemovePlayer(self, message):
+		self.__handleRemovePlayer(message.field(4))
+
+	def __onHookPrompt(self, message):
+		# This mean we are prompted to hook a pokemon
+		self.__fishingTimer.stop()
+		self.hook = True
+
+	def __onItemAdded(self, message):
+		# Add an item to inventory
+		item, count = message.subFields(4)[:2]
+		count = int(count)
+		self.__playerInfo.addItemToInventory(item, count)
+		if count > 0:
+			self.__addHistory(items={item: count})
+		else:
+			self.__addHistory()
+		self.inventorySignal.emit(self.__playerInfo.getInventory())
+
+	def __onItemRemoved(self, message):
+		# Remove an item from inventory
+		item, count = message.subFields(4)[:2]
+		self.__playerInfo.addItemToInventory(item, -int(count))
+		self.inventorySignal.emit(self.__playerInfo.getInventory())
+
+	def __onTeamHealed(self, message):
+		for pokemon in self.__playerInfo.team:
+			pokemon.currentHealth = pokemon.health
+		self.teamSignal.emit(self.__playerInfo.team)
+
+	def __onBattleRequest(self, message):
+		# This is a battle request
+		self.__playerInfo.busy = True
+		self.__logData("<font color='red'>Denying a battle request!</font>")
+		self.__callLater(random.randint(3,9), self.__handleBattleInvite)
+		battle_settings = self.__botRules.battleNotifications()
+		self.__notificationHandler.handleNotification("battle", battle_settings[0] , battle_settings[1])
+
+	def __onTradeRequest(self, message):
+		# This is a trade request
+		self.__playerInfo.busy = True
+		self.__logData("<font color='red'>Denying a trade request!</font>")
+		self.__callLater(random.randint(2,10), self.__sendB17)
+		trade_settings = self.__botRules.tradeNotifications()
+		self.__notificationHandler.handleNotification("trade", trade_settings[0] , trade_settings[1])
+
+	def __onUserGone(self, message):
+		user_id = message.getUserId()
+		if user_id in self.__players:
+			del self.__players[user_id]
+			self.playersSignal.emit(self.__players)
+
+	def __handleAddPlayer(self, message, addBack=False):
+		data = message.fields()
 		if self.__playerInfo.characterCreated != 0 and addBack:
 			self.__sendB56(data)
 
@@ -568,8 +636,25 @@ class GameHandler(QObject):
 					self.playersSignal.emit(self.__players)
 					return
 
-	def __handleNewBattle(self, data):
-		self.wildPokemon = WildPokemon(data)
+	def __addHistory(self, pokemon=None, items=None):
+		''' Adds encounters and items to the session history.
+
+			Only the counts added here are sent with historySignal, the
+			session widget adds them to what it shows.
+		'''
+		pokemon = pokemon or dict()
+		items = items or dict()
+
+		for name, count in pokemon.items():
+			self.__pokemonEncountered[name] = self.__pokemonEncountered.get(name, 0) + count
+
+		for item, count in items.items():
+			self.__itemsObtained[item] = self.__itemsObtained.get(item, 0) + count
+
+		self.historySignal.emit(self.__battles, self.__moneyEarned, pokemon, items)
+
+	def __handleNewBattle(self, message):
+		self.wildPokemon = WildPokemon(message.fields())
 
 		self.myTurn = True
 		self.__playerInfo.battle = True
@@ -588,26 +673,21 @@ class GameHandler(QObject):
 		elif(self.wildPokemon.elite):
 			name = "[E]" + name
 
-		if name in self.__pokemonEncountered.keys():
-			self.__pokemonEncountered[name] += 1
-		else:
-			self.__pokemonEncountered[name] = 1
-
-		self.historySignal.emit(self.__battles, self.__moneyEarned, self.__pokemonEncountered, self.__itemsObtained)
+		self.__addHistory(pokemon={name: 1})
 		self.__logData("<font color='#06B3F8'><b>Battle! Pokemon:[{}][{}]</b></font>".format(name, self.wildPokemon.level))
 
-	def __handleHeldItem(self, what, message):
-		split_string = message.split("`")
+	def __handleHeldItem(self, message):
+		what = message.getMessageAction()
 		if what == "r4":
-			pokemon = int(split_string[4])
-			item_index = int(split_string[5])
+			pokemon = message.intField(4)
+			item_index = message.intField(5)
 			item = self.__playerInfo.getItem(item_index)
 
 			self.__playerInfo.team[pokemon].item = item
 			self.__playerInfo.addItemToInventory(item, -1)
 			self.__logData("<font color='#00FF08'>Gave {} to {}!</font>".format(item, self.__playerInfo.team[pokemon].name))
 		elif what == "r5":
-			pokemon = int(split_string[4])
+			pokemon = message.intField(4)
 			item = self.__playerInfo.team[pokemon].item
 			self.__playerInfo.addItemToInventory(item, 1)
 			self.__playerInfo.team[pokemon].item = "none"
@@ -650,21 +730,7 @@ class GameHandler(QObject):
 
 	def handleVendorBuy(self, item, count):
 		if self.__connected and not self.__running and not self.__playerInfo.battle:
-			play_time = str(getTimeMillis() - self.__startTimeMillis)
-			packet_key = getRandomString(CONSTANTS.MIN_STRING_LENGTH, CONSTANTS.MAX_STRING_LENGTH)
-			packet_key_crypto = stringToMd5(packet_key + self.__key2 + play_time)
-
-			msg_b8 = ("<msg t='xt'><body action='xtReq' r='1'>" +
-					  "<![CDATA[<dataObj><var n='name' t='s'>PokemonPlanetExt</var>" +
-					  "<var n='cmd' t='s'>b8</var><obj t='o' o='param'>" +
-					  "<var n='amount' t='n'>" + str(count) + "</var>" +
-					  "<var n='buyNum' t='n'>"+ str(item) + "</var>" +
-					  "<var n='pke' t='s'>" + packet_key_crypto + "</var>" +
-					  "<var n='pk' t='s'>" + packet_key + "</var>" +
-					  "<var n='te' t='n'>" + play_time + "</var>" +
-					  "</obj></dataObj>]]></body></msg>\x00")
-
-			self.__gameSocket.sendData(msg_b8)
+			self.__sendXml(B8_MSG, count, item)
 		else:
 			self.__logData("<font color='red'>ERROR: To use vendor you must be logged in and not running/battle.</font>")
 
@@ -679,13 +745,12 @@ class GameHandler(QObject):
 		self.__sendXtMessage("r28", [id])
 
 	def __handleMarketplaceBuyResponse(self, message):
-		split_string = message.split("`")
-		object_type = str(split_string[4])
-		item = split_string[5]
-		count = int(split_string[6])
+		object_type = message.field(4)
+		item = message.field(5)
+		count = message.intField(6)
 		
 		if object_type == "item":
-			money = int(split_string[7])
+			money = message.intField(7)
 			self.__playerInfo.addItemToInventory(item, count)
 			self.__playerInfo.money = money
 
@@ -701,7 +766,7 @@ class GameHandler(QObject):
 		self.__logData("<font color='#00FF08'>Bought {} x{}!</font>".format(item, count))
 
 	def __handleMarketplaceSearchResponse(self, message):
-		results = message.split("`")[4:]
+		results = message.fields()[4:]
 		self.globalMarketplace.emit(results)
 
 	def __handleBattleInvite(self):
@@ -709,23 +774,10 @@ class GameHandler(QObject):
 
 			By hande I mean it denies it.
 		'''
-		play_time = str(getTimeMillis() - self.__startTimeMillis)
-		packet_key = getRandomString(CONSTANTS.MIN_STRING_LENGTH, CONSTANTS.MAX_STRING_LENGTH)
-		packet_key_crypto = stringToMd5(packet_key + self.__key2 + play_time)
-
-		msg_b14 = ("<msg t='xt'> <body action='xtReq' r='1'> <![CDATA[<dataObj>" +
-				   "<var n='name' t='s'>PokemonPlanetExt</var>" +
-				   "<var n='cmd' t='s'>b14</var>" +
-				   "<obj t='o' o='param'>" +
-						"<var n='pke' t='s'>" + packet_key_crypto + "</var>" +
-						"<var n='pk' t='s'>" + packet_key + "</var>" +
-						"<var n='te' t='n'>" + play_time + "</var>" +
-				   "</obj></dataObj>]]></body></msg>\x00")
-
 		if self.botWatch:
 			self.__generateFakeMouseClick(9)
 
-		self.__gameSocket.sendData(msg_b14)
+		self.__sendXml(B14_MSG)
 
 		self.__playerInfo.busy = False
 
@@ -738,19 +790,10 @@ class GameHandler(QObject):
 		# Not sure if this key changes often. It might...
 		cmd = stringToMd5("declineClanInvitekzf76adngjfdgh12m7mdlbfi9proa15gjqp0sd3mo1lk7w90cd" + self.__webSession.getUsername())
 
-		msg_b17 = ("<msg t='xt'> <body action='xtReq' r='1'> <![CDATA[<dataObj>" +
-				   "<var n='name' t='s'>PokemonPlanetExt</var>" +
-				   "<var n='cmd' t='s'>" + cmd +"</var>" +
-				   "<obj t='o' o='param'>" +
-						"<var n='pke' t='s'>" + packet_key_crypto + "</var>" +
-						"<var n='pk' t='s'>" + packet_key + "</var>"
-						"<var n='te' t='n'>" + play_time + "</var>"
-				   "</obj></dataObj>]]></body></msg>\x00")
-
 		if self.botWatch:
 			self.__generateFakeMouseClick(9)
 
-		self.__gameSocket.sendData(msg_b17)
+		self.__sendXml(CLAN_DECLINE_MSG, cmd)
 
 		self.__playerInfo.busy = False
 
@@ -860,7 +903,8 @@ class GameHandler(QObject):
 		else:
 			self.__sendB0(self.__botRules.learnMove)
 
-	def __handleBattleMoveMessage(self, data):
+	def __handleBattleMoveMessage(self, message):
+		data = message.fields()
 		self.__playerInfo.updateTeam(data[12])
 		messages = data[11].split("|")
 		for message in messages:
@@ -924,8 +968,8 @@ class GameHandler(QObject):
 		self.__updateXYTimerMap.stop()
 		self.__updateXYTimerMap.start()
 
-	def __handleMapUpdate(self, data):
-		raw_rock_data = data.split("`")[8]
+	def __handleMapUpdate(self, message):
+		raw_rock_data = message.field(8, "")
 		if len(raw_rock_data) > 0:
 			raw_rock_data = raw_rock_data.replace("[[", "[").replace("]]", "]").replace("],[", "], [").split(", ")
 
@@ -941,9 +985,8 @@ class GameHandler(QObject):
 			if len(rocks) > 0:
 				self.rockSignal.emit(rocks)
 
-	def __handleMiningRockDepleted(self, data):
-		split_string = data.split('`')
-		rock_key = split_string[4] + "," + split_string[5]
+	def __handleMiningRockDepleted(self, message):
+		rock_key = message.field(4) + "," + message.field(5)
 		self.__rocks[rock_key][3] = 0
 
 		self.rockSignal.emit(self.__rocks.values())
@@ -953,9 +996,8 @@ class GameHandler(QObject):
 			self.__miningTimer.stop()
 			self.__playerInfo.currentRock = ''
 
-	def __handleMiningRockRestored(self, data):
-		split_string = data.split('`')
-		rock_key = split_string[4] + "," + split_string[5]
+	def __handleMiningRockRestored(self, message):
+		rock_key = message.field(4) + "," + message.field(5)
 		self.__rocks[rock_key][3] = 1
 		self.rockSignal.emit(self.__rocks.values())
 
@@ -975,9 +1017,7 @@ class GameHandler(QObject):
 			self.__sendB2(move_from, move_to)
 
 			if move_from == 0 or move_to == 1:
-				response_timer = Timer(random.uniform(0.3,0.8), self.__sendB75)
-				response_timer.setDaemon(True)
-				response_timer.start()
+				self.__callLater(random.uniform(0.3,0.8), self.__sendB75)
 
 			if not self.__playerInfo.setActivePokemon():
 				self.__logData("<font color='red'>ERROR: All pokemon seem to be fainted.</font>")
@@ -1000,11 +1040,11 @@ class GameHandler(QObject):
 			self.__logData("<font color='red'>ERROR: Cannot send messaga. Not connected.</font>")
 
 	def __processPmsg(self, message):
-		split_string = message.split('`')
-		uer_type = split_string[4][:3]
-		category = split_string[4][3:6]
-		msg = split_string[4][6:]
-		user = split_string[5]
+		text = message.field(4)
+		uer_type = text[:3]
+		category = text[3:6]
+		msg = text[6:]
+		user = message.field(5)
 		if category == "<l>":
 			location = msg[msg.find("<")+1:msg.find(">")]
 			if location == self.__playerInfo.cleanMapName:
@@ -1013,22 +1053,22 @@ class GameHandler(QObject):
 			self.chatSignal.emit(uer_type, category, user, msg)
 
 	def __handleClanMessage(self, message):
-		split_string = message.split('`')
-		uer_type = split_string[4][:3]
-		msg = split_string[4][3:]
-		user = split_string[5]
+		text = message.field(4)
+		uer_type = text[:3]
+		msg = text[3:]
+		user = message.field(5)
 		self.chatSignal.emit(uer_type, "<cl>", user, msg)
 
 	def __sendClanMessage(self, message):
 		self.__sendXtMessage("b67", [message])
 
 	def __processR36(self, message):
-		split_string = message.split('`')
+		text = message.field(5)
 
-		user = split_string[4]
-		category = split_string[5][0:3]
-		uer_type = split_string[5][:3]
-		msg = split_string[5][3:]
+		user = message.field(4)
+		category = text[0:3]
+		uer_type = text[:3]
+		msg = text[3:]
 		self.chatSignal.emit(uer_type, "<f>", user, msg)
 
 		pm_settings = self.__botRules.pmNotifications()
@@ -1069,17 +1109,11 @@ class GameHandler(QObject):
 		if user == "brody" or user == "anubisius":
 			response = "Well well well... if it isn't " + user + " himself... haha"
 
-		response_timer = Timer(7, self.sendPmsg, [user, response])
-		response_timer.setDaemon(True)
-		response_timer.start()
+		self.__callLater(7, self.sendPmsg, user, response)
 		'''
 
 	def __sendVersion(self):
-		version_msg = ('<msg t=\'sys\'>' + 
-					   '<body action=\'verChk\' r=\'0\'>' +
-					   '<ver v=\'' + self.__gameVersion + '\' />' +
-					   '</body></msg>\x00')
-		self.__gameSocket.sendData(version_msg)
+		self.__sendXml(VERSION_MSG, self.__gameVersion)
 
 	def __sendR(self):
 		""" Sends R message
@@ -1100,69 +1134,20 @@ class GameHandler(QObject):
 
 			This is a chat command.
 		"""
-		play_time = str(getTimeMillis() - self.__startTimeMillis)
-		packet_key = getRandomString(CONSTANTS.MIN_STRING_LENGTH, CONSTANTS.MAX_STRING_LENGTH)
-		packet_key_crypto = stringToMd5(packet_key + self.__key2 + play_time)
-
-
-		msg_b4 =("<msg t='xt'><body action='xtReq' r='1'><![CDATA[<dataObj>" +
-				 "<var n='name' t='s'>PokemonPlanetExt</var>" +
-				 "<var n='cmd' t='s'>b4</var>" +
-				 "<obj t='o' o='param'>" +
-					 "<var n='command' t='s'>" + command + "</var>" +
-					 "<var n='pke' t='s'>" + packet_key_crypto + "</var>" +
-					 "<var n='pk' t='s'>" + packet_key + "</var>" +
-					 "<var n='te' t='n'>" + play_time + "</var>" +
-				 "</obj></dataObj>]]></body></msg>\x00")
-
-		self.__gameSocket.sendData(msg_b4)
+		self.__sendXml(B4_MSG, command)
 
 	def __sendB5(self):
-		play_time = str(getTimeMillis() - self.__startTimeMillis)
-		packet_key = getRandomString(CONSTANTS.MIN_STRING_LENGTH, CONSTANTS.MAX_STRING_LENGTH)
-		packet_key_crypto = stringToMd5(packet_key + self.__key2 + play_time)
-
-		msg_b5 =  ('<msg t=\'xt\'>' +
-						'<body action=\'xtReq\' r=\'1\'>' +
-							'<![CDATA[<dataObj>' +
-								'<var n=\'name\' t=\'s\'>PokemonPlanetExt</var>' +
-								'<var n=\'cmd\' t=\'s\'>b5</var>' +
-								'<obj t=\'o\' o=\'param\'>' +
-									'<var n=\'y\' t=\'n\'>' + str(self.__playerInfo.getY()) + '</var>' +
-									'<var n=\'x\' t=\'n\'>' + str(self.__playerInfo.getX()) + '</var>' +
-									'<var n=\'map\' t=\'s\'>' + self.__playerInfo.cleanMapName + '</var>' +
-									'<var n=\'pke\' t=\'s\'>' + packet_key_crypto + '</var>' +
-									'<var n=\'pk\' t=\'s\'>' + packet_key + '</var>' +
-									'<var n=\'te\' t=\'n\'>' + play_time + '</var>' +
-								'</obj>' +
-							'</dataObj>]]>' +
-						'</body>' +
-					'</msg>\x00')
-
-		self.__gameSocket.sendData(msg_b5)
+		self.__sendXml(B5_MSG, self.__playerInfo.getY(), self.__playerInfo.getX(), self.__playerInfo.cleanMapName)
 
 	def __sendB17(self):
 		""" Sends a B17 message.
 
 			This is to decline a trade.
 		"""
-		play_time = str(getTimeMillis() - self.__startTimeMillis)
-		packet_key = getRandomString(CONSTANTS.MIN_STRING_LENGTH, CONSTANTS.MAX_STRING_LENGTH)
-		packet_key_crypto = stringToMd5(packet_key + self.__key2 + play_time)
-
-		msg_b17 = ("<msg t='xt'> <body action='xtReq' r='1'> <![CDATA[<dataObj>" +
-				   "<var n='name' t='s'>PokemonPlanetExt</var>" +
-				   "<var n='cmd' t='s'>b17</var>" +
-				   "<obj t='o' o='param'>" +
-						"<var n='pke' t='s'>" + packet_key_crypto + "</var>" +
-						"<var n='pk' t='s'>" + packet_key + "</var>"
-						"<var n='te' t='n'>" + play_time + "</var>"
-				   "</obj></dataObj>]]></body></msg>\x00")
-
 		if self.botWatch:
 			self.__generateFakeMouseClick(9)
 
-		self.__gameSocket.sendData(msg_b17)
+		self.__sendXml(B17_MSG)
 
 		self.__playerInfo.busy = False
 
@@ -1243,26 +1228,7 @@ class GameHandler(QObject):
 
 			B0 Message is sent when learning a move.
 		"""
-		play_time = str(getTimeMillis() - self.__startTimeMillis)
-		packet_key = getRandomString(CONSTANTS.MIN_STRING_LENGTH, CONSTANTS.MAX_STRING_LENGTH)
-		packet_key_crypto = stringToMd5(packet_key + self.__key2 + play_time)
-
-		msg_b0 =   ("<msg t='xt'>" +
-					"<body action='xtReq' r='1'>" +
-					"<![CDATA[<dataObj>" +
-						"<var n='name' t='s'>PokemonPlanetExt</var>" +
-						"<var n='cmd' t='s'>b0</var>" +
-						"<obj t='o' o='param'>" +
-							"<var n='moveNum' t='n'>" + str(moveIndex) + "</var>" +
-								"<var n='pke' t='s'>" + packet_key_crypto + "</var>" +
-								"<var n='pk' t='s'>" + packet_key + "</var>" +
-								"<var n='te' t='n'>" + play_time + "</var>" +
-							"</obj>" +
-					"</dataObj>]]>" +
-					"</body>" +
-					"</msg>\x00")
-
-		self.__gameSocket.sendData(msg_b0)
+		self.__sendXml(B0_MSG, moveIndex)
 
 
 	def __sendB11(self, pokemonIndex, itemName):
@@ -1272,52 +1238,14 @@ class GameHandler(QObject):
 			No data verification is done at this point.
 			Meaning whatever is passed in will be sent.
 		"""
-		play_time = str(getTimeMillis() - self.__startTimeMillis)
-		packet_key = getRandomString(CONSTANTS.MIN_STRING_LENGTH, CONSTANTS.MAX_STRING_LENGTH)
-		packet_key_crypto = stringToMd5(packet_key + self.__key2 + play_time)
-
-		msg_b11 =  ('<msg t=\'xt\'>' +
-					'<body action=\'xtReq\' r=\'1\'>' +
-					'<![CDATA[<dataObj>' +
-						'<var n=\'name\' t=\'s\'>PokemonPlanetExt</var>' +
-						'<var n=\'cmd\' t=\'s\'>b11</var>' +
-						'<obj t=\'o\' o=\'param\'>' +
-							'<var n=\'i\' t=\'s\'>' + itemName + '</var>' +
-							'<var n=\'p\' t=\'n\'>' + str(pokemonIndex) + '</var>' +
-							'<var n=\'pke\' t=\'s\'>' + packet_key_crypto +'</var>' +
-							'<var n=\'pk\' t=\'s\'>' + packet_key + '</var>' +
-							'<var n=\'te\' t=\'n\'>' + play_time + '</var>' +
-						'</obj>'
-					'</dataObj>]]>'
-					'</body>'
-				'</msg>\x00')
-
-		self.__gameSocket.sendData(msg_b11)
+		self.__sendXml(B11_MSG, itemName, pokemonIndex)
 
 	def __sendB18(self):
 		""" Sends a b18 message.
 
 			This message is to confirm evolution of a pokemon.
 		"""
-		play_time = str(getTimeMillis() - self.__startTimeMillis)
-		packet_key = getRandomString(CONSTANTS.MIN_STRING_LENGTH, CONSTANTS.MAX_STRING_LENGTH)
-		packet_key_crypto = stringToMd5(packet_key + self.__key2 + play_time)
-
-		msg_b18 =  ("<msg t='xt'>" +
-					"<body action='xtReq' r='1'>" +
-						"<![CDATA[<dataObj>" +
-							"<var n='name' t='s'>PokemonPlanetExt</var>" +
-							"<var n='cmd' t='s'>b18</var>" +
-							"<obj t='o' o='param'>" +
-								"<var n='pke' t='s'>" + packet_key_crypto + "</var>" +
-								"<var n='pk' t='s'>" + packet_key + "</var>" +
-								"<var n='te' t='n'>" + play_time + "</var>" +
-							"</obj>" +
-						"</dataObj>]]>" +
-					"</body>" +
-					"</msg>\x00")
-
-		self.__gameSocket.sendData(msg_b18)
+		self.__sendXml(B18_MSG)
 
 
 	def __sendB19(self):
@@ -1325,59 +1253,13 @@ class GameHandler(QObject):
 
 			This message is to deny evolution of a pokemon.
 		"""
-		play_time = str(getTimeMillis() - self.__startTimeMillis)
-		packet_key = getRandomString(CONSTANTS.MIN_STRING_LENGTH, CONSTANTS.MAX_STRING_LENGTH)
-		packet_key_crypto = stringToMd5(packet_key + self.__key2 + play_time)
-
-		msg_b19 =  ("<msg t='xt'>" +
-					"<body action='xtReq' r='1'>" +
-						"<![CDATA[<dataObj>" +
-							"<var n='name' t='s'>PokemonPlanetExt</var>" +
-							"<var n='cmd' t='s'>b19</var>" +
-							"<obj t='o' o='param'>" +
-								"<var n='pke' t='s'>" + packet_key_crypto + "</var>" +
-								"<var n='pk' t='s'>" + packet_key + "</var>" +
-								"<var n='te' t='n'>" + play_time + "</var>" +
-							"</obj>" +
-						"</dataObj>]]>" +
-					"</body>" +
-					"</msg>\x00")
-
-		self.__gameSocket.sendData(msg_b19)
+		self.__sendXml(B19_MSG)
 
 	def __sendB26(self):
-		msg_b26 =  ('<msg t=\'xt\'>' +
-				   		'<body action=\'xtReq\' r=\'1\'>' +
-					   		'<![CDATA[<dataObj>' +
-						   		'<var n=\'name\' t=\'s\'>PokemonPlanetExt</var>' +
-						   		'<var n=\'cmd\' t=\'s\'>b26</var>' +
-						   		'<obj t=\'o\' o=\'param\'></obj>' +
-					   		'</dataObj>]]>' +
-				   		'</body>' +
-				   	'</msg>\x00')
-
-		self.__gameSocket.sendData(msg_b26)
+		self.__sendXml(B26_MSG)
 
 	def __sendB38(self):
-		play_time = str(getTimeMillis() - self.__startTimeMillis)
-		packet_key = getRandomString(CONSTANTS.MIN_STRING_LENGTH, CONSTANTS.MAX_STRING_LENGTH)
-		packet_key_crypto = stringToMd5(packet_key + self.__key2 + play_time)
-
-		msg_b38 =  ("<msg t='xt'>" +
-					"<body action='xtReq' r='1'>" +
-					"<![CDATA[<dataObj>" +
-						"<var n='name' t='s'>PokemonPlanetExt</var>" +
-						"<var n='cmd' t='s'>b38</var>" +
-						"<obj t='o' o='param'>" +
-							"<var n='pke' t='s'>" + packet_key_crypto +"</var>" +
-							"<var n='pk' t='s'>" + packet_key +"</var>" +
-							"<var n='te' t='n'>" + play_time +"</var>" +
-						"</obj>" +
-					"</dataObj>]]>" +
-					"</body>" +
-					"</msg>\x00")
-
-		self.__gameSocket.sendData(msg_b38)
+		self.__sendXml(B38_MSG)
 
 	def __sendB70(self, rod = "Old Rod"):
 		""" Send a B70 message
@@ -1399,8 +1281,7 @@ class GameHandler(QObject):
 		''' Compose and send a wild battle message'''
 
 		# We're busy with a request so wait until it clears
-		while self.__playerInfo.busy:
-			time.sleep(0.5)
+		self.__waitWhileBusy()
 
 		encrypted_map = stringToMd5(self.__playerInfo.cleanMapName + "dlod02jhznpd02jdhggyambya8201201nfbmj209ahao8rh2pb" + self.__playerInfo.getUsername());
 
@@ -1483,8 +1364,7 @@ class GameHandler(QObject):
 				mount_flag = "s"
 
 		# We're busy with a request so wait until it clears
-		while self.__playerInfo.busy:
-			time.sleep(0.5)
+		self.__waitWhileBusy()
 
 		self.__sendXtMessage("m", [self.__playerInfo.direction[0:1], mount_flag], header=False)
 
@@ -1552,6 +1432,7 @@ class GameHandler(QObject):
 
 	def stopBotting(self):
 		self.__running = False
+		self.__playerInfo.notifyStateChanged()
 		self.runningSignal.emit(False)
 		self.hook = False
 		self.__playerInfo.fishing = 0
@@ -1568,7 +1449,46 @@ class GameHandler(QObject):
 			self.__walk_thread.setDaemon(True)
 			self.__walk_thread.start()
 
+	def walkToLocation(self, mapname, x, y):
+		""" Walks the player to a tile in any map.
+
+			The route across maps is planned on the walk thread, it can
+			load and compile maps the first time.
+		"""
+		if self.__connected:
+			if self.__running:
+				self.__logData("<font color='red'>ERROR: Must stop botting to walk to location!</font>")
+			elif self.__playerInfo.moving or (self.__walk_thread is not None and self.__walk_thread.is_alive()):
+				self.__logData("<font color='red'>ERROR: Must stop moving to walk to location!</font>")
+			else:
+				self.__walk_thread = Thread(target=self.walkToLocationLoop, args=(mapname, x, y), name="Walk Thread")
+				self.__walk_thread.setDaemon(True)
+				self.__walk_thread.start()
+		else:
+			self.__logData("<font color='red'>ERROR: Must be connected to game server to walk to location!</font>")
+
+	def walkToLocationLoop(self, mapname, x, y):
+		""" Plans a route across maps using their exits and walks it."""
+		route = WorldGraph.instance().route(self.__playerInfo.cleanMapName,
+											self.__playerInfo.getX(),
+											self.__playerInfo.getY(),
+											mapname, x, y,
+											self.__playerInfo.isPlayerInWater())
+		if route is not None:
+			self.__logData("<font color='green'>Walking to <b>{}</b> through {} map(s).</font>".format(mapname, len(route)))
+			self.routeLoop(route)
+		else:
+			self.__logData("<font color='red'>ERROR: No route found to <b>{}</b>!</font>".format(mapname))
+
 	def walkLoop(self, directions):
+		self.routeLoop([[self.__playerInfo.cleanMapName, directions]])
+
+	def routeLoop(self, route):
+		""" Walks a list of [map name, directions] segments.
+
+			Stops if the player ends up on a different map than the
+			next segment expects.
+		"""
 		if self.__connected and not self.__running:
 			while self.__playerInfo.battle:
 				if self.__checkHealDuringBattle():
@@ -1578,27 +1498,39 @@ class GameHandler(QObject):
 				self.__randomizedSleep("battlestep")
 
 			self.__playerInfo.moving = True
-			for step in directions:
-				direction = self.__playerInfo.directionOfTile(step[1], step[0])
-				moved = self.__playerInfo.moved(direction, False)
-				if moved:
-					self.__sendMove()
-					self.__sendFakeKeyLog(direction)
-					self.positionSignal.emit(self.__playerInfo.cleanMapName, self.__playerInfo.getX(), self.__playerInfo.getY(), self.__playerInfo.direction,  False)
-					self.__randomizedSleep("walk")
-
-					if self.__playerInfo.isMapExitTile():
-						location = self.__playerInfo.getMapExit()
-						if self.__playerInfo.exitMap(location):
-							self.positionSignal.emit(location[0], location[1], location[2], self.__playerInfo.direction, False)
-							self.__handleMapChange()
-						else:
-							self.__logData("<font color='red'>ERROR: No map file for: <b>{}</b></font>".format(location[0]))
-						break
-				else:
+			for segment in route:
+				if segment[0] != self.__playerInfo.cleanMapName or not self.__walkPath(segment[1]):
 					break
 			self.__playerInfo.moving = False
 
+	def __walkPath(self, directions):
+		""" Walks directions inside the current map.
+
+			Returns True if every step was taken or an exit was used.
+		"""
+		for step in directions:
+			direction = self.__playerInfo.directionOfTile(step[1], step[0])
+			moved = self.__playerInfo.moved(direction, False)
+			if moved:
+				self.__sendMove()
+				self.__sendFakeKeyLog(direction)
+				self.positionSignal.emit(self.__playerInfo.cleanMapName, self.__playerInfo.getX(), self.__playerInfo.getY(), self.__playerInfo.direction,  False)
+				self.__randomizedSleep("walk")
+
+				if self.__playerInfo.isMapExitTile():
+					location = self.__playerInfo.getMapExit()
+					if self.__playerInfo.exitMap(location):
+						self.positionSignal.emit(location[0], location[1], location[2], self.__playerInfo.direction, False)
+						self.__handleMapChange()
+						return True
+					else:
+						self.__logData("<font color='red'>ERROR: No map file for: <b>{}</b></font>".format(location[0]))
+						return False
+			else:
+				return False
+
+		return True
+
 
 	def botLoop(self):
 		# Directions we moved in last, give it priority
@@ -1761,10 +1693,29 @@ class GameHandler(QObject):
 					self.__logData("<font color='red'>STOP! Pokemon in catch list!</font>")
 					self.stopBotting()
 			else:
-				time.sleep(0.1)
+				# Wait for the server to change the battle state
+				self.__playerInfo.waitUntil(self.__canBotAct, 0.5)
 
 		self.stopBotting()
 
+	def __canBotAct(self):
+		''' True when botLoop has something to do, or should stop.'''
+		if not self.__connected or not self.__running:
+			return True
+
+		if self.__playerInfo.busy:
+			return False
+
+		return not self.__playerInfo.battle or self.myTurn
+
+	def __waitWhileBusy(self):
+		''' Blocks until the current request is no longer busy.'''
+		while self.__playerInfo.busy:
+			# The player info is replaced on reconnect, the timeout
+			# makes sure we look at the new one
+			player_info = self.__playerInfo
+			player_info.waitUntil(lambda: not player_info.busy, 1)
+
 	def __handleCatching(self):
 		''' Handle catching wild pokemon.
 
@@ -1852,14 +1803,15 @@ class GameHandler(QObject):
 		highest_effect = 0
 		best_move = 0
 
-		for move in my_pokemon.moves:
+		move_effects = self.wildPokemon.getMovesEffectiveness(my_pokemon.moves)
+
+		for move, effect in zip(my_pokemon.moves, move_effects):
 			# Can't use water move on pokemon with Dry Skin ability
 			if (not (self.wildPokemon.ability.name == "Dry Skin" and move.type.name == "Water") and
 			    not (self.wildPokemon.ability.name == "Sap Sipper" and move.type.name == "Grass") and
 			    not (self.wildPokemon.ability.name == "Lightning Rod" and move.type.name == "Electric") and
 			    not (self.wildPokemon.ability.name == "Levitate" and move.type.name == "Ground") and
 			    not move.name in avoid_moves and move.accuracy >= 85):
-				effect = self.wildPokemon.getEffectiveness(int(move.type.id))
 				power = move.power
 				# Night shade does damage = pokemon level. This is a rough estimate of power.
 				if move.name == "Night Shade":
@@ -2072,6 +2024,39 @@ class GameHandler(QObject):
 			self.__lastY = self.__playerInfo.getY()
 			self.__sendR8()
 
+	def __createSocket(self):
+		""" Creates the game socket for the configured transport.
+
+			"asyncio" runs the connection and heartbeat on the shared
+			event loop thread. Anything else uses the
+			ThreadedSocket with its own receive and send threads.
+		"""
+		if self.__transport == "asyncio":
+			game_socket = AsyncSocket(CONSTANTS.GAME_IP, CONSTANTS.GAME_PORT, self.__proxy)
+		else:
+			game_socket = ThreadedSocket(CONSTANTS.GAME_IP, CONSTANTS.GAME_PORT, self.__proxy)
+
+		game_socket.receiveSignal.connect(self.__processInboundData)
+		game_socket.timeoutSignal.connect(self.__catchTimeout)
+		# Queued, a drop is reported from inside the sender's call
+		game_socket.sendDroppedSignal.connect(self.__catchSendDropped, Qt.QueuedConnection)
+
+		return game_socket
+
+	def __callLater(self, delay, callback, *args):
+		""" Calls callback after delay seconds, used for delayed replies.
+
+			Runs on the shared scheduler thread, returns a handle with
+			cancel() and is_alive().
+		"""
+		return Scheduler.instance().callLater(delay, callback, *args)
+
+	def __startHeartbeat(self):
+		if self.__transport == "asyncio":
+			self.__gameSocket.startHeartbeat(CONSTANTS.GAME_HEARTBEAT_MSG, CONSTANTS.GAME_HEARTBEAT_RATE_SEC)
+		else:
+			self.__heartbeat_thread.start()
+
 	def __sendHeartbeat(self):
 		"""Sends a heartbeat to the server at a predetermined rate
 
@@ -2084,26 +2069,35 @@ class GameHandler(QObject):
 			self.__gameSocket.sendData(CONSTANTS.GAME_HEARTBEAT_MSG)
 			time.sleep(CONSTANTS.GAME_HEARTBEAT_RATE_SEC)
 
+	def __packetSignature(self):
+		""" Returns the pke, pk and te values that sign an xtReq message."""
+		play_time = str(getTimeMillis() - self.__startTimeMillis)
+		packet_key = getRandomString(CONSTANTS.MIN_STRING_LENGTH, CONSTANTS.MAX_STRING_LENGTH)
+		packet_key_crypto = stringToMd5(packet_key + self.__key2 + play_time)
+
+		return (packet_key_crypto, packet_key, play_time)
+
+	def __sendXml(self, template, *values):
+		""" Fills an outbound message template and sends it.
+
+			Signed templates get the packet key values appended.
+		"""
+		if template.signed:
+			values = values + self.__packetSignature()
+
+		self.__gameSocket.sendBytes(template.build(*values))
+
 	def __sendXtMessage(self, msg_id, segments, header=True):
 		''' Sends the xt message.
 
 			Combines all message segments and sends the message.
 		'''
 
-		# Included in every xt message
-		play_time = str(getTimeMillis() - self.__startTimeMillis)
-		packet_key = getRandomString(CONSTANTS.MIN_STRING_LENGTH, CONSTANTS.MAX_STRING_LENGTH)
-		packet_key_crypto = stringToMd5(packet_key + self.__key2 + play_time)
-
-		xt_msg = ''
-
 		if header:
-			xt_msg = '`xt`PokemonPlanetExt`{}`1`{}`{}`{}'.format(msg_id, play_time, packet_key, packet_key_crypto)
+			# Included in every xt message with a header
+			packet_key_crypto, packet_key, play_time = self.__packetSignature()
+			xt_msg = XT_ENCODER.encode(msg_id, segments, (play_time, packet_key, packet_key_crypto))
 		else:
-			xt_msg = '`xt`PokemonPlanetExt`{}`1'.format(msg_id)
-		for segment in segments:
-			xt_msg += '`' + str(segment)
-
-		xt_msg += '`\x00'
+			xt_msg = XT_ENCODER.encode(msg_id, segments)
 
-		self.__gameSocket.sendData(xt_msg)
\ No newline at end of file
+		self.__gameSocket.sendBytes(xt_msg)
\ No newline at end of file
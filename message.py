@@ -8,7 +8,14 @@ class Message():
 		self.__action = None
 		self.__code = None
 		self.__rawData = None
-		self.__cmd = ''
+
+		# Parsed XML body and its var nodes, built on first use
+		self.__xmlParsed = False
+		self.__xmlRoot = None
+		self.__xmlVars = None
+
+		# Backtick separated fields, split once and kept
+		self.__fields = None
 		self.__parse(streamString)
 
 	def __parse(self, streamString):
@@ -29,35 +36,54 @@ class Message():
 		end = streamString.find('\'', start+9, 100)
 		self.__action = streamString[start+8: end]
 
-		self.__cmdFromXml(streamString)
-
 	def __parseXt(self, streamString):
-		split_string = streamString.split('`')
-		self.__action = split_string[2]
-		self.__code = split_string[3]
-
-	def __cmdFromXml(self, data):
-		cleanData = data.replace("<![CDATA[<dataObj>","").replace("</dataObj>]]>","")
-		root = ET.fromstring(cleanData)
-
-		for node in root.iter("var"):
-		    if node.attrib['n'] == "_cmd":
-		    	self.__cmd = node.text
+		# Split once, handlers read the fields from here
+		self.__fields = streamString.split('`')
+		if len(self.__fields) > 3:
+			self.__action = self.__fields[2]
+			self.__code = self.__fields[3]
+
+	def getXmlRoot(self):
+		""" Returns the parsed XML of a MSG message or None.
+
+			The CDATA wrapper around the data object is dropped so its
+			vars are part of the tree. Parsed on first call only, None
+			for other message types or malformed XML.
+		"""
+		if not self.__xmlParsed and self.__type == MessageTypeEnum.MSG:
+			self.__xmlParsed = True
+			clean_data = self.__rawData.replace("<![CDATA[", "").replace("]]>", "")
+			try:
+				self.__xmlRoot = ET.fromstring(clean_data)
+			except ET.ParseError:
+				self.__xmlRoot = None
+
+		return self.__xmlRoot
+
+	def getXmlVars(self):
+		""" Returns a dict of var name to text for every var in the message.
+
+			When a name repeats the first var wins, like getValue did.
+		"""
+		if self.__xmlVars is None:
+			self.__xmlVars = dict()
+			root = self.getXmlRoot()
+			if root is not None:
+				for node in root.iter("var"):
+					self.__xmlVars.setdefault(node.attrib.get('n'), node.text)
+
+		return self.__xmlVars
 
 	def getValue(self, field):
-		cleanData = self.__rawData.replace("<![CDATA[<dataObj>","").replace("</dataObj>]]>","")
-		root = ET.fromstring(cleanData)
-
-		for node in root.iter("var"):
-		    if node.attrib['n'] == field:
-		    	return node.text
+		return self.getXmlVars().get(field)
 
 	def getUserId(self):
 		if self.__action == "userGone":
-			root = ET.fromstring(self.__rawData)
-			return root.find("body//user").attrib['id']
-		else:
-			return -1
+			root = self.getXmlRoot()
+			if root is not None:
+				return root.find("body//user").attrib['id']
+
+		return -1
 
 	def getMessageType(self):
 		return self.__type
@@ -72,7 +98,41 @@ class Message():
 		return self.__rawData
 
 	def getXmlCmd(self):
-		return self.__cmd
+		return self.getXmlVars().get("_cmd") or ''
+
+	def fields(self):
+		""" Returns the backtick separated fields of the raw message.
+
+			XT messages are split once while parsing the header, other
+			messages only if asked. Index 2 is the action and index 3 the
+			code like in the raw string. Callers must not modify the list.
+		"""
+		if self.__fields is None:
+			self.__fields = self.__rawData.split('`')
+
+		return self.__fields
+
+	def fieldCount(self):
+		return len(self.fields())
+
+	def field(self, index, default=None):
+		""" Returns a field as a string or default if it doesn't exist."""
+		fields = self.fields()
+		if index < len(fields):
+			return fields[index]
+
+		return default
+
+	def intField(self, index, default=None):
+		""" Returns a field as an int or default if it is missing or not a number."""
+		try:
+			return int(self.fields()[index])
+		except (IndexError, ValueError):
+			return default
+
+	def subFields(self, index, separator=","):
+		""" Returns a field split on separator, an empty field if missing."""
+		return self.field(index, "").split(separator)
 
 class MessageTypeEnum(Enum):
 	XT = 0
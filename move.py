@@ -1,6 +1,5 @@
-import csv
-
 from type import Type
+from utils.gameData import GameData
 
 class Move():
 
@@ -16,26 +15,15 @@ class Move():
 		self.__setup()
 
 	def __setup(self):
-		file = open('./data/csv/moves.csv')
-		movesList = list(csv.DictReader(file, delimiter=','))
+		name, type_id, power, accuracy, pp = GameData.instance().move(self.id)
 
 		if self.maxpp is None:
-			self.maxpp = movesList[self.id - 1]['pp']
+			self.maxpp = pp
 
 		if self.pp is None:
 			self.pp = self.maxpp
 
-		self.name = movesList[self.id - 1]['identifier'].replace("-", " ").title()
-
-		if movesList[self.id - 1]['power'] != '':
-			self.power = int(movesList[self.id - 1]['power'])
-		else:
-			self.power = 0
-
-
-		if movesList[self.id - 1]['accuracy'] != '':
-			self.accuracy = int(movesList[self.id - 1]['accuracy'])
-		else:
-			self.accuracy = 100
-
-		self.type = Type(int(movesList[self.id - 1]['type_id']))
\ No newline at end of file
+		self.name = name
+		self.power = power
+		self.accuracy = accuracy
+		self.type = Type(type_id)
\ No newline at end of file
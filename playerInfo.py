@@ -1,7 +1,7 @@
 import re
+import threading
 from pokemon import Pokemon
 from utils.mapManager import MapManager
-import xml.etree.ElementTree as ET
 
 from PySide2.QtCore import QObject, Signal
 
@@ -9,6 +9,10 @@ class PlayerInfo(QObject):
 	stepsWalkedSignal = Signal()
 	def __init__(self):
 		super(PlayerInfo, self).__init__()
+
+		# Notified when battle, busy or the turn changes, see waitUntil
+		self.__stateChanged = threading.Condition()
+
 		self.__username = None
 		self.money = 0
 		self.credits = 0
@@ -48,15 +52,48 @@ class PlayerInfo(QObject):
 		self.mapCollisions = [[]]
 		self.selectedTiles = None
 
-	def parseData(self, rawData):
+	@property
+	def battle(self):
+		return self.__battle
+
+	@battle.setter
+	def battle(self, value):
+		with self.__stateChanged:
+			self.__battle = value
+			self.__stateChanged.notify_all()
+
+	@property
+	def busy(self):
+		return self.__busy
+
+	@busy.setter
+	def busy(self, value):
+		with self.__stateChanged:
+			self.__busy = value
+			self.__stateChanged.notify_all()
+
+	def notifyStateChanged(self):
+		""" Wakes up waiters after a change to state kept outside this class."""
+		with self.__stateChanged:
+			self.__stateChanged.notify_all()
+
+	def waitUntil(self, predicate, timeout=None):
+		""" Blocks until predicate() is True or timeout seconds passed.
+
+			The predicate is checked again on every change of battle or
+			busy and on notifyStateChanged(). Returns its last result.
+		"""
+		with self.__stateChanged:
+			return self.__stateChanged.wait_for(predicate, timeout)
+
+	def parseData(self, segments):
 		"""Parse out the user information provided by the server.
 
 		I hate absolutely everything about this message. It is not very
 		clean and easy to parse. Much of the logic below is hardcoded
-		and dirty. 
+		and dirty. Takes the message already split on backticks.
 		"""
 
-		segments = rawData.split('`')
 
 		self.money = int(segments[4])
 		self.credits = int(segments[5])
@@ -142,11 +179,7 @@ class PlayerInfo(QObject):
 		self.activePokemon = self.getNextAlivePokemon()
 
 	def isMapExitTile(self):
-		for exit in self.__mapManager.exits:
-			if exit[0] == self.__x and exit[1] == self.__y:
-				return True
-
-		return False
+		return self.__mapManager.isExit(self.__x, self.__y)
 
 	def getMapExit(self):
 		exit_data = []
@@ -202,11 +235,13 @@ class PlayerInfo(QObject):
 
 
 
-	def updateInventoryXML(self, data):
-		if data is not None:
-			data = data.replace("<![CDATA[","").replace("]]","")
-			root = ET.fromstring(data)
+	def updateInventoryXML(self, root):
+		"""Update the inventory from a parsed updateInventory/buyItem message.
 
+		Takes the root returned by Message.getXmlRoot() so the message
+		isn't parsed again here.
+		"""
+		if root is not None:
 			items = root.findall('.//body/dataObj/obj/obj')
 			temp_items_array = [None] * len(items)
 
@@ -246,7 +281,7 @@ class PlayerInfo(QObject):
 
 			return [temp_msg, new_items]
 
-		return [None, new_items]
+		return [None, dict()]
 
 	def getBattleItems(self):
 		''' Returns a list of all items usable in battle.
@@ -1,9 +1,9 @@
 import math
-import csv
 import ast
 from move import Move
 from ability import Ability
 from type import Type
+from utils.gameData import GameData
 
 class Pokemon():
 
@@ -64,9 +64,8 @@ class Pokemon():
 
 class WildPokemon():
 
-	def __init__(self, dataString):
-		all_data = dataString.split('`')
-		data = all_data[4].split(",")
+	def __init__(self, segments):
+		data = segments[4].split(",")
 		self.currentHp = int(data[0])
 		self.maxHp = int(data[1])
 		self.name = str(data[2])
@@ -81,22 +80,12 @@ class WildPokemon():
 		self.type2 = Type(int(data[11]))
 
 		# Breaking up the multiple arrays. Messy manual work. TODO
-		boost_data = all_data[14].replace("[[","[").replace("]]", "]").replace("],[", "], [").split(", ")
+		boost_data = segments[14].replace("[[","[").replace("]]", "]").replace("],[", "], [").split(", ")
 		if boost_data[4] != "[NaN]":
 			self.sync = int(ast.literal_eval(boost_data[4])[0]) == 1
 		else:
 			self.sync = False
 
-		file = open('./data/csv/effect.csv')
-		reader = csv.DictReader(file, delimiter=',')
-		self.effectDict={}
-
-		for row in reader:
-			if row['damage_type_id'] in self.effectDict:
-				self.effectDict[row['damage_type_id']].append(row['damage_factor'])
-			else:
-				self.effectDict[row['damage_type_id']] = [row['damage_factor']]
-
 	def updateFromCMessage(self, dataString):
 		data = dataString.split(",")
 		self.ailment = data[1]
@@ -105,12 +94,11 @@ class WildPokemon():
 		self.mapHp = int(data[8])
 
 	def getEffectiveness(self, damageType):
-		type_one = int(self.effectDict[str(damageType)][int(self.type.id) - 1])/100
+		return GameData.instance().scoreMoves([int(damageType)], int(self.type.id), int(self.type2.id))[0]
 
-		if self.type2.id == 0:
-			return type_one
-		else:
-			return type_one * (int(self.effectDict[str(damageType)][int(self.type2.id) - 1])/100)
+	def getMovesEffectiveness(self, moves):
+		""" Returns the effectiveness of each move against this pokemon."""
+		return GameData.instance().scoreMoves([int(move.type.id) for move in moves], int(self.type.id), int(self.type2.id))
 
 	def getHpPercent(self):
 		return int((self.currentHp / self.maxHp) * 100)
\ No newline at end of file
@@ -2,22 +2,38 @@ import socket # Python socket
 import socks  # Socket with proxy
 import time
 
-from queue import Queue, Empty
+from queue import Queue, Empty, Full
 from threading import Thread
+from utils.messageFramer import MessageFramer
 
 from PySide2.QtCore import QObject, Signal, QThread
 
 class ThreadedSocket(QThread):
 	receiveSignal = Signal(object)
 	timeoutSignal = Signal()
+	# Frames dropped so far, emitted when the send queue was full
+	sendDroppedSignal = Signal(int)
+
+	RECEIVE_BUFFER_SIZE = 65536
+
+	# Frames waiting to be sent before new ones are dropped
+	SEND_QUEUE_SIZE = 256
+
 	def __init__(self, ip, port, proxy):
 		super(ThreadedSocket, self).__init__()
 		self.__ip = ip
 		self.__port = port
 		self.__proxy = proxy
-		self.__send_queue = Queue()
+		self.__send_queue = Queue(self.SEND_QUEUE_SIZE)
 		self.__connected = False
 		self.__shutdownCount = 0
+
+		# Send statistics
+		self.__bytesSent = 0
+		self.__framesSent = 0
+		self.__writes = 0
+		self.__framesDropped = 0
+		self.__maxQueueDepth = 0
 		
 	def connectSocket(self):
 		# If we're currently connected shut down the socket
@@ -54,7 +70,7 @@ class ThreadedSocket(QThread):
 		if self.__connected:
 			self.__connected = False
 			self.__socket.shutdown(socket.SHUT_RDWR)
-			self.__send_queue = Queue()
+			self.__send_queue = Queue(self.SEND_QUEUE_SIZE)
 
 			self.__shutdownCount = self.__shutdownCount + 1
 			return True
@@ -78,35 +94,51 @@ class ThreadedSocket(QThread):
 		"""Adds data to send queue.
 
 		Data is expected in a string and is encoded when added to queue.
+		The caller never waits, often it is the GUI thread. If the queue
+		is full the send thread is stuck, the data is dropped and
+		sendDroppedSignal is emitted.
 		"""
 
 		# Validate that there is data
 		if dataString is not None:
-			# Add data to queue
-			self.__send_queue.put(dataString.encode())
+			self.sendBytes(dataString.encode())
 
-	def __receive(self):
-		terminatedMessage = ''
-		while self.__connected:
+	def sendBytes(self, data):
+		"""Adds already encoded data to the send queue."""
+		if data is not None:
+			# Add data to queue
 			try:
-				data = self.__socket.recv(4096)
-
-				if len(data) > 0:
-					decoded_data = data.decode("utf-8", "ignore") 
-
-					# Add data to the current stream
-					terminatedMessage = terminatedMessage + decoded_data
+				self.__send_queue.put_nowait(data)
+			except Full:
+				self.__framesDropped = self.__framesDropped + 1
+				self.sendDroppedSignal.emit(self.__framesDropped)
+				return
 
-					# This segment is last in the current stream
-					if decoded_data.endswith('\x00'):
+			depth = self.__send_queue.qsize()
+			if depth > self.__maxQueueDepth:
+				self.__maxQueueDepth = depth
 
-						terminatedMessage = terminatedMessage.split('\x00')
+	def sendStats(self):
+		""" Returns the send queue depth and counters since creation."""
+		return {"queueDepth": self.__send_queue.qsize(),
+				"maxQueueDepth": self.__maxQueueDepth,
+				"framesSent": self.__framesSent,
+				"bytesSent": self.__bytesSent,
+				"writes": self.__writes,
+				"framesDropped": self.__framesDropped}
 
-						for piece in terminatedMessage[:-1]:
-							self.receiveSignal.emit(piece)
+	def __receive(self):
+		# Reused for every recv, frames are cut and decoded straight from it
+		buffer = bytearray(self.RECEIVE_BUFFER_SIZE)
+		framer = MessageFramer()
+		while self.__connected:
+			try:
+				size = self.__socket.recv_into(buffer)
 
-						# Reset the current data stream
-						terminatedMessage = ''
+				if size > 0:
+					# Emit every complete frame as soon as it arrives
+					for message in framer.feed(buffer, size):
+						self.receiveSignal.emit(message)
 			except (socket.timeout, ConnectionAbortedError, ConnectionResetError) as ex:
 				self.timeoutSignal.emit()
 				return
@@ -119,10 +151,24 @@ class ThreadedSocket(QThread):
 		while self.__connected:
 			try:
 				# Get next data in queue, block until there is data
-				data = self.__send_queue.get(block=True, timeout=20)
+				send_queue = self.__send_queue
+				frames = [send_queue.get(block=True, timeout=20)]
+
+				# Take everything else already queued so a burst goes
+				# out in one write instead of one per frame
+				try:
+					while True:
+						frames.append(send_queue.get_nowait())
+				except Empty:
+					pass
 
 				# Use send all to ensure whole message goes through
+				data = b"".join(frames) if len(frames) > 1 else frames[0]
 				self.__socket.sendall(data)
+
+				self.__writes = self.__writes + 1
+				self.__framesSent = self.__framesSent + len(frames)
+				self.__bytesSent = self.__bytesSent + len(data)
 			except Empty:
 				continue
 			except:
@@ -1,4 +1,4 @@
-import csv
+from utils.gameData import GameData
 
 class Type():
 
@@ -10,7 +10,4 @@ class Type():
 			self.__setup()
 
 	def __setup(self):
-		file = open('./data/csv/types.csv')
-		typeList = list(csv.DictReader(file, delimiter=','))
-
-		self.name = typeList[self.id - 1]['identifier'].replace("-", " ").title()
\ No newline at end of file
+		self.name = GameData.instance().typeName(self.id)
\ No newline at end of file
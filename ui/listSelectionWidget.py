@@ -1,5 +1,3 @@
-import csv
-
 from PySide2.QtWidgets import (QWidget, 
 							   QVBoxLayout,
 							   QHBoxLayout,
@@ -8,6 +6,8 @@ from PySide2.QtWidgets import (QWidget,
 							   QPushButton)
 from PySide2.QtCore import Signal, Qt
 
+from utils.gameData import GameData
+
 class ListSelectionWidget(QWidget):
 	listChanges = Signal(object)
 	def __init__(self, secondaryList, secondaryListLabel, title, parent=None):
@@ -44,15 +44,12 @@ class ListSelectionWidget(QWidget):
 		self.__rightLayout.addWidget(self.__secondaryList)
 		self.__rightWidget.setLayout(self.__rightLayout)
 
-		# Load up pokemon csv here. To make this class more generic one
-		# can pass in a file path instead.
-		file = open('./data/csv/pokemon.csv')
-		self.__pokemonList = list(csv.DictReader(file, delimiter=','))
+		# Load up pokemon names here. To make this class more generic one
+		# can pass in a list of names instead.
+		self.__pokemonList = GameData.instance().pokemonNames()
 
 		# Fill up primary list. Make sure not to have double in secondary
-		for pokemon in self.__pokemonList:
-			name = pokemon['identifier'].title()
-
+		for name in self.__pokemonList:
 			if name not in secondaryList:
 				self.__primaryList.addItem(name)
 
@@ -91,8 +88,7 @@ class ListSelectionWidget(QWidget):
 	def __resetLists(self):
 		self.__primaryList.clear()
 		self.__secondaryList.clear()
-		for pokemon in self.__pokemonList:
-			name = pokemon['identifier'].title()
+		for name in self.__pokemonList:
 			self.__primaryList.addItem(name)
 		self.__sortLists()
 
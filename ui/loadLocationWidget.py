@@ -11,6 +11,7 @@ import tomlkit
 
 class LoadLocationWidget(QDialog):
 	loadLocationSignal = Signal(str, int, int)
+	walkLocationSignal = Signal(str, int, int)
 	def __init__(self, parent=None):
 		super(LoadLocationWidget, self).__init__(parent)
 
@@ -35,9 +36,12 @@ class LoadLocationWidget(QDialog):
 		self.__loadButton.clicked.connect(self.__loadLocation)
 		self.__deleteButton = QPushButton("Delete")
 		self.__deleteButton.clicked.connect(self.__deleteLocation)
+		self.__walkButton = QPushButton("Walk There")
+		self.__walkButton.clicked.connect(self.__walkLocation)
 
 		self.__mainLayout.addRow(self.__locationList)
 		self.__mainLayout.addRow(self.__loadButton, self.__deleteButton)
+		self.__mainLayout.addRow(self.__walkButton)
 
 		self.setLayout(self.__mainLayout)
 
@@ -45,6 +49,11 @@ class LoadLocationWidget(QDialog):
 		location = self.settingsDict["locations"][self.__locationDict[self.__locationList.currentItem().text()]]
 		self.loadLocationSignal.emit(str(location[0]), int(location[1]), int(location[2]))
 
+	def __walkLocation(self):
+		if self.__locationList.currentItem() is not None:
+			location = self.settingsDict["locations"][self.__locationDict[self.__locationList.currentItem().text()]]
+			self.walkLocationSignal.emit(str(location[0]), int(location[1]), int(location[2]))
+
 	def __deleteLocation(self):
 		item = self.__locationList.takeItem(self.__locationList.currentRow())
 		if item is not None:
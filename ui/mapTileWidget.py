@@ -1,17 +1,15 @@
 import sys
 from enum import Enum
 
-from PySide2.QtWidgets import QWidget
-from PySide2.QtCore import Signal, QSize
-from PySide2.QtGui import (Qt, 
-                           QPen,
+from PySide2.QtCore import QRect
+from PySide2.QtGui import (Qt,
                            QColor,
                            QPainter,
-                           QPixmap,
-                           QBrush)
+                           QPixmap)
 
 from utils.constants import CONSTANTS
 
+COLOR_DEFAULT = QColor(Qt.lightGray)
 COLOR_NO_MAP = QColor(45,63,81)
 COLOR_WALKABLE = QColor('#8aae92')
 COLOR_WATER = QColor('#beebe9')
@@ -22,163 +20,6 @@ COLOR_CUT_TREE = QColor('#c06c84')
 COLOR_NPC = QColor('#f3c623')
 COLOR_EXIT = QColor('#81f5ff')
 
-class MapTileWidget(QWidget):
-    select = Signal(int, int, bool)
-    walk = Signal(int, int)
-
-    def __init__(self, x, y, type, tile_size, *args, **kwargs):
-        super(MapTileWidget, self).__init__(*args, **kwargs)
-
-        self.setFixedSize(QSize(tile_size, tile_size))
-
-        self.x = x
-        self.y = y
-        self.clickMode = "select"
-        self.type = type
-        self.location = "outside"
-        self.player = False
-        self.playerDirection = "down"
-        self.selected = False
-
-    def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-
-        rectangle = event.rect()
-
-        # Default colors for inner are and outer border
-        outer, inner = Qt.white, Qt.lightGray
-
-        # Figure out which tile this is and assign the color
-        if self.type == TileTypeEnum.NO_MAP.value:
-            inner = COLOR_NO_MAP
-        elif self.type == TileTypeEnum.WALKABLE.value:
-            inner = COLOR_WALKABLE
-        elif self.type == TileTypeEnum.BLOCKED.value:
-            inner = COLOR_BLOCKED
-        elif self.type == TileTypeEnum.WATER.value:
-            inner = COLOR_WATER
-        elif self.type == TileTypeEnum.GRASS.value:
-            inner = COLOR_GRASS
-        elif self.type == TileTypeEnum.LEDGE_DOWN.value:
-            inner = COLOR_LEDGE
-        elif self.type == TileTypeEnum.LEDGE_LEFT.value:
-            inner = COLOR_LEDGE
-        elif self.type == TileTypeEnum.LEDGE_RIGHT.value:
-            inner = COLOR_LEDGE
-        elif self.type == TileTypeEnum.CUT_TREE.value:
-            inner = COLOR_CUT_TREE
-        elif self.type == TileTypeEnum.NPC.value:
-            inner = COLOR_NPC
-        elif self.type == TileTypeEnum.EXIT.value:
-            inner = COLOR_EXIT
-
-        pen = QPen(outer)
-        pen.setWidth(0)
-        painter.setPen(Qt.NoPen)
-        painter.fillRect(rectangle, QBrush(inner))
-        if self.type != TileTypeEnum.NO_MAP.value:
-            if self.location == "indoors":
-                painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_INDOOR_FLOOR))
-                if self.type == TileTypeEnum.BLOCKED.value:
-                    painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_INDOOR_BLOCK))
-            elif self.location == "outside":
-                painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_SHORT_GRASS))
-                if self.type == TileTypeEnum.BLOCKED.value:
-                    painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_OUTSIDE_BLOCK))
-            elif self.location == "cave":
-                painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_CAVE_FLOOR))
-                if self.type == TileTypeEnum.BLOCKED.value:
-                    painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_CAVE_BLOCK))
-
-        if self.type == TileTypeEnum.WATER.value:
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_WATER))
-        elif self.type == TileTypeEnum.GRASS.value and self.location == "outside":
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_GRASS))
-        elif self.type == TileTypeEnum.EXIT.value:
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_EXIT))
-        elif self.type == TileTypeEnum.CUT_TREE.value:
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_CUT_TREE))
-        elif self.type == TileTypeEnum.NPC.value:
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_NPC))
-        elif self.type == TileTypeEnum.LEDGE_DOWN.value:
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_LEDGE_DOWN))
-        elif self.type == TileTypeEnum.LEDGE_RIGHT.value:
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_LEDGE_RIGHT))
-        elif self.type == TileTypeEnum.LEDGE_LEFT.value:
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_LEDGE_LEFT))
-        elif self.type == TileTypeEnum.RED_ROCK.value:
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_ROCK_RED))
-        elif self.type == TileTypeEnum.BLUE_ROCK.value:
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_ROCK_BLUE))
-        elif self.type == TileTypeEnum.GREEN_ROCK.value:
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_ROCK_GREEN))
-        elif self.type == TileTypeEnum.PRISM_ROCK.value:
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_ROCK_PRISM))
-        elif self.type == TileTypeEnum.PALE_ROCK.value:
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_ROCK_PALE))
-        elif self.type == TileTypeEnum.DARK_ROCK.value:
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_ROCK_DARK))
-        elif self.type == TileTypeEnum.RAINBOW_ROCK.value:
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_ROCK_RAINBOW))
-        elif self.type == TileTypeEnum.EMPTY_ROCK.value:
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_ROCK_EMPTY))
-
-        if self.selected:
-            painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_POKEBALL))
-        if self.player:
-            if self.playerDirection == "down":
-                painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_PLAYER_DOWN))
-            elif self.playerDirection == "up":
-                painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_PLAYER_UP))
-            elif self.playerDirection == "right":
-                painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_PLAYER_RIGHT))
-            elif self.playerDirection == "left":
-                painter.drawPixmap(rectangle, QPixmap(CONSTANTS.IMG_PLAYER_LEFT))
-
-        painter.drawRect(rectangle)
-        painter.end()
-
-    def setType(self, type):
-        self.type = type
-
-    def setLocation(self, location):
-        self.location = location
-
-    def setClickMode(self, mode):
-        self.clickMode = mode
-
-    def setPlayer(self, player, direction="down"):
-        self.player = player
-        self.playerDirection = direction
-
-    def setCoords(self, x, y):
-        self.x = x
-        self.y = y
-
-    def setSelected(self, selected):
-        self.selected = selected
-
-    def getCoordsString(self):
-        return str(self.x) + "," + str(self.y)
-
-    def click(self):
-        if (self.type == TileTypeEnum.WALKABLE.value or 
-            self.type == TileTypeEnum.GRASS.value or 
-            self.type == TileTypeEnum.WATER.value or
-            self.type == TileTypeEnum.EXIT.value or 
-            self.type == TileTypeEnum.CUT_TREE.value):
-            if self.clickMode == "select":
-                self.selected = not self.selected
-                self.select.emit(self.x, self.y, self.selected)
-            else:
-                self.walk.emit(self.x, self.y)
-            self.update()
-
-    def mouseReleaseEvent(self, e):
-        if (e.button() == Qt.LeftButton):
-            self.click()
-
 class TileTypeEnum(Enum):
     NO_MAP = -1
     WALKABLE = 0
@@ -198,4 +39,128 @@ class TileTypeEnum(Enum):
     PALE_ROCK = 104
     DARK_ROCK = 105
     RAINBOW_ROCK = 106
-    EMPTY_ROCK = 107
\ No newline at end of file
+    EMPTY_ROCK = 107
+
+
+# Tiles which can be selected for botting or walked to
+CLICKABLE_TILES = frozenset([TileTypeEnum.WALKABLE.value,
+                             TileTypeEnum.GRASS.value,
+                             TileTypeEnum.WATER.value,
+                             TileTypeEnum.EXIT.value,
+                             TileTypeEnum.CUT_TREE.value])
+
+# Color under the sprites of each tile type, others use COLOR_DEFAULT
+TILE_COLORS = {TileTypeEnum.NO_MAP.value: COLOR_NO_MAP,
+               TileTypeEnum.WALKABLE.value: COLOR_WALKABLE,
+               TileTypeEnum.BLOCKED.value: COLOR_BLOCKED,
+               TileTypeEnum.WATER.value: COLOR_WATER,
+               TileTypeEnum.GRASS.value: COLOR_GRASS,
+               TileTypeEnum.LEDGE_DOWN.value: COLOR_LEDGE,
+               TileTypeEnum.LEDGE_LEFT.value: COLOR_LEDGE,
+               TileTypeEnum.LEDGE_RIGHT.value: COLOR_LEDGE,
+               TileTypeEnum.CUT_TREE.value: COLOR_CUT_TREE,
+               TileTypeEnum.NPC.value: COLOR_NPC,
+               TileTypeEnum.EXIT.value: COLOR_EXIT}
+
+# Floor and blocked sprite of each location
+LOCATION_SPRITES = {"indoors": ("IMG_INDOOR_FLOOR", "IMG_INDOOR_BLOCK"),
+                    "outside": ("IMG_SHORT_GRASS", "IMG_OUTSIDE_BLOCK"),
+                    "cave": ("IMG_CAVE_FLOOR", "IMG_CAVE_BLOCK")}
+
+# Sprite drawn over the floor of each tile type
+TILE_SPRITES = {TileTypeEnum.WATER.value: "IMG_WATER",
+                TileTypeEnum.GRASS.value: "IMG_GRASS",
+                TileTypeEnum.EXIT.value: "IMG_EXIT",
+                TileTypeEnum.CUT_TREE.value: "IMG_CUT_TREE",
+                TileTypeEnum.NPC.value: "IMG_NPC",
+                TileTypeEnum.LEDGE_DOWN.value: "IMG_LEDGE_DOWN",
+                TileTypeEnum.LEDGE_RIGHT.value: "IMG_LEDGE_RIGHT",
+                TileTypeEnum.LEDGE_LEFT.value: "IMG_LEDGE_LEFT",
+                TileTypeEnum.RED_ROCK.value: "IMG_ROCK_RED",
+                TileTypeEnum.BLUE_ROCK.value: "IMG_ROCK_BLUE",
+                TileTypeEnum.GREEN_ROCK.value: "IMG_ROCK_GREEN",
+                TileTypeEnum.PRISM_ROCK.value: "IMG_ROCK_PRISM",
+                TileTypeEnum.PALE_ROCK.value: "IMG_ROCK_PALE",
+                TileTypeEnum.DARK_ROCK.value: "IMG_ROCK_DARK",
+                TileTypeEnum.RAINBOW_ROCK.value: "IMG_ROCK_RAINBOW",
+                TileTypeEnum.EMPTY_ROCK.value: "IMG_ROCK_EMPTY"}
+
+PLAYER_SPRITES = {"down": "IMG_PLAYER_DOWN",
+                  "up": "IMG_PLAYER_UP",
+                  "right": "IMG_PLAYER_RIGHT",
+                  "left": "IMG_PLAYER_LEFT"}
+
+class TileSprites():
+    """ Map tile sprites converted to pixmaps of one tile size.
+
+        Each CONSTANTS.IMG_* image is converted and scaled once, when
+        first used. The color, floor, blocked and type sprite layers
+        of a tile only depend on its type and the map location, so
+        they are composited once into one pixmap per pair. A paint
+        then draws that pixmap plus the selection ball and player.
+        Make a new TileSprites when the tile size or pixel ratio
+        changes, see matches().
+    """
+    def __init__(self, tileSize, pixelRatio=1.0):
+        self.tileSize = tileSize
+        self.pixelRatio = pixelRatio
+
+        # Sprite name -> scaled pixmap
+        self.__sprites = dict()
+
+        # (tile type, location) -> composited pixmap
+        self.__tiles = dict()
+
+    def matches(self, tileSize, pixelRatio):
+        return self.tileSize == tileSize and self.pixelRatio == pixelRatio
+
+    def sprite(self, name):
+        pixmap = self.__sprites.get(name)
+        if pixmap is None:
+            size = int(round(self.tileSize * self.pixelRatio))
+            pixmap = QPixmap.fromImage(getattr(CONSTANTS, name)).scaled(size, size)
+            pixmap.setDevicePixelRatio(self.pixelRatio)
+            self.__sprites[name] = pixmap
+
+        return pixmap
+
+    def tile(self, tile_type, location):
+        key = (tile_type, location)
+        pixmap = self.__tiles.get(key)
+        if pixmap is None:
+            pixmap = self.__compositeTile(tile_type, location)
+            self.__tiles[key] = pixmap
+
+        return pixmap
+
+    def __compositeTile(self, tile_type, location):
+        size = int(round(self.tileSize * self.pixelRatio))
+        pixmap = QPixmap(size, size)
+        pixmap.setDevicePixelRatio(self.pixelRatio)
+        pixmap.fill(TILE_COLORS.get(tile_type, COLOR_DEFAULT))
+
+        painter = QPainter(pixmap)
+        rectangle = QRect(0, 0, self.tileSize, self.tileSize)
+
+        if tile_type != TileTypeEnum.NO_MAP.value and location in LOCATION_SPRITES:
+            floor, block = LOCATION_SPRITES[location]
+            painter.drawPixmap(rectangle, self.sprite(floor))
+            if tile_type == TileTypeEnum.BLOCKED.value:
+                painter.drawPixmap(rectangle, self.sprite(block))
+
+        # Tall grass is only drawn outside
+        if tile_type in TILE_SPRITES and (tile_type != TileTypeEnum.GRASS.value or location == "outside"):
+            painter.drawPixmap(rectangle, self.sprite(TILE_SPRITES[tile_type]))
+
+        painter.end()
+
+        return pixmap
+
+    def paint(self, painter, rectangle, tile_type, location, selected=False, player=False, direction="down"):
+        """ Paints one map tile into rectangle with an active painter."""
+        painter.drawPixmap(rectangle, self.tile(tile_type, location))
+
+        if selected:
+            painter.drawPixmap(rectangle, self.sprite("IMG_POKEBALL"))
+        if player and direction in PLAYER_SPRITES:
+            painter.drawPixmap(rectangle, self.sprite(PLAYER_SPRITES[direction]))
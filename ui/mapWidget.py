@@ -1,41 +1,35 @@
 import sys
 import time
 
-from PySide2.QtWidgets import QWidget, QGridLayout, QDesktopWidget, QHBoxLayout
-from PySide2.QtCore import Signal, QEvent, Qt
+from PySide2.QtWidgets import QWidget, QDesktopWidget
+from PySide2.QtCore import Signal, Qt, QRect
+from PySide2.QtGui import QPainter
 from math import ceil
 
-from ui.mapTileWidget import MapTileWidget, TileTypeEnum
+from ui.mapTileWidget import TileTypeEnum, TileSprites, CLICKABLE_TILES
 from utils.constants import CONSTANTS
 from utils.mapManager import MapManager
 from utils.pathfinding import *
 
 class MapWidget(QWidget):
-	walkCommandSignal = Signal(object)
-	def __init__(self, parent):
-		super(MapWidget, self).__init__(parent)
+	""" View of the map around the player.
 
-		self.__contentLayout = QHBoxLayout()
-		self.__contentLayout.setSpacing(0)
-		self.__contentLayout.setMargin(0)
+		The visible tiles are painted by this one widget in a single
+		pass, only the ones inside the area Qt asks to repaint. Clicks
+		are mapped back to a tile here as well, to select it for
+		botting or walk to it.
 
-		# Holds the map grid
-		self.__boardContainer = QWidget()
-		self.__leftSpace = QWidget()
-		self.__rightSpace = QWidget()
-
-		self.__contentLayout.addWidget(self.__leftSpace)
-		self.__contentLayout.addWidget(self.__boardContainer)
-		self.__contentLayout.addWidget(self.__rightSpace)
+		A one tile step scrolls what is already drawn and only works
+		out and repaints the row or column that came into view, plus
+		the player. Anything else redraws the whole view.
+	"""
+	walkCommandSignal = Signal(object)
 
-		# Create new grid with no spacing
-		self.__grid = QGridLayout()
-		self.__grid.setSpacing(0)
-		self.__grid.setMargin(2)
-		self.__boardContainer.setLayout(self.__grid)
+	# Space around the tiles
+	MARGIN = 2
 
-		# Apply the new grid
-		self.setLayout(self.__contentLayout)
+	def __init__(self, parent):
+		super(MapWidget, self).__init__(parent)
 
 		self.__playerX = 0
 		self.__playerY = 0
@@ -44,51 +38,44 @@ class MapWidget(QWidget):
 		self.__mapWidth = 0
 		self.__mapHeight = 0
 		self.__mapName = None
-		self.__tiles = []
+		self.__location = "outside"
+		self.__clickMode = "select"
 		self.__selected = dict()
 
+		# Visible tiles by column then row, [type, selected]
+		self.__view = []
+
+		# Player position the view was drawn for, None to redraw it all
+		self.__drawnMap = None
+		self.__drawnX = 0
+		self.__drawnY = 0
+
+		# Top left corner of the tiles in the widget
+		self.__originX = self.MARGIN
+		self.__originY = self.MARGIN
+
 		screen_resolution = QDesktopWidget().screenGeometry(-1)
 		self.tileSize = int((screen_resolution.height() / 1.85) / CONSTANTS.WIDGET_MAP_VIEW_HEIGHT)
 		self.horizontalTiles = CONSTANTS.WIDGET_MAP_VIEW_WIDTH
+		self.__sprites = TileSprites(self.tileSize, self.devicePixelRatioF())
+
+		self.setMinimumSize(CONSTANTS.WIDGET_MAP_VIEW_WIDTH * self.tileSize + 2 * self.MARGIN,
+							CONSTANTS.WIDGET_MAP_VIEW_HEIGHT * self.tileSize + 2 * self.MARGIN)
 
 		self.__mapManager = MapManager()
 		self.__mapCollisions = [[]]
 		self.initTiles()
 
 	def initTiles(self):
-		for x in range(0, self.horizontalTiles):
-			self.__tiles.append([])
-			for y in range(0, CONSTANTS.WIDGET_MAP_VIEW_HEIGHT):
-				tile = MapTileWidget(x, y, -1, self.tileSize)
-				tile.select.connect(self.__tileUpdated)
-				tile.walk.connect(self.__walkIssued)
-				self.__tiles[x].append(tile)
-				self.__grid.addWidget(tile, y, x)
+		""" Shows every visible tile as outside of the map."""
+		self.__view = [[[TileTypeEnum.NO_MAP.value, False] for y in range(0, CONSTANTS.WIDGET_MAP_VIEW_HEIGHT)]
+					   for x in range(0, self.horizontalTiles)]
+		self.__drawnMap = None
+		self.update()
 
 	def resizeGrid(self, new_tile_count):
-		if new_tile_count > self.horizontalTiles:
-
-			x = new_tile_count - (new_tile_count - len(self.__tiles))
-
-			while len(self.__tiles) <= new_tile_count:
-				self.__tiles.append([])
-				for y in range(0, CONSTANTS.WIDGET_MAP_VIEW_HEIGHT):
-					tile = MapTileWidget(x, y, -1, self.tileSize)
-					tile.select.connect(self.__tileUpdated)
-					tile.walk.connect(self.__walkIssued)
-					self.__tiles[x].append(tile)
-					self.__grid.addWidget(tile, y, x)
-				x += 1
-		elif new_tile_count < self.horizontalTiles:
-			x = new_tile_count
-			while len(self.__tiles) > new_tile_count:
-				tile_column = self.__tiles.pop()
-				for atile in tile_column:
-					self.__grid.removeWidget(atile)
-					atile.deleteLater()
-					del atile
-
 		self.horizontalTiles = new_tile_count
+		self.initTiles()
 
 	def resizeEvent(self, event):
 
@@ -104,10 +91,15 @@ class MapWidget(QWidget):
 				if self.__playerX != 0 and self.__playerY != 0:
 					self.drawMap()
 
+		# Keep the tiles centered
+		self.__originX = max(self.MARGIN, int((self.width() - self.horizontalTiles * self.tileSize) / 2))
+		self.__originY = max(self.MARGIN, int((self.height() - CONSTANTS.WIDGET_MAP_VIEW_HEIGHT * self.tileSize) / 2))
+
 	def __changeMap(self, mapName, timeout):
-		if self.__mapManager.map(mapName) is not None:
+		map_collisions = self.__mapManager.map(mapName)
+		if map_collisions is not None:
 			self.__mapName = mapName
-			self.__mapCollisions = self.__mapManager.map(mapName)
+			self.__mapCollisions = map_collisions
 			if not timeout:
 				self.__selected.clear()
 			self.__mapWidth = self.__mapManager.width(mapName)
@@ -118,6 +110,7 @@ class MapWidget(QWidget):
 	def addRocks(self, rocks):
 		self.__mapManager.addRocks(rocks)
 		self.__mapCollisions = self.__mapManager.collision
+		self.__drawnMap = None
 		self.drawMap()
 
 	def updatePosition(self, map, x, y, direction, timeout):
@@ -128,7 +121,6 @@ class MapWidget(QWidget):
 			self.__mapWidth = 0
 			self.__mapHeight = 0
 			self.__mapName = None
-			self.__tiles = []
 			if not timeout:
 				self.__selected = dict()
 			self.__mapCollisions = [[]]
@@ -157,62 +149,155 @@ class MapWidget(QWidget):
 			self.__selected[coordKey] = True
 
 	def setClickMode(self, mode):
-		for x in range(0, self.horizontalTiles):
-			for y in range(0, CONSTANTS.WIDGET_MAP_VIEW_HEIGHT):
-				self.__tiles[x][y].setClickMode(mode)
+		self.__clickMode = mode
 
 	def setMount(self, mount):
 		self.__playerMount = mount
 
-	def drawMap(self):
-		widthCenter = int(self.horizontalTiles/2)
-		heightCenter = int(CONSTANTS.WIDGET_MAP_VIEW_HEIGHT/2)
+	def __center(self):
+		return int(self.horizontalTiles/2), int(CONSTANTS.WIDGET_MAP_VIEW_HEIGHT/2)
 
-		for x in range(0, self.horizontalTiles):
-			for y in range(0, CONSTANTS.WIDGET_MAP_VIEW_HEIGHT):
-				offsetX = 0
-				offsetY = 0
+	def __tileRect(self, x, y):
+		return QRect(self.__originX + x * self.tileSize, self.__originY + y * self.tileSize,
+					 self.tileSize, self.tileSize)
 
-				if(x == widthCenter and y == heightCenter):
-					self.__tiles[x][y].setPlayer(True, self.__direction)
-				else:
-					self.__tiles[x][y].setPlayer(False)
+	def __boardRect(self):
+		return QRect(self.__originX, self.__originY,
+					 self.horizontalTiles * self.tileSize, CONSTANTS.WIDGET_MAP_VIEW_HEIGHT * self.tileSize)
 
-				if x < widthCenter:
-					offsetX = -(widthCenter - x)
-				else:
-					offsetX = x - widthCenter
+	def __viewTile(self, trueX, trueY):
+		""" Returns [type, selected] of a map tile for the view."""
+		if ((trueX < 0) or (trueX > self.__mapWidth) or
+		    (trueY < 0) or (trueY > self.__mapHeight)):
+			return [TileTypeEnum.NO_MAP.value, False]
 
-				if y < heightCenter:
-					offsetY = -(heightCenter - y)
-				else:
-					offsetY = y - heightCenter
+		if self.__mapManager.isExit(trueX, trueY):
+			tile_type = TileTypeEnum.EXIT.value
+		else:
+			tile_type = self.__mapCollisions[trueY][trueX]
 
-				trueX = self.__playerX + offsetX
-				trueY = self.__playerY + offsetY
+		return [tile_type, str(trueX) + "," + str(trueY) in self.__selected]
 
-				if ((trueX < 0) or (trueX > self.__mapWidth) or 
-				    (trueY < 0) or (trueY > self.__mapHeight)):
-					self.__tiles[x][y].setType(TileTypeEnum.NO_MAP.value)
-					self.__tiles[x][y].setCoords(-1, -1)
-					self.__tiles[x][y].setSelected(False)
-				else:
-					tile_type = self.__mapCollisions[trueY][trueX]
-
-					for exit in self.__mapManager.exits:
-						if exit[0] == trueX and exit[1] == trueY:
-							tile_type = TileTypeEnum.EXIT.value
-							
-					self.__tiles[x][y].setType(tile_type)
-					self.__tiles[x][y].setLocation(self.__mapManager.location)
-					self.__tiles[x][y].setCoords(trueX, trueY)
-					if self.__tiles[x][y].getCoordsString() in self.__selected:
-						self.__tiles[x][y].setSelected(True)
-					else:
-						self.__tiles[x][y].setSelected(False)
+	def drawMap(self):
+		widthCenter, heightCenter = self.__center()
+		stepX = self.__playerX - self.__drawnX
+		stepY = self.__playerY - self.__drawnY
+
+		if self.__drawnMap is not None and self.__drawnMap == self.__mapName and abs(stepX) + abs(stepY) <= 1:
+			if stepX != 0 or stepY != 0:
+				self.__scrollView(stepX, stepY)
+			else:
+				# Only turned around
+				self.update(self.__tileRect(widthCenter, heightCenter))
+			return
+
+		self.__location = self.__mapManager.location
+
+		for x in range(0, self.horizontalTiles):
+			column = self.__view[x]
+			trueX = self.__playerX + x - widthCenter
+			for y in range(0, CONSTANTS.WIDGET_MAP_VIEW_HEIGHT):
+				column[y] = self.__viewTile(trueX, self.__playerY + y - heightCenter)
+
+		self.__drawnMap = self.__mapName
+		self.__drawnX = self.__playerX
+		self.__drawnY = self.__playerY
 
 		self.update()
 
+	def __scrollView(self, stepX, stepY):
+		""" Moves the view one tile, only the new edge is worked out."""
+		widthCenter, heightCenter = self.__center()
+		height = CONSTANTS.WIDGET_MAP_VIEW_HEIGHT
+
+		if stepX != 0:
+			# Column that came into view
+			x = self.horizontalTiles - 1 if stepX > 0 else 0
+			trueX = self.__playerX + x - widthCenter
+			column = [self.__viewTile(trueX, self.__playerY + y - heightCenter) for y in range(0, height)]
+			if stepX > 0:
+				self.__view.pop(0)
+				self.__view.append(column)
+			else:
+				self.__view.pop()
+				self.__view.insert(0, column)
+		else:
+			# Row that came into view
+			y = height - 1 if stepY > 0 else 0
+			trueY = self.__playerY + y - heightCenter
+			for x in range(0, self.horizontalTiles):
+				tile = self.__viewTile(self.__playerX + x - widthCenter, trueY)
+				if stepY > 0:
+					self.__view[x].pop(0)
+					self.__view[x].append(tile)
+				else:
+					self.__view[x].pop()
+					self.__view[x].insert(0, tile)
+
+		self.__drawnX = self.__playerX
+		self.__drawnY = self.__playerY
+
+		# Qt moves the drawn pixels and repaints the uncovered edge.
+		# The player is drawn on the center tile, repaint that and the
+		# tile the old player picture was scrolled to.
+		self.scroll(-stepX * self.tileSize, -stepY * self.tileSize, self.__boardRect())
+		self.update(self.__tileRect(widthCenter, heightCenter))
+		self.update(self.__tileRect(widthCenter - stepX, heightCenter - stepY))
+
+	def paintEvent(self, event):
+		painter = QPainter(self)
+		painter.setPen(Qt.NoPen)
+
+		widthCenter, heightCenter = self.__center()
+
+		# Sprites are scaled for the screen, redo them when it changes
+		if not self.__sprites.matches(self.tileSize, self.devicePixelRatioF()):
+			self.__sprites = TileSprites(self.tileSize, self.devicePixelRatioF())
+
+		# Only the tiles in the area being repainted
+		for area in event.region().rects():
+			first_x = max(0, int((area.left() - self.__originX) / self.tileSize))
+			last_x = min(self.horizontalTiles - 1, int((area.right() - self.__originX) / self.tileSize))
+			first_y = max(0, int((area.top() - self.__originY) / self.tileSize))
+			last_y = min(CONSTANTS.WIDGET_MAP_VIEW_HEIGHT - 1, int((area.bottom() - self.__originY) / self.tileSize))
+
+			for x in range(first_x, last_x + 1):
+				column = self.__view[x]
+				for y in range(first_y, last_y + 1):
+					tile_type, selected = column[y]
+					player = x == widthCenter and y == heightCenter
+					self.__sprites.paint(painter, self.__tileRect(x, y), tile_type, self.__location,
+										 selected, player, self.__direction)
+
+		painter.end()
+
+	def mouseReleaseEvent(self, event):
+		if event.button() != Qt.LeftButton:
+			return
+
+		# Find the tile under the cursor
+		pos = event.pos()
+		x = pos.x() - self.__originX
+		y = pos.y() - self.__originY
+		if x < 0 or y < 0:
+			return
+		x = int(x / self.tileSize)
+		y = int(y / self.tileSize)
+		if x >= self.horizontalTiles or y >= CONSTANTS.WIDGET_MAP_VIEW_HEIGHT:
+			return
+
+		tile = self.__view[x][y]
+		if tile[0] in CLICKABLE_TILES:
+			widthCenter, heightCenter = self.__center()
+			trueX = self.__playerX + x - widthCenter
+			trueY = self.__playerY + y - heightCenter
+
+			if self.__clickMode == "select":
+				tile[1] = not tile[1]
+				self.__tileUpdated(trueX, trueY, tile[1])
+				self.update(self.__tileRect(x, y))
+			else:
+				self.__walkIssued(trueX, trueY)
 
 	def getSelectedTiles(self):
 		return self.__selected
\ No newline at end of file
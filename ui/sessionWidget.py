@@ -6,10 +6,62 @@ from PySide2.QtWidgets import (QDockWidget,
 							   QPushButton, 
 							   QLineEdit, 
 							   QListWidget,
+							   QListView,
 							   QTabWidget,
 							   QListWidgetItem)
+from PySide2.QtCore import QAbstractListModel, QModelIndex, QSortFilterProxyModel
 from PySide2.QtGui import Qt, QColor
 
+class HistoryModel(QAbstractListModel):
+	""" Names and counts of one session history list.
+
+		Counts are added per name. A name seen for the first time is
+		appended as a new row, otherwise only its row is changed, so an
+		update costs the same however long the session has run.
+	"""
+	def __init__(self, parent=None):
+		super(HistoryModel, self).__init__(parent)
+		self.__names = []
+		self.__counts = []
+
+		# Name -> row
+		self.__rows = dict()
+
+	def rowCount(self, parent=QModelIndex()):
+		if parent.isValid():
+			return 0
+
+		return len(self.__names)
+
+	def data(self, index, role=Qt.DisplayRole):
+		if not index.isValid() or role != Qt.DisplayRole:
+			return None
+
+		row = index.row()
+		return self.__names[row] + ": " + str(self.__counts[row])
+
+	def addCounts(self, counts):
+		for name, count in counts.items():
+			row = self.__rows.get(name)
+			if row is None:
+				row = len(self.__names)
+				self.beginInsertRows(QModelIndex(), row, row)
+				self.__names.append(name)
+				self.__counts.append(count)
+				self.__rows[name] = row
+				self.endInsertRows()
+			else:
+				self.__counts[row] += count
+				index = self.index(row)
+				self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+	def clear(self):
+		self.beginResetModel()
+		self.__names = []
+		self.__counts = []
+		self.__rows = dict()
+		self.endResetModel()
+
 class SessionWidget(QDockWidget):
 	def __init__(self, parent):
 		super(SessionWidget, self).__init__(parent)
@@ -38,8 +90,10 @@ class SessionWidget(QDockWidget):
 		self.moneyField.setText("0")
 		self.__historyLayout.addRow(self.moneyLabel, self.moneyField)
 
-		self.historyPokemonList = QListWidget()
-		self.historyItemList = QListWidget()
+		self.__pokemonHistory = HistoryModel(self)
+		self.__itemHistory = HistoryModel(self)
+		self.historyPokemonList = self.__createHistoryView(self.__pokemonHistory)
+		self.historyItemList = self.__createHistoryView(self.__itemHistory)
 		self.playerList = QListWidget()
 		self.__historyTabs.addTab(self.historyPokemonList, "Pokemon")
 		self.__historyTabs.addTab(self.historyItemList, "Items")
@@ -53,27 +107,36 @@ class SessionWidget(QDockWidget):
 		   		   		   "QLineEdit#sessionWidget {background-color: #d1cebd; color: #424874; font-weight: bold;}")
 
 
+	def __createHistoryView(self, model):
+		# Sorted by label like the lists always were, the proxy keeps
+		# changed and added rows in place
+		proxy = QSortFilterProxyModel(self)
+		proxy.setSourceModel(model)
+		proxy.sort(0)
+
+		view = QListView()
+		view.setModel(proxy)
+		return view
+
 	def update(self, battles, money, pokemon, items):
 		""" Update session history.
 
-			Sets new number of battles, money earned, pokemon encountered.
+			Sets new number of battles and money earned, and adds the
+			pokemon encountered and items obtained since the last update.
 		"""
 		self.battlesField.setText(str(battles))
 		self.moneyField.setText(str(money))
 
-		self.historyPokemonList.clear()
-		self.historyItemList.clear()
+		self.__pokemonHistory.addCounts(pokemon)
+		self.__itemHistory.addCounts(items)
 
-		for key, value in pokemon.items():
-			label = key + ": " + str(value)
-			self.historyPokemonList.addItem(label)
-
-		for key, value in items.items():
-			label = key + ": " + str(value)
-			self.historyItemList.addItem(label)
+	def resetHistory(self):
+		""" Clears the session history for a new session."""
+		self.battlesField.setText("0")
+		self.moneyField.setText("0")
 
-		self.historyPokemonList.sortItems()
-		self.historyItemList.sortItems()
+		self.__pokemonHistory.clear()
+		self.__itemHistory.clear()
 
 	def updatePlayers(self, playersDict):
 		self.playerList.clear()
@@ -9,8 +9,8 @@ from PySide2.QtWidgets import (QWidget,
 							   QPushButton)
 
 import os
-import csv
 from functools import partial
+from utils.gameData import GameData
 
 class VendorShopWidget(QDialog):
 	buySignal = Signal(int, int)
@@ -21,8 +21,7 @@ class VendorShopWidget(QDialog):
 		
 		self.setWindowTitle("Vendor Shop")
 
-		file = open('./data/csv/vendor.csv')
-		itemList = list(csv.DictReader(file, delimiter=','))
+		itemList = GameData.instance().vendorItems()
 
 		self.__items = [None] * len(itemList)
 
@@ -35,10 +34,10 @@ class VendorShopWidget(QDialog):
 		self.__shopWidget.setLayout(self.__shopLayout)
 
 		for item in range(len(itemList)):
-			item_button = QPushButton(itemList[item]["identifier"])
+			item_button = QPushButton(itemList[item][0])
 			item_button.setEnabled(False)
 			item_button.setStyleSheet("background-color: #b21f66; color: #FFFFFF; font-weight: bold;")
-			item_price = QLabel("Price:   $" + itemList[item]["price"] + "\tQuantity")
+			item_price = QLabel("Price:   $" + itemList[item][1] + "\tQuantity")
 			item_quantity = QLineEdit("0")
 			item_quantity.setValidator(QIntValidator())
 			item_buy = QPushButton("Buy")
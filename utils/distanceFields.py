@@ -0,0 +1,151 @@
+import threading
+import tomlkit
+
+from array import array
+from collections import OrderedDict
+from utils.mapCache import MapCache
+from utils.mapManager import MapManager
+from utils.pathfinding import distanceField, pathFromField, isWalkable
+
+FAVORITE_LOCATIONS_FILE = "./config/favorite_locations.toml"
+
+class DistanceFields():
+	""" Cache of breadth first distance fields towards fixed targets.
+
+		A field holds, for every tile of a map, the walking distance to a
+		target tile, or to the nearest of all the exits of the map. Only
+		fields to the exits and to the favourite locations are kept,
+		those are the targets walked to over and over, so a path to them
+		is a walk down the gradient from the player with no search. A
+		field to any other tile is computed for the call and dropped,
+		one off targets are better served by astar. Exit tiles are never
+		walked through, except when they are the target.
+	"""
+	DEFAULT_CAPACITY = 64
+
+	__instance = None
+	__lock = threading.Lock()
+
+	def __init__(self, capacity=DEFAULT_CAPACITY):
+		self.__capacity = capacity
+		self.__fields = OrderedDict()
+		self.__fieldsLock = threading.Lock()
+		self.__favorites = self.__loadFavorites()
+
+	@staticmethod
+	def instance():
+		""" Returns the cache shared by the process."""
+		if DistanceFields.__instance is None:
+			with DistanceFields.__lock:
+				if DistanceFields.__instance is None:
+					DistanceFields.__instance = DistanceFields()
+
+		return DistanceFields.__instance
+
+	def __loadFavorites(self):
+		""" Returns the (map name, x, y) tiles of the favourite locations."""
+		try:
+			with open(FAVORITE_LOCATIONS_FILE, "r") as file:
+				locations = tomlkit.parse(file.read()).get("locations", {})
+		except OSError:
+			return frozenset()
+
+		return frozenset((str(location[0]), int(location[1]), int(location[2])) for location in locations.values())
+
+	def __field(self, key, mapName, targets, surfing):
+		""" Returns (width, exit tiles, field) of a cached or new field.
+
+			Targets are (y, x) tiles, None means every exit of the map.
+			The field is only cached when a key is given.
+		"""
+		if key is not None:
+			with self.__fieldsLock:
+				if key in self.__fields:
+					self.__fields.move_to_end(key)
+					return self.__fields[key]
+
+		map_manager = MapManager()
+		collision = map_manager.map(mapName)
+		if collision is None:
+			return None
+
+		stops = set((exit[1], exit[0]) for exit in map_manager.exits)
+		if targets is None:
+			targets = list(stops)
+
+		# Same rule as astar, the target itself has to be walkable
+		targets = [target for target in targets
+				   if 0 <= target[0] < len(collision) and 0 <= target[1] < len(collision[0]) and
+				   isWalkable(collision[target[0]][target[1]], surfing)]
+
+		entry = (len(collision[0]), stops, array('i', distanceField(collision, targets, surfing, stops)))
+
+		if key is not None:
+			with self.__fieldsLock:
+				self.__fields[key] = entry
+				while len(self.__fields) > self.__capacity:
+					self.__fields.popitem(last=False)
+
+		return entry
+
+	def __path(self, entry, x, y):
+		if entry is None:
+			return None
+
+		width, stops, field = entry
+		path = pathFromField(field, width, (y, x), stops)
+		if path is None:
+			return None
+
+		# The field grows from the target, walk it the other way
+		return path[::-1]
+
+	def isFixedTarget(self, mapName, targetX, targetY):
+		""" Returns True if the field to the tile is kept once computed."""
+		if (mapName, targetX, targetY) in self.__favorites:
+			return True
+
+		map_data = MapCache.instance().get(mapName)
+		if map_data is None:
+			return False
+
+		return any(exit[0] == targetX and exit[1] == targetY for exit in map_data.exits)
+
+	def fieldTo(self, mapName, targetX, targetY, surfing=False):
+		""" Returns (width, exit tiles, field) of the distances to a tile.
+
+			Fields to exits and favourite locations come from the cache,
+			any other target gets a field of its own that isn't kept.
+			Returns None if the map can't be loaded.
+		"""
+		key = None
+		if self.isFixedTarget(mapName, targetX, targetY):
+			key = (mapName, targetX, targetY, surfing)
+
+		return self.__field(key, mapName, [(targetY, targetX)], surfing)
+
+	def distanceTo(self, mapName, x, y, targetX, targetY, surfing=False):
+		""" Returns the walking distance between two tiles or -1."""
+		entry = self.fieldTo(mapName, targetX, targetY, surfing)
+		if entry is None:
+			return -1
+
+		width, stops, field = entry
+		if x < 0 or x >= width or y * width + x >= len(field):
+			return -1
+
+		return field[y * width + x]
+
+	def pathTo(self, mapName, x, y, targetX, targetY, surfing=False):
+		""" Returns a path from x,y to the target tile in astar's format.
+
+			The path is a list of (y, x) tiles including the start, or
+			None if the target can't be reached.
+		"""
+		return self.__path(self.fieldTo(mapName, targetX, targetY, surfing), x, y)
+
+	def pathToNearestExit(self, mapName, x, y, surfing=False):
+		""" Returns a path from x,y to the closest exit of the map."""
+		entry = self.__field((mapName, "exits", surfing), mapName, None, surfing)
+
+		return self.__path(entry, x, y)
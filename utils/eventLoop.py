@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+class EventLoop():
+	""" One asyncio event loop running on its own daemon thread.
+
+		Shared by the whole process. Code on other threads (the Qt main
+		thread, the bot loop) hands work to it with callSoon and submit,
+		which are both thread safe.
+	"""
+	__instance = None
+	__lock = threading.Lock()
+
+	def __init__(self):
+		self.__loop = asyncio.new_event_loop()
+		self.__thread = threading.Thread(target=self.__run, name="Event Loop Thread")
+		self.__thread.setDaemon(True)
+		self.__thread.start()
+
+	@staticmethod
+	def instance():
+		""" Returns the shared loop, starting its thread on first use."""
+		if EventLoop.__instance is None:
+			with EventLoop.__lock:
+				if EventLoop.__instance is None:
+					EventLoop.__instance = EventLoop()
+
+		return EventLoop.__instance
+
+	def __run(self):
+		asyncio.set_event_loop(self.__loop)
+		self.__loop.run_forever()
+
+	def loop(self):
+		return self.__loop
+
+	def inLoopThread(self):
+		return threading.current_thread() is self.__thread
+
+	def callSoon(self, callback, *args):
+		""" Runs callback on the loop thread as soon as possible."""
+		if self.inLoopThread():
+			return self.__loop.call_soon(callback, *args)
+
+		return self.__loop.call_soon_threadsafe(callback, *args)
+
+	def submit(self, coroutine):
+		""" Runs a coroutine on the loop, returns a concurrent.futures.Future."""
+		return asyncio.run_coroutine_threadsafe(coroutine, self.__loop)
@@ -0,0 +1,133 @@
+import csv
+import threading
+
+from array import array
+
+from utils.utils import stringToMd5
+
+class GameData():
+	""" Read only catalog of the game csv data.
+
+		Each csv file is parsed once, the first time the catalog is
+		used, and shared by everything that needs it afterwards. Rows
+		are stored in tuples indexed the same way the game looks them
+		up (id - 1). Use GameData.instance() instead of creating it.
+	"""
+	__instance = None
+	__lock = threading.Lock()
+
+	# Key the server uses to hash ability ids of wild pokemon
+	ABILITY_CRYPTO_KEY = "asion1asfonapsfobq1n12iofrasnfra"
+
+	def __init__(self):
+		# [name, type id, power, accuracy, pp]
+		self.__moves = tuple((self.__cleanName(row['identifier']),
+							  int(row['type_id']),
+							  int(row['power']) if row['power'] != '' else 0,
+							  int(row['accuracy']) if row['accuracy'] != '' else 100,
+							  int(row['pp']) if row['pp'] != '' else 0)
+							 for row in self.__readCsv('moves'))
+
+		self.__types = tuple(self.__cleanName(row['identifier']) for row in self.__readCsv('types'))
+		self.__abilities = tuple(self.__cleanName(row['identifier']) for row in self.__readCsv('abilities'))
+		self.__pokemon = tuple(row['identifier'].title() for row in self.__readCsv('pokemon'))
+
+		# [name, price]
+		self.__vendor = tuple((row['identifier'], row['price']) for row in self.__readCsv('vendor'))
+
+		# Damage factors as a dense attacker x defender matrix, stored
+		# flat row by row. Factor of damage type d against target t is at
+		# (d - 1) * typeCount + (t - 1).
+		effect = self.__readCsv('effect')
+		self.__typeCount = max(int(row['damage_type_id']) for row in effect)
+		self.__effect = array('d', [1.0] * (self.__typeCount * self.__typeCount))
+		for row in effect:
+			index = (int(row['damage_type_id']) - 1) * self.__typeCount + int(row['target_type_id']) - 1
+			self.__effect[index] = int(row['damage_factor']) / 100
+
+		# Effectiveness rows per defender type pair, filled as needed
+		self.__defenderEffect = dict()
+
+		# Built on first wild encounter
+		self.__abilityHashes = None
+
+	@staticmethod
+	def instance():
+		""" Returns the shared catalog, loading it on first use."""
+		if GameData.__instance is None:
+			with GameData.__lock:
+				if GameData.__instance is None:
+					GameData.__instance = GameData()
+
+		return GameData.__instance
+
+	def __readCsv(self, name):
+		with open('./data/csv/' + name + '.csv') as file:
+			return list(csv.DictReader(file, delimiter=','))
+
+	def __cleanName(self, identifier):
+		return identifier.replace("-", " ").title()
+
+	def move(self, id):
+		""" Returns [name, type id, power, accuracy, pp] of a move."""
+		return self.__moves[id - 1]
+
+	def typeName(self, id):
+		return self.__types[id - 1]
+
+	def abilityName(self, id):
+		return self.__abilities[id - 1]
+
+	def abilityIdFromHash(self, hash):
+		""" Returns the ability id of an encoded wild pokemon ability.
+
+			The server sends md5(id + key) instead of the id. The reverse
+			table is built once so decoding is a single lookup. Returns
+			None when the hash doesn't match any ability.
+		"""
+		if self.__abilityHashes is None:
+			self.__abilityHashes = {stringToMd5(str(ability) + self.ABILITY_CRYPTO_KEY): ability
+									for ability in range(len(self.__abilities))}
+
+		return self.__abilityHashes.get(hash)
+
+	def effectiveness(self, damageType, targetType):
+		""" Returns the damage multiplier of a damage type against a target type.
+
+			Types outside of the effect table (none, shadow...) are neutral.
+		"""
+		if not (0 < damageType <= self.__typeCount and 0 < targetType <= self.__typeCount):
+			return 1.0
+
+		return self.__effect[(damageType - 1) * self.__typeCount + targetType - 1]
+
+	def defenderEffectiveness(self, typeOne, typeTwo=0):
+		""" Returns the multiplier of every damage type against a type pair.
+
+			The result is a tuple indexed by damage type id - 1 and is
+			shared by every defender with the same types. A type id of 0
+			means the defender has no second type.
+		"""
+		key = (typeOne, typeTwo)
+		row = self.__defenderEffect.get(key)
+
+		if row is None:
+			row = tuple(self.effectiveness(damage_type, typeOne) * self.effectiveness(damage_type, typeTwo)
+						for damage_type in range(1, self.__typeCount + 1))
+			self.__defenderEffect[key] = row
+
+		return row
+
+	def scoreMoves(self, moveTypes, typeOne, typeTwo=0):
+		""" Returns the multiplier of each move type against a type pair."""
+		row = self.defenderEffectiveness(typeOne, typeTwo)
+		count = self.__typeCount
+
+		return [row[move_type - 1] if 0 < move_type <= count else 1.0 for move_type in moveTypes]
+
+	def pokemonNames(self):
+		return self.__pokemon
+
+	def vendorItems(self):
+		""" Returns a tuple of [name, price] for every vendor item."""
+		return self.__vendor
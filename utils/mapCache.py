@@ -0,0 +1,134 @@
+import os
+import time
+import json
+import threading
+import tomlkit
+
+from collections import OrderedDict, namedtuple
+from utils.mapStore import MapStore
+
+# Parsed map shared between consumers. Never modified, the collision
+# grid is a tuple of immutable rows (bytes), exits and npcs are tuples.
+MapData = namedtuple('MapData', ['name', 'region', 'location', 'exits', 'npcs', 'collision'])
+
+class MapCache():
+	""" Least recently used cache of parsed maps.
+
+		One cache is shared by the whole process so a map is parsed once
+		no matter how many MapManagers ask for it. Consumers get the
+		immutable MapData and apply their own overlays (NPCs, rocks) on
+		a copy of the collision grid.
+	"""
+	DEFAULT_CAPACITY = 16
+
+	__instance = None
+	__lock = threading.Lock()
+
+	def __init__(self, capacity=DEFAULT_CAPACITY):
+		self.__capacity = max(1, int(capacity))
+		self.__maps = OrderedDict()
+		self.__mapsLock = threading.Lock()
+
+		# Statistics
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.loadTime = 0.0
+
+	@staticmethod
+	def instance():
+		""" Returns the cache shared by the process."""
+		if MapCache.__instance is None:
+			with MapCache.__lock:
+				if MapCache.__instance is None:
+					MapCache.__instance = MapCache()
+
+		return MapCache.__instance
+
+	def setCapacity(self, capacity):
+		""" Changes how many maps are kept, evicting the oldest if needed."""
+		with self.__mapsLock:
+			self.__capacity = max(1, int(capacity))
+			self.__evict()
+
+	def getCapacity(self):
+		return self.__capacity
+
+	def clear(self):
+		with self.__mapsLock:
+			self.__maps.clear()
+
+	def stats(self):
+		""" Returns hit/miss/eviction counters and total load time in seconds."""
+		return {"size": len(self.__maps),
+				"capacity": self.__capacity,
+				"hits": self.hits,
+				"misses": self.misses,
+				"evictions": self.evictions,
+				"loadTime": self.loadTime}
+
+	def get(self, name):
+		""" Returns the MapData of a map or None if there is no map file."""
+		key = name.replace(" ", "_")
+
+		with self.__mapsLock:
+			if key in self.__maps:
+				self.__maps.move_to_end(key)
+				self.hits += 1
+				return self.__maps[key]
+
+			self.misses += 1
+			start = time.perf_counter()
+			map_data = self.__load(key)
+			self.loadTime += time.perf_counter() - start
+
+			if map_data is not None:
+				self.__maps[key] = map_data
+				self.__evict()
+
+			return map_data
+
+	def __evict(self):
+		while len(self.__maps) > self.__capacity:
+			self.__maps.popitem(last=False)
+			self.evictions += 1
+
+	def __load(self, key):
+		store = MapStore.instance()
+
+		if store.hasMap(key):
+			info = store.mapInfo(key)
+			return MapData(info["name"],
+						   info["region"],
+						   info["location"],
+						   tuple(tuple(exit) for exit in info["exits"]),
+						   tuple(tuple(npc) for npc in info["npcs"]),
+						   store.collision(key))
+
+		filename = './config/maps/' + key + ".toml"
+		if os.path.exists(filename):
+			return self.__loadToml(filename)
+
+		return None
+
+	def __loadToml(self, filename):
+		file = open(filename, "r")
+		toml_data = tomlkit.parse(file.read())
+		file.close()
+
+		if toml_data["map"]["exits"] != "":
+			exits = json.loads(toml_data["map"]["exits"])
+		else:
+			exits = []
+
+		if toml_data["map"]["npcs"] != "":
+			npcs = json.loads(toml_data["map"]["npcs"])
+		else:
+			npcs = []
+
+		return MapData(str(toml_data["map"]["name"]),
+					   str(toml_data["map"]["region"]),
+					   str(toml_data["map"]["location"]),
+					   tuple(tuple(exit) for exit in exits),
+					   tuple(tuple(npc) for npc in npcs),
+					   tuple(bytes(row) for row in json.loads(toml_data["map"]["collision"])))
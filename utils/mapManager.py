@@ -1,7 +1,4 @@
-import os
-import re
-import tomlkit
-import json
+from utils.mapCache import MapCache
 
 class MapManager():
 
@@ -9,43 +6,42 @@ class MapManager():
 		self.name = None
 		self.region = None
 		self.collision = []
+		self.location = None
 		self.cave = False
 		self.indoors = False
 		self.exits = []
 		self.npcs = []
 
-	def __loadMapData(self, filename):
-		file = open(filename, "r")
-		toml_data = tomlkit.parse(file.read())
+		# (x, y) of every exit tile
+		self.exitTiles = frozenset()
 
-		self.name = toml_data["map"]["name"]
-		self.region = toml_data["map"]["region"]
-		self.collision = json.loads(toml_data["map"]["collision"])
-		self.location = toml_data["map"]["location"]
-		
-		if toml_data["map"]["exits"] != "":
-			self.exits = json.loads(toml_data["map"]["exits"])
-		else:
-			self.exits = []
+	def __loadMapData(self, mapData):
+		self.name = mapData.name
+		self.region = mapData.region
+		self.location = mapData.location
+		self.exits = mapData.exits
+		self.exitTiles = frozenset((exit[0], exit[1]) for exit in self.exits)
+		self.npcs = mapData.npcs
 
-		if toml_data["map"]["npcs"] != "":
-			self.npcs = json.loads(toml_data["map"]["npcs"])
-		else:
-			self.npcs = []
+		# The cached grid is shared, overlays are drawn on our own copy
+		self.collision = [list(row) for row in mapData.collision]
 
-		# Modify teh collision array to hold NPCs (Tile ID:98)
+		# Modify the collision array to hold NPCs (Tile ID:98)
 		for npc in self.npcs:
 			self.collision[npc[1]][npc[0]] = 98
 
 	def map(self, name):
-		filename = './config/maps/' + name.replace(" ", "_") + ".toml"
+		map_data = MapCache.instance().get(name)
 
-		if os.path.exists(filename):
-			self.__loadMapData(filename)
+		if map_data is not None:
+			self.__loadMapData(map_data)
 			return self.collision
 		else:
 			return None
 
+	def isExit(self, x, y):
+		return (x, y) in self.exitTiles
+
 	def width(self, name):
 		if name == self.name:
 			return len(self.collision[0]) - 1
@@ -0,0 +1,166 @@
+import os
+import glob
+import json
+import mmap
+import struct
+import threading
+import tomlkit
+
+class MapStore():
+	""" Compiled, memory mapped store of every map in config/maps.
+
+		Parsing the map TOML files with tomlkit and decoding their
+		collision json is slow, so all maps are compiled into a single
+		binary file which is memory mapped and read directly.
+
+		File layout:
+			magic (4 bytes) | version (uint32) | index size (uint32)
+			index (utf-8 json) | collision grids (uint8, row by row)
+
+		The index maps the map file name (spaces as underscores) to its
+		name, region, location, exits, npcs, width, height and the offset
+		of its grid. The store is rebuilt automatically when any TOML
+		file is newer than it. Run "python -m utils.mapStore" to compile
+		it ahead of time.
+	"""
+	MAPS_DIR = './config/maps/'
+	STORE_PATH = './config/maps.bin'
+
+	MAGIC = b'APMS'
+	VERSION = 1
+	HEADER = struct.Struct('<4sII')
+
+	__instance = None
+	__lock = threading.Lock()
+
+	def __init__(self, mapsDir=MAPS_DIR, storePath=STORE_PATH):
+		self.__mapsDir = mapsDir
+		self.__storePath = storePath
+		self.__file = None
+		self.__data = None
+		self.__dataOffset = 0
+		self.__index = dict()
+
+		if self.isStale():
+			self.compile()
+
+		self.__open()
+
+	@staticmethod
+	def instance():
+		""" Returns the shared store, compiling and mapping it on first use."""
+		if MapStore.__instance is None:
+			with MapStore.__lock:
+				if MapStore.__instance is None:
+					MapStore.__instance = MapStore()
+
+		return MapStore.__instance
+
+	def isStale(self):
+		""" Returns True if the store is missing or older than any map file."""
+		if not os.path.exists(self.__storePath) or os.path.getsize(self.__storePath) < self.HEADER.size:
+			return True
+
+		store_time = os.path.getmtime(self.__storePath)
+
+		# Directory time changes when a map file is added or removed
+		if os.path.getmtime(self.__mapsDir) > store_time:
+			return True
+
+		for filename in glob.glob(os.path.join(self.__mapsDir, '*.toml')):
+			if os.path.getmtime(filename) > store_time:
+				return True
+
+		return False
+
+	def compile(self):
+		""" Compiles every map TOML file into the binary store.
+
+			Maps that fail to parse are left out of the store, loading
+			them falls back to the TOML file.
+		"""
+		self.close()
+
+		index = dict()
+		grids = bytearray()
+
+		for filename in sorted(glob.glob(os.path.join(self.__mapsDir, '*.toml'))):
+			try:
+				with open(filename, 'r') as file:
+					toml_data = tomlkit.parse(file.read())
+
+				collision = json.loads(toml_data["map"]["collision"])
+				exits = json.loads(toml_data["map"]["exits"]) if toml_data["map"]["exits"] != "" else []
+				npcs = json.loads(toml_data["map"]["npcs"]) if toml_data["map"]["npcs"] != "" else []
+				grid = bytes(tile for row in collision for tile in row)
+			except Exception:
+				continue
+
+			key = os.path.splitext(os.path.basename(filename))[0]
+			index[key] = {"name": str(toml_data["map"]["name"]),
+						  "region": str(toml_data["map"]["region"]),
+						  "location": str(toml_data["map"]["location"]),
+						  "exits": exits,
+						  "npcs": npcs,
+						  "width": len(collision[0]) if len(collision) > 0 else 0,
+						  "height": len(collision),
+						  "offset": len(grids)}
+			grids.extend(grid)
+
+		index_data = json.dumps(index, separators=(',', ':')).encode()
+
+		# Write to a temporary file first so a partial store is never read
+		temp_path = self.__storePath + '.tmp'
+		with open(temp_path, 'wb') as file:
+			file.write(self.HEADER.pack(self.MAGIC, self.VERSION, len(index_data)))
+			file.write(index_data)
+			file.write(grids)
+		os.replace(temp_path, self.__storePath)
+
+	def __open(self):
+		self.__file = open(self.__storePath, 'rb')
+		self.__data = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+
+		magic, version, index_size = self.HEADER.unpack_from(self.__data, 0)
+		if magic != self.MAGIC or version != self.VERSION:
+			# Written by a different version, rebuild it
+			self.compile()
+			self.__open()
+			return
+
+		index_start = self.HEADER.size
+		self.__index = json.loads(self.__data[index_start:index_start + index_size].decode())
+		self.__dataOffset = index_start + index_size
+
+	def close(self):
+		if self.__data is not None:
+			self.__data.close()
+			self.__data = None
+		if self.__file is not None:
+			self.__file.close()
+			self.__file = None
+
+	def mapCount(self):
+		return len(self.__index)
+
+	def mapKeys(self):
+		return list(self.__index.keys())
+
+	def hasMap(self, key):
+		return key in self.__index
+
+	def mapInfo(self, key):
+		""" Returns the index entry of a map or None if it isn't stored."""
+		return self.__index.get(key)
+
+	def collision(self, key):
+		""" Returns the collision grid of a map as a tuple of rows (bytes)."""
+		info = self.__index[key]
+		width = info["width"]
+		start = self.__dataOffset + info["offset"]
+
+		return tuple(self.__data[row:row + width] for row in range(start, start + width * info["height"], width))
+
+if __name__ == '__main__':
+	store = MapStore()
+	print("{} maps compiled into {}".format(store.mapCount(), MapStore.STORE_PATH))
\ No newline at end of file
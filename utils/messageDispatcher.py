@@ -0,0 +1,73 @@
+import time
+
+from message import MessageTypeEnum
+
+class MessageDispatcher():
+	""" Routes inbound messages to handlers with a dictionary lookup.
+
+		Handlers are registered for a message type and action, and
+		optionally a sub key which is the message code for XT messages
+		and the _cmd var for MSG messages. A handler registered without
+		a sub key takes every message with that action, so the XML of a
+		MSG message is only parsed when its action needs the cmd.
+
+		Each handled key counts its calls and the time spent in the
+		handler, see stats().
+	"""
+
+	def __init__(self):
+		# (type, action, sub key) -> handler
+		self.__handlers = dict()
+
+		# (type, action, sub key) -> [calls, seconds]
+		self.__stats = dict()
+		self.__unhandled = 0
+
+	def register(self, messageType, action, handler, subKey=None):
+		self.__handlers[(messageType, action, subKey)] = handler
+
+	def dispatch(self, message):
+		""" Calls the handler of a message. Returns False if there is none."""
+		message_type = message.getMessageType()
+		action = message.getMessageAction()
+
+		key = (message_type, action, None)
+		handler = self.__handlers.get(key)
+
+		if handler is None:
+			if message_type == MessageTypeEnum.MSG:
+				key = (message_type, action, message.getXmlCmd())
+			else:
+				key = (message_type, action, message.getMessageCode())
+			handler = self.__handlers.get(key)
+
+			if handler is None:
+				self.__unhandled += 1
+				return False
+
+		start = time.perf_counter()
+		try:
+			handler(message)
+		finally:
+			stats = self.__stats.get(key)
+			if stats is None:
+				stats = self.__stats[key] = [0, 0.0]
+			stats[0] += 1
+			stats[1] += time.perf_counter() - start
+
+		return True
+
+	def stats(self):
+		""" Returns {"type:action[:sub key]": (calls, seconds)} and the unhandled count."""
+		stats = dict()
+		for key, value in self.__stats.items():
+			name = key[0].name + ":" + str(key[1])
+			if key[2] is not None:
+				name = name + ":" + str(key[2])
+			stats[name] = (value[0], value[1])
+
+		return stats, self.__unhandled
+
+	def resetStats(self):
+		self.__stats = dict()
+		self.__unhandled = 0
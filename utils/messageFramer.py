@@ -0,0 +1,63 @@
+class MessageFramer():
+	""" Splits a received byte stream into null terminated messages.
+
+		Bytes are fed as they come off the socket and every complete
+		frame is returned right away, decoded straight from the receive
+		buffer. When a chunk holds only whole frames nothing is copied;
+		otherwise the unfinished tail is kept in a bytearray and joined
+		with the rest of the frame once its terminator arrives.
+	"""
+	TERMINATOR = b'\x00'
+
+	def __init__(self, encoding="utf-8", errors="ignore"):
+		self.__encoding = encoding
+		self.__errors = errors
+
+		# Unfinished frame carried over between chunks
+		self.__pending = bytearray()
+
+	def pendingSize(self):
+		return len(self.__pending)
+
+	def clear(self):
+		self.__pending = bytearray()
+
+	def feed(self, data, length=None):
+		""" Adds received bytes and returns the list of complete frames.
+
+			data is a bytes or bytearray, of which only the first length
+			bytes are used so the buffer given to recv_into can be
+			passed as is. Empty frames are dropped.
+		"""
+		if length is None:
+			length = len(data)
+
+		frames = []
+		end = data.find(self.TERMINATOR, 0, length)
+
+		with memoryview(data) as view:
+			if end == -1:
+				self.__pending += view[:length]
+				return frames
+
+			# Finish the frame carried over from the previous chunks
+			if len(self.__pending) > 0:
+				self.__pending += view[:end]
+				frames.append(self.__pending.decode(self.__encoding, self.__errors))
+				self.__pending = bytearray()
+			elif end > 0:
+				frames.append(str(view[:end], self.__encoding, self.__errors))
+
+			start = end + 1
+			end = data.find(self.TERMINATOR, start, length)
+			while end != -1:
+				if end > start:
+					frames.append(str(view[start:end], self.__encoding, self.__errors))
+				start = end + 1
+				end = data.find(self.TERMINATOR, start, length)
+
+			# Keep the unfinished tail for the next chunk
+			if start < length:
+				self.__pending += view[start:length]
+
+		return frames
@@ -0,0 +1,165 @@
+# Slot kinds. STRING and NUMBER are also the XML types of a param var
+STRING = 's'
+NUMBER = 'n'
+TEXT = 'text'
+
+# Characters that would break the data object, it is parsed as XML
+XML_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+def escapeString(value):
+	if "&" in value or "<" in value or ">" in value:
+		value = value.translate(XML_ESCAPES)
+
+	return value
+
+class MessageTemplate():
+	""" Outbound message compiled once into static text and typed slots.
+
+		Built from a list of pieces, where a str is static text and a
+		one element tuple is a value slot. (STRING,) values are str the
+		game or the bot made, written as they are. (NUMBER,) values are
+		written with str(). (TEXT,) values are str that can carry what
+		the user typed and are escaped for the XML data object. build()
+		returns ready to send bytes.
+	"""
+
+	def __init__(self, pieces, signed=False):
+		self.signed = signed
+
+		# Static text at even indexes, slots at odd ones
+		self.__parts = [""]
+		# (index in parts, function) for slots that aren't a plain str
+		self.__conversions = []
+
+		for piece in pieces:
+			if isinstance(piece, tuple):
+				if len(self.__parts) % 2 == 0:
+					self.__parts.append("")
+				if piece[0] == NUMBER:
+					self.__conversions.append((len(self.__parts), str))
+				elif piece[0] == TEXT:
+					self.__conversions.append((len(self.__parts), escapeString))
+				self.__parts.append(None)
+			elif len(self.__parts) % 2 == 0:
+				self.__parts.append(piece)
+			else:
+				self.__parts[-1] += piece
+
+		if len(self.__parts) % 2 == 0:
+			self.__parts.append("")
+
+		self.__slotCount = len(self.__parts) // 2
+		self.build = self.__compileBuild(self.__parts, self.__conversions)
+
+	def slotCount(self):
+		return self.__slotCount
+
+	@staticmethod
+	def __compileBuild(parts, conversions):
+		""" Returns the build function, templates with only str slots skip the conversions."""
+		if len(conversions) == 0:
+			def build(*values):
+				""" Returns the message bytes with values filled in slot order."""
+				filled = parts[:]
+
+				# Raises ValueError if there are too many or too few values
+				filled[1::2] = values
+
+				return "".join(filled).encode()
+		else:
+			def build(*values):
+				""" Returns the message bytes with values filled in slot order."""
+				filled = parts[:]
+				filled[1::2] = values
+				for index, convert in conversions:
+					filled[index] = convert(filled[index])
+
+				return "".join(filled).encode()
+
+		return build
+
+def xtRequest(cmd, params=(), signed=True, spaced=False):
+	""" Compiles a SmartFox xtReq message for the game extension.
+
+		params is a list of (name, slot kind) for the param object, a
+		NUMBER is sent as an 'n' var and the others as 's'. A None cmd
+		makes the command itself the first slot. Signed messages end
+		with the pke, pk and te slots of the packet key. spaced keeps
+		the blanks between tags a few requests have.
+	"""
+	blank = " " if spaced else ""
+	pieces = ["<msg t='xt'>" + blank + "<body action='xtReq' r='1'>" + blank + "<![CDATA[<dataObj>" +
+			  "<var n='name' t='s'>PokemonPlanetExt</var><var n='cmd' t='s'>"]
+	pieces.append((STRING,) if cmd is None else cmd)
+	pieces.append("</var><obj t='o' o='param'>")
+
+	for name, value_type in params:
+		pieces.append("<var n='" + name + "' t='" + (NUMBER if value_type == NUMBER else STRING) + "'>")
+		pieces.append((value_type,))
+		pieces.append("</var>")
+
+	if signed:
+		# Hex digest, letters and digits, and the play time as a str
+		pieces.extend(["<var n='pke' t='s'>", (STRING,), "</var>",
+					   "<var n='pk' t='s'>", (STRING,), "</var>",
+					   "<var n='te' t='n'>", (STRING,), "</var>"])
+
+	pieces.append("</obj></dataObj>]]></body></msg>\x00")
+
+	return MessageTemplate(pieces, signed)
+
+class XtEncoder():
+	""" Encodes XT requests ("`xt`extension`command`1`...`") to bytes.
+
+		The header of every command is built once and kept. Frames of
+		the commands given in cachedCommands are cached whole. Only
+		pass commands that are sent unsigned with a few values over and
+		over, like the movement and facing messages. Frames with unique
+		values, like click times or chat text, would only fill the
+		cache.
+	"""
+	FRAME_CACHE_SIZE = 512
+
+	def __init__(self, extension="PokemonPlanetExt", cachedCommands=()):
+		self.__extension = extension
+		self.__cachedCommands = frozenset(cachedCommands)
+		self.__headers = dict()
+		self.__frames = dict()
+
+	def __header(self, msgId):
+		header = self.__headers.get(msgId)
+		if header is None:
+			header = "`xt`" + self.__extension + "`" + str(msgId) + "`1"
+			self.__headers[msgId] = header
+
+		return header
+
+	def encode(self, msgId, segments, signature=None):
+		""" Returns the frame bytes, signature is (play time, key, key hash)."""
+		if signature is not None:
+			return self.__build(msgId, segments, signature)
+
+		if msgId not in self.__cachedCommands:
+			return self.__build(msgId, segments, ())
+
+		# Only all string frames are cached, 1 and True would share a key
+		for segment in segments:
+			if type(segment) is not str:
+				return self.__build(msgId, segments, ())
+
+		key = (msgId, tuple(segments))
+		frame = self.__frames.get(key)
+		if frame is None:
+			frame = self.__build(msgId, segments, ())
+			if len(self.__frames) < self.FRAME_CACHE_SIZE:
+				self.__frames[key] = frame
+
+		return frame
+
+	def __build(self, msgId, segments, signature):
+		parts = [self.__header(msgId)]
+		parts.extend(signature)
+		parts.extend([str(segment) for segment in segments])
+		parts.append("\x00")
+
+		return "`".join(parts).encode()
@@ -1,101 +1,163 @@
+import heapq
 
-class Node():
-    """A node class for A* Pathfinding"""
+# Tile ids that can be walked on land, when surfing only WATER_TILE is
+WALKABLE_TILES = (0, 3, 6)
+WATER_TILE = 2
 
-    def __init__(self, parent=None, position=None):
-        self.parent = parent
-        self.position = position
-
-        self.g = 0
-        self.h = 0
-        self.f = 0
-
-    def __eq__(self, other):
-        return self.position[0] == other.position[0] and self.position[1] == other.position[1]
+# Adjacent squares, diagonal moves are not allowed
+NEIGHBOURS = ((0, -1), (0, 1), (-1, 0), (1, 0))
 
 
 def astar(map, start, end, surfing):
-    """Returns a list of tuples as a path from the given start to the given end in the given map"""
+    """Returns a list of tuples as a path from the given start to the given end in the given map
 
-    # Create start and end node
-    start_node = Node(None, start)
-    start_node.g = start_node.h = start_node.f = 0
-    end_node = Node(None, end)
-    end_node.g = end_node.h = end_node.f = 0
+    Positions are (row, column). Uses a binary heap for the open set and
+    position keyed dicts for the g-scores and parents, with a Manhattan
+    distance heuristic. Returns None if there is no path.
+    """
+    height = len(map)
+    if height == 0:
+        return None
+    width = len(map[height - 1])
 
-    # Initialize both open and closed list
-    open_list = []
-    closed_list = []
+    start = tuple(start)
+    end = tuple(end)
+    end_row, end_column = end
 
-    # Add the start node
-    open_list.append(start_node)
+    g_scores = {start: 0}
+    parents = {start: None}
+    closed = set()
+
+    # Entries are (f, -g, position), ties go to the node furthest along
+    open_heap = [(abs(start[0] - end_row) + abs(start[1] - end_column), 0, start)]
 
     # Loop until you find the end
-    while len(open_list) > 0:
-        # Get the current node
-        current_node = open_list[0]
-        current_index = 0
-        for index, item in enumerate(open_list):
-            if item.f < current_node.f:
-                current_node = item
-                current_index = index
-
-        # Pop current off open list, add to closed list
-        open_list.pop(current_index)
-        closed_list.append(current_node)
+    while open_heap:
+        current_f, current_g, current = heapq.heappop(open_heap)
+
+        # Stale heap entry, a shorter way to this node was already expanded
+        if current in closed:
+            continue
 
         # Found the goal
-        if current_node == end_node:
+        if current == end:
             path = []
-            current = current_node
             while current is not None:
-                path.append(current.position)
-                current = current.parent
+                path.append(current)
+                current = parents[current]
             return path[::-1] # Return reversed path
 
-        # Generate children
-        children = []
-        for new_position in [(0, -1), (0, 1), (-1, 0), (1, 0), (-1, -1), (-1, 1), (1, -1), (1, 1)]: # Adjacent squares
+        closed.add(current)
+        child_g = -current_g + 1
 
-            # Get node position
-            node_position = (current_node.position[0] + new_position[0], current_node.position[1] + new_position[1])
- 
-            # Make sure within range
-            if node_position[0] > (len(map) - 1) or node_position[0] < 0 or node_position[1] > (len(map[len(map)-1]) -1) or node_position[1] < 0:
-                continue
+        for offset in NEIGHBOURS:
+            row = current[0] + offset[0]
+            column = current[1] + offset[1]
 
-            if current_node.position[0] != node_position[0] and current_node.position[1] != node_position[1]:
+            # Make sure within range
+            if row < 0 or row >= height or column < 0 or column >= width:
                 continue
 
             # Make sure walkable terrain
+            tile = map[row][column]
             if surfing:
-                if map[node_position[0]][node_position[1]] != 2:
-                    continue
-            else:
-                if (map[node_position[0]][node_position[1]] != 0 and map[node_position[0]][node_position[1]] != 3 and map[node_position[0]][node_position[1]] != 6):
+                if tile != WATER_TILE:
                     continue
+            elif tile not in WALKABLE_TILES:
+                continue
 
-            # Create new node
-            new_node = Node(current_node, node_position)
-
-            # Append
-            children.append(new_node)
-
-        # Loop through children
-        for child in children:
-
-            # Child is on the closed list
-            if child in closed_list:
+            child = (row, column)
+            if child in closed or child_g >= g_scores.get(child, child_g + 1):
                 continue
 
-            # Create the f, g, and h values
-            child.g = current_node.g + 1
-            child.h = ((child.position[0] - end_node.position[0]) ** 2) + ((child.position[1] - end_node.position[1]) ** 2)
-            child.f = child.g + child.h
+            g_scores[child] = child_g
+            parents[child] = current
+            child_f = child_g + abs(row - end_row) + abs(column - end_column)
+            heapq.heappush(open_heap, (child_f, -child_g, child))
+
+    return None
+
+
+def isWalkable(tile, surfing):
+    """Returns True if the tile can be walked on (or surfed on when surfing)"""
+    if surfing:
+        return tile == WATER_TILE
+    return tile in WALKABLE_TILES
+
+
+def distanceField(map, start, surfing, stops=None):
+    """Returns the walking distance from start to every tile of the map
+
+    Breadth first search over the map. Start is a (row, column) tile or a
+    list of them, in which case each tile gets the distance to the nearest
+    one. The result is a flat list indexed by row * width + column,
+    unreachable tiles are -1. Tiles in stops (a set of (row, column)) get
+    a distance but the search doesn't walk through them, used for exits
+    which would change the map.
+    """
+    height = len(map)
+    width = len(map[0]) if height > 0 else 0
+    field = [-1] * (width * height)
+
+    frontier = []
+    for start_row, start_column in (start if isinstance(start, list) else [start]):
+        if 0 <= start_row < height and 0 <= start_column < width:
+            field[start_row * width + start_column] = 0
+            frontier.append((start_row, start_column))
+    distance = 0
+
+    while frontier:
+        distance += 1
+        next_frontier = []
+        for row, column in frontier:
+            for offset in NEIGHBOURS:
+                child_row = row + offset[0]
+                child_column = column + offset[1]
+
+                if child_row < 0 or child_row >= height or child_column < 0 or child_column >= width:
+                    continue
 
-            # Child is already in the open list
-            if child in open_list:
-                continue
+                index = child_row * width + child_column
+                if field[index] != -1 or not isWalkable(map[child_row][child_column], surfing):
+                    continue
 
-            # Add the child to the open list
-            open_list.append(child)
\ No newline at end of file
+                field[index] = distance
+                if stops is None or (child_row, child_column) not in stops:
+                    next_frontier.append((child_row, child_column))
+        frontier = next_frontier
+
+    return field
+
+
+def pathFromField(field, width, end, stops=None):
+    """Returns the path from the source of a distance field to end
+
+    Walks back from end down the distance gradient, so it costs the length
+    of the path. The path includes the source, like astar. Pass the stops
+    used to build the field so the path doesn't go through them. Returns
+    None if end is unreachable.
+    """
+    row, column = end
+    if row < 0 or column < 0 or column >= width or row * width + column >= len(field):
+        return None
+
+    distance = field[row * width + column]
+    if distance == -1:
+        return None
+
+    height = len(field) // width
+    path = [(row, column)]
+    while distance > 0:
+        for offset in NEIGHBOURS:
+            child_row = row + offset[0]
+            child_column = column + offset[1]
+
+            if (0 <= child_row < height and 0 <= child_column < width and
+                field[child_row * width + child_column] == distance - 1 and
+                (stops is None or distance == 1 or (child_row, child_column) not in stops)):
+                row, column = child_row, child_column
+                break
+        distance -= 1
+        path.append((row, column))
+
+    return path[::-1]
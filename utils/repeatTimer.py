@@ -1,6 +1,22 @@
-from threading import Timer
+import threading
+import time
+
+from utils.scheduler import Scheduler
 
 class RepeatTimer(object):
+    """ Calls function every interval seconds on the shared scheduler.
+
+        Each tick is a scheduled call instead of a new threading.Timer,
+        so a timer running for hours never starts a thread. Ticks are
+        due at start + n * interval rather than interval after the last
+        one ran, so they don't drift later over time. If the scheduler
+        falls more than a whole interval behind the missed ticks are
+        skipped instead of run back to back.
+
+        Every start() and stop() begins a new generation. A tick the
+        scheduler already took before a restart belongs to the old one
+        and does nothing, so a restart never leaves two chains running.
+    """
     def __init__(self, interval, function, *args, **kwargs):
         self._timer     = None
         self.function   = function
@@ -9,18 +25,38 @@ class RepeatTimer(object):
         self.kwargs     = kwargs
         self.is_running = False
 
-    def _run(self):
-        self.is_running = False
-        self.start()
+        self._lock      = threading.Lock()
+        self._deadline  = 0
+        self._generation = 0
+
+    def _run(self, generation):
+        with self._lock:
+            if not self.is_running or generation != self._generation:
+                return
+            self._schedule()
+
         self.function(*self.args, **self.kwargs)
 
+    def _schedule(self):
+        # Called with the lock held
+        now = time.monotonic()
+        self._deadline += self.interval
+        if self._deadline < now:
+            self._deadline = now + self.interval
+
+        self._timer = Scheduler.instance().callLater(self._deadline - now, self._run, self._generation)
+
     def start(self):
-        if not self.is_running:
-            self._timer = Timer(self.interval, self._run)
-            self._timer.setDaemon(True)
-            self._timer.start()
-            self.is_running = True
+        with self._lock:
+            if not self.is_running:
+                self._generation += 1
+                self._deadline = time.monotonic()
+                self._schedule()
+                self.is_running = True
 
     def stop(self):
-        self._timer.cancel()
-        self.is_running = False
\ No newline at end of file
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._generation += 1
+            self.is_running = False
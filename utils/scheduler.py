@@ -0,0 +1,138 @@
+import heapq
+import threading
+import time
+import traceback
+
+class Scheduler():
+	""" Runs delayed callbacks from a heap on one daemon thread.
+
+		Shared by the whole process in place of a threading.Timer, and
+		so a thread, per delayed call. Callbacks run on the scheduler
+		thread one after another and should only send data or start
+		work elsewhere, a slow callback holds back the ones after it.
+
+		Cancelled calls are left in the heap and skipped when they come
+		up, pendingCount() only counts the ones still waiting to run.
+	"""
+	__instance = None
+	__lock = threading.Lock()
+
+	def __init__(self):
+		self.__condition = threading.Condition()
+
+		# [when, sequence, call], sequence keeps equal times in order
+		self.__heap = []
+		self.__sequence = 0
+		self.__pending = 0
+
+		self.__thread = threading.Thread(target=self.__run, name="Scheduler Thread")
+		self.__thread.setDaemon(True)
+		self.__thread.start()
+
+	@staticmethod
+	def instance():
+		""" Returns the shared scheduler, starting its thread on first use."""
+		if Scheduler.__instance is None:
+			with Scheduler.__lock:
+				if Scheduler.__instance is None:
+					Scheduler.__instance = Scheduler()
+
+		return Scheduler.__instance
+
+	def inSchedulerThread(self):
+		return threading.current_thread() is self.__thread
+
+	def callLater(self, delay, callback, *args):
+		""" Runs callback with args after delay seconds.
+
+			Returns a ScheduledCall which can be cancelled from any thread.
+		"""
+		call = ScheduledCall(self, callback, args)
+		when = time.monotonic() + max(delay, 0)
+
+		with self.__condition:
+			self.__sequence += 1
+			self.__pending += 1
+			heapq.heappush(self.__heap, (when, self.__sequence, call))
+
+			# Only wake the thread when it is sleeping past the new call
+			if self.__heap[0][2] is call:
+				self.__condition.notify()
+
+		return call
+
+	def pendingCount(self):
+		""" Returns the number of calls waiting to run."""
+		return self.__pending
+
+	def _cancel(self, call):
+		""" Called by ScheduledCall.cancel, returns False if it already ran."""
+		with self.__condition:
+			if call._state != ScheduledCall.PENDING:
+				return False
+
+			call._state = ScheduledCall.CANCELLED
+			self.__pending -= 1
+
+			return True
+
+	def __run(self):
+		while True:
+			with self.__condition:
+				call = self.__nextCall()
+				call._state = ScheduledCall.RUNNING
+				self.__pending -= 1
+
+			try:
+				call._run()
+			except Exception:
+				traceback.print_exc()
+			finally:
+				call._state = ScheduledCall.FINISHED
+
+	def __nextCall(self):
+		""" Waits for the next call that is due. Called with the condition held."""
+		while True:
+			# Drop calls cancelled since they were pushed
+			while len(self.__heap) > 0 and self.__heap[0][2]._state == ScheduledCall.CANCELLED:
+				heapq.heappop(self.__heap)
+
+			if len(self.__heap) == 0:
+				self.__condition.wait()
+				continue
+
+			timeout = self.__heap[0][0] - time.monotonic()
+			if timeout <= 0:
+				return heapq.heappop(self.__heap)[2]
+
+			self.__condition.wait(timeout)
+
+class ScheduledCall():
+	""" Handle of a callback scheduled with Scheduler.callLater.
+
+		Mirrors the parts of threading.Timer the game used: cancel() and
+		is_alive(), which is True until the callback has finished.
+	"""
+	PENDING = 0
+	RUNNING = 1
+	FINISHED = 2
+	CANCELLED = 3
+
+	def __init__(self, scheduler, callback, args):
+		self.__scheduler = scheduler
+		self.__callback = callback
+		self.__args = args
+		self._state = ScheduledCall.PENDING
+
+	def _run(self):
+		self.__callback(*self.__args)
+
+	def cancel(self):
+		""" Stops the call if it has not started, returns True if it was stopped."""
+		return self.__scheduler._cancel(self)
+
+	def cancelled(self):
+		return self._state == ScheduledCall.CANCELLED
+
+	def is_alive(self):
+		return self._state == ScheduledCall.PENDING or self._state == ScheduledCall.RUNNING
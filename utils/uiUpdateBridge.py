@@ -0,0 +1,117 @@
+import time
+
+from PySide2.QtCore import QObject, QTimer, Signal, Slot
+
+class UiUpdateBridge(QObject):
+	""" Coalesces GameHandler state updates for the widgets.
+
+		Position, team, inventory and history changes are sent from the
+		game threads on every step, battle and item. The bridge lives in
+		the UI thread, keeps only the latest value of each and hands
+		them on at most rate times a second, so widgets redraw at the
+		frame rate however fast the bot goes. An update after a
+		quiet period goes out right away. So does a position on another
+		map or a logout, only steps inside one map are coalesced.
+
+		Widgets connect to the bridge's signals, which have the same
+		arguments as the GameHandler signals of the same name. History
+		carries counts added since the last update, those are summed
+		rather than replaced.
+	"""
+	positionSignal = Signal(str, int, int, str, bool)
+	teamSignal = Signal(object)
+	inventorySignal = Signal(object)
+	historySignal = Signal(int, int, object, object)
+	historyResetSignal = Signal()
+
+	DEFAULT_RATE = 30
+
+	def __init__(self, gameHandler, rate=DEFAULT_RATE, parent=None):
+		super(UiUpdateBridge, self).__init__(parent)
+
+		# Signal name -> latest arguments, in the order they first changed
+		self.__pending = dict()
+		self.__lastFlush = 0
+		self.__positionMap = None
+		self.__received = 0
+		self.__delivered = 0
+
+		# A rate of 0 or less doesn't limit updates, each one goes out on
+		# the next pass of the event loop
+		self.__interval = 1.0 / rate if rate > 0 else 0
+		self.__timer = QTimer(self)
+		self.__timer.setSingleShot(True)
+		self.__timer.timeout.connect(self.__flush)
+
+		# Emitted from the game threads, queued to this one
+		gameHandler.positionSignal.connect(self.queuePosition)
+		gameHandler.teamSignal.connect(self.queueTeam)
+		gameHandler.inventorySignal.connect(self.queueInventory)
+		gameHandler.historySignal.connect(self.queueHistory)
+		gameHandler.historyResetSignal.connect(self.queueHistoryReset)
+
+	@Slot(str, int, int, str, bool)
+	def queuePosition(self, map, x, y, direction, timeout):
+		if map == "" or map != self.__positionMap:
+			# Sent after the last step on the previous map, never merged
+			self.__positionMap = map
+			self.__timer.stop()
+			self.__flush()
+			self.__received += 1
+			self.__pending["positionSignal"] = (map, x, y, direction, timeout)
+			self.__flush()
+		else:
+			self.__queue("positionSignal", (map, x, y, direction, timeout))
+
+	@Slot(object)
+	def queueTeam(self, team):
+		self.__queue("teamSignal", (team,))
+
+	@Slot(object)
+	def queueInventory(self, inventory):
+		self.__queue("inventorySignal", (inventory,))
+
+	@Slot(int, int, object, object)
+	def queueHistory(self, battles, money, pokemon, items):
+		pending = self.__pending.get("historySignal")
+		if pending is None:
+			pokemon_total = dict(pokemon)
+			items_total = dict(items)
+		else:
+			pokemon_total = pending[2]
+			items_total = pending[3]
+			for name, count in pokemon.items():
+				pokemon_total[name] = pokemon_total.get(name, 0) + count
+			for item, count in items.items():
+				items_total[item] = items_total.get(item, 0) + count
+
+		self.__queue("historySignal", (battles, money, pokemon_total, items_total))
+
+	@Slot()
+	def queueHistoryReset(self):
+		# Counts from before the reset are dropped, later ones go after it
+		self.__pending.pop("historySignal", None)
+		self.__pending.pop("historyResetSignal", None)
+		self.__queue("historyResetSignal", ())
+
+	def stats(self):
+		""" Returns the number of updates received and delivered."""
+		return {"received": self.__received,
+				"delivered": self.__delivered}
+
+	def __queue(self, name, args):
+		self.__received += 1
+		self.__pending[name] = args
+
+		if not self.__timer.isActive():
+			wait = self.__lastFlush + self.__interval - time.monotonic()
+			self.__timer.start(max(0, int(wait * 1000)))
+
+	def __flush(self):
+		self.__lastFlush = time.monotonic()
+
+		pending = self.__pending
+		self.__pending = dict()
+		for name, args in pending.items():
+			self.__delivered += 1
+			getattr(self, name).emit(*args)
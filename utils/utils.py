@@ -7,17 +7,30 @@ import hashlib
 def stringToMd5(text):
     return hashlib.md5(text.encode()).hexdigest()
 
+# Uppercase, lowercase, and digits. Random bytes are mapped onto these
+# 62 characters with a translate table; bytes from 248 (4 * 62) up are
+# dropped so every character stays equally likely.
+RANDOM_STRING_CHARS = string.ascii_uppercase + string.ascii_lowercase + string.digits
+RANDOM_STRING_TABLE = bytes(ord(RANDOM_STRING_CHARS[i % len(RANDOM_STRING_CHARS)]) for i in range(256))
+RANDOM_STRING_REJECT = bytes(range(len(RANDOM_STRING_CHARS) * 4, 256))
+
 def getRandomString(min, max):
+    """Returns a random string of letters and digits, min to max long.
 
-    # Create a list of all possible characters.
-    # Uppercase, lowercase, and digits.
-    chars = string.ascii_uppercase + string.ascii_lowercase + string.digits
+    Called for the packet key of every signed message, so the string is
+    made from one batch of random bits instead of a choice per character.
+    """
 
     # Generate random string length between min and max
     length = random.randint(min, max)
-    
-    # Generate and return a random string
-    return ''.join(random.choice(chars) for _ in range(length))
+
+    random_bytes = b''
+    while len(random_bytes) < length:
+        # A few spare bytes so a dropped one rarely needs another round
+        count = length - len(random_bytes) + 4
+        random_bytes += random.getrandbits(8 * count).to_bytes(count, 'little').translate(RANDOM_STRING_TABLE, RANDOM_STRING_REJECT)
+
+    return random_bytes[:length].decode()
 
 def getTimeMillis():
 	return int(round(time.time() * 1000))
\ No newline at end of file
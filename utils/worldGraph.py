@@ -0,0 +1,163 @@
+import re
+import heapq
+import itertools
+import threading
+
+from utils.mapStore import MapStore
+from utils.mapManager import MapManager
+from utils.distanceFields import DistanceFields
+from utils.pathfinding import distanceField, pathFromField
+
+class WorldGraph():
+	""" Routing graph over every map, built from the map exits.
+
+		Nodes are tiles where the player is inside a map: the start tile
+		and the arrival tile of every exit. Edges go from a node to the
+		exits of its map, weighted by the walking distance, and each exit
+		leads to its arrival node in the target map. Routes are found with
+		Dijkstra over this graph. Distances inside a map are computed once
+		per node and cached.
+	"""
+	__instance = None
+	__lock = threading.Lock()
+
+	# Marks the destination tile in the search
+	__GOAL = ('', -1, -1)
+
+	def __init__(self):
+		# Map name -> list of (x, y, target map, target x, target y)
+		self.__exits = dict()
+
+		# (map name, x, y, surfing) -> list of (exit index, distance)
+		self.__segments = dict()
+
+		store = MapStore.instance()
+		for key in store.mapKeys():
+			info = store.mapInfo(key)
+			exits = []
+			for exit in info["exits"]:
+				# A few exits in the map files are malformed, skip those
+				if len(exit) == 5 and isinstance(exit[2], str):
+					exits.append((int(exit[0]), int(exit[1]), self.__cleanName(exit[2]), int(exit[3]), int(exit[4])))
+			# Named the way MapManager looks the file up
+			self.__exits[key.replace("_", " ")] = exits
+
+	@staticmethod
+	def instance():
+		""" Returns the shared graph, building it on first use."""
+		if WorldGraph.__instance is None:
+			with WorldGraph.__lock:
+				if WorldGraph.__instance is None:
+					WorldGraph.__instance = WorldGraph()
+
+		return WorldGraph.__instance
+
+	def __cleanName(self, name):
+		return re.sub(r'\([^()]*\)', '', name).strip()
+
+	def hasMap(self, mapName):
+		return mapName in self.__exits
+
+	def __field(self, mapName, x, y, surfing):
+		""" Returns the collision width, exit tiles and distance field from x,y."""
+		collision = MapManager().map(mapName)
+		stops = set((exit[1], exit[0]) for exit in self.__exits[mapName])
+		field = distanceField(collision, (y, x), surfing, stops)
+
+		return len(collision[0]), stops, field
+
+	def __segmentCosts(self, mapName, x, y, surfing):
+		""" Returns (exit index, distance) for every exit reachable from x,y."""
+		key = (mapName, x, y, surfing)
+		costs = self.__segments.get(key)
+
+		if costs is None:
+			width, stops, field = self.__field(mapName, x, y, surfing)
+			costs = []
+			for index, exit in enumerate(self.__exits[mapName]):
+				if exit[0] < 0 or exit[0] >= width or exit[1] * width + exit[0] >= len(field):
+					continue
+				distance = field[exit[1] * width + exit[0]]
+				# Standing on an exit on arrival doesn't trigger it
+				if distance > 0:
+					costs.append((index, distance))
+			self.__segments[key] = costs
+
+		return costs
+
+	def route(self, startMap, startX, startY, endMap, endX, endY, surfing=False):
+		""" Plans a walk from a tile in one map to a tile in any other map.
+
+			Returns a list of [map name, path] segments, where path is a
+			list of (y, x) steps as returned by astar without the start
+			tile. Every segment but the last ends on an exit tile. Returns
+			None if there is no route.
+		"""
+		if startMap not in self.__exits or endMap not in self.__exits:
+			return None
+
+		# One field from the destination gives the last leg from every
+		# node of its map, it is kept when the destination is a favourite
+		goal = DistanceFields.instance().fieldTo(endMap, endX, endY, surfing)
+		if goal is None:
+			return None
+		goal_width, goal_stops, goal_field = goal
+
+		start = (startMap, startX, startY)
+		counter = itertools.count()
+		heap = [(0, next(counter), start)]
+		costs = {start: 0}
+
+		# Node -> (previous node, tile walked to in the previous node's map)
+		parents = {start: None}
+
+		while heap:
+			cost, _, node = heapq.heappop(heap)
+
+			if node == self.__GOAL:
+				return self.__buildRoute(parents, goal, surfing)
+
+			if cost > costs[node]:
+				continue
+
+			map_name, x, y = node
+			edges = []
+
+			if map_name == endMap and 0 <= x < goal_width and y * goal_width + x < len(goal_field):
+				distance = goal_field[y * goal_width + x]
+				if distance != -1:
+					edges.append((self.__GOAL, (endX, endY), distance))
+
+			for index, distance in self.__segmentCosts(map_name, x, y, surfing):
+				exit = self.__exits[map_name][index]
+				if exit[2] in self.__exits:
+					edges.append(((exit[2], exit[3], exit[4]), (exit[0], exit[1]), distance))
+
+			for next_node, tile, distance in edges:
+				next_cost = cost + distance
+				if next_cost < costs.get(next_node, next_cost + 1):
+					costs[next_node] = next_cost
+					parents[next_node] = (node, tile)
+					heapq.heappush(heap, (next_cost, next(counter), next_node))
+
+		return None
+
+	def __buildRoute(self, parents, goal, surfing):
+		route = []
+		node = self.__GOAL
+
+		while parents[node] is not None:
+			previous, tile = parents[node]
+			map_name, x, y = previous
+			if node == self.__GOAL:
+				# The goal field grows from the destination
+				width, stops, field = goal
+				path = pathFromField(field, width, (y, x), stops)[::-1]
+			else:
+				width, stops, field = self.__field(map_name, x, y, surfing)
+				path = pathFromField(field, width, (tile[1], tile[0]), stops)
+			path.pop(0)
+			route.append([map_name, path])
+			node = previous
+
+		return route[::-1]